@@ -1,4 +1,5 @@
 from machine import Pin, Timer
+from digit_codec import to_digits
 
 
 # Pins for display selection (transistors)
@@ -70,12 +71,9 @@ def write_displays(timer):
 
 def number_to_digits(number):
     """
-    Convert a number to an array of its digits.
+    Convert a number to an array of its digits, zero-padded to NUMBER_OF_DIGITS.
     """
-    # Convert number to string, extract digits and convert back to integers
-    nb_str = [int(digit) for digit in str(number)]
-    # Return the array of digits (as integers)
-    return nb_str
+    return to_digits(number, [0] * NUMBER_OF_DIGITS)
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ import random
 import time
 import sys
 from machine import Pin, Timer
+from digit_codec import to_digits
 
 CURRENT_DIGIT = 0
 NUMBER_OF_DIGITS = 3
@@ -88,15 +89,6 @@ timer1 = Timer()
 timer1.init(freq=500, mode=Timer.PERIODIC, callback=write_displays)
 
 
-def number_to_digits(number):
-    """
-    Convert a number to an array of its digits."""
-    # Convert number to string, extract digits and convert back to integers
-    digits = [int(digit) for digit in str(number)]
-    # Return the array of digits (as integers)
-    return digits
-
-
 while 1:
     try:
         time.sleep(4)
@@ -104,7 +96,7 @@ while 1:
             10 ** (NUMBER_OF_DIGITS - 1), 10**NUMBER_OF_DIGITS
         )
         print(random_num)
-        digits = number_to_digits(random_num)
+        to_digits(random_num, digits)  # In place: read by write_displays
     except KeyboardInterrupt:
         print("Goodbye")
         stop_timer = True
@@ -5,7 +5,10 @@ import time, sys
 from pico_i2c_lcd import I2cLcd
 import urequests
 from connexion_wifi import connect_to_wifi
-from sept_seg import NUMBER_OF_DIGITS, write_displays, digits, number_to_digits
+from sept_seg import NUMBER_OF_DIGITS, write_displays, digits
+from digit_codec import to_digits
+from payout import calculer_gain
+from frame_recorder import FrameRecorder
 
 # Configuration de l'écran LCD
 I2C_ADDR = (
@@ -36,7 +39,7 @@ y_axis = ADC(Pin(27))
 
 ###################### Firebase  ######################
 PARTIE_COUNT = 0  # Compteur d’identifiants personnalisés
-COMBINAISONS = []  # Liste de toutes les combinaisons générées
+COMBINAISONS = FrameRecorder(NUMBER_OF_DIGITS, 15)  # Tirages de la partie (15 au plus)
 
 
 ###################### fonctions ######################
@@ -46,15 +49,15 @@ def generate_random(timer):
     """
     Fonction appelée par le timer pour générer un chiffre aléatoire.
     """
-    global digits, GENERATED_COUNT, RANDOM_TIMER, SCORE, RUN_CODE, COMBINAISONS
+    global GENERATED_COUNT, RANDOM_TIMER, SCORE, RUN_CODE
 
     if GENERATED_COUNT < NUMBER_TO_GENERATE:
         random_num = random.randrange(
             10 ** (NUMBER_OF_DIGITS - 1), 10**NUMBER_OF_DIGITS
         )
-        digits = number_to_digits(random_num)
+        to_digits(random_num, digits)  # Sur place : liste lue par write_displays
         print(f"Generated digits: {digits}")  # Affiche les chiffres générés
-        COMBINAISONS.append(digits[:])  # copie pour éviter les effets de bord
+        COMBINAISONS.append(digits)  # Chiffres copiés dans le tampon
         GENERATED_COUNT += 1
 
     else:
@@ -62,47 +65,17 @@ def generate_random(timer):
         SCORE = calculer_gain(digits, BET_AMOUNT)
         updated_data = {
             "gain": SCORE,
-            "combinaison": COMBINAISONS,
+            "combinaison": COMBINAISONS.to_lists(),
             "partieJouee": True,
             "timestamp": time.time(),
             "mise": BET_AMOUNT,
         }
         update_first_unplayed_game(updated_data)
         GENERATED_COUNT = 0
-        COMBINAISONS.clear()  # Réinitialiser pour la prochaine partie
+        COMBINAISONS.reset()  # Réinitialiser pour la prochaine partie
         RUN_CODE = False
 
 
-def calculer_gain(rouleaux: list[int], mise: int) -> int:
-    """Calcule le gain en fonction du tirage et du MONTANT misé."""
-    r2, r1, r3 = rouleaux
-    multiplicateur = 0
-    presence_event = False
-
-    if r1 == r2 == r3:
-        return 100 if r1 == 7 else 10  # (Méga) Jackpot ou Jackpot
-    if (r1 + 1 == r3 and r2 + 1 == r1) or (r1 - 1 == r3 and r2 - 1 == r1):
-        multiplicateur = 5  # Suite
-        presence_event = True
-    elif r1 == r3 and r1 != r2:
-        multiplicateur = 2  # Sandwich
-        presence_event = True
-    if r1 % 2 == r2 % 2 == r3 % 2:
-        multiplicateur = 1.5  # Pair/Impair
-        presence_event = True
-
-    count_7 = rouleaux.count(7)
-    multiplicateur += count_7 * 0.5
-    if not presence_event:
-        if count_7 == 1:
-            multiplicateur = 0.5  # Perdre 50% de sa somme
-        elif count_7 == 2:
-            multiplicateur = 1  # Récupérer sa mise
-
-    gain = int(mise * multiplicateur)
-    return gain
-
-
 def update_bet_amount():
     """
     Met à jour la somme pariée en fonction de la position du joystick.
@@ -1,18 +1,23 @@
 from machine import Pin, Timer, I2C, ADC
-import random
 import time, sys
+import uasyncio as asyncio
 from pico_i2c_lcd import I2cLcd
 from connexion_wifi import connect_to_wifi
 from led import start_led_blinking, stop_led_blinking
-from firebase import (
-    update_first_unplayed_game,
-    fetch_from_firebase,
-    get_balance_from_firebase,
-    calculer_gain,
-)
+from firebase import BREAKER, METRICS, calculer_gain
+from firebase_async import AsyncFirebaseClient
+from firebase_listener import FirebaseListener
+from spin_queue import SpinQueue
+from game_index import GameIndex
+from spin_codec import COMBINAISON_FORMAT, encode_combinaison
+from spin_planner import SpinPlanner
+from spin_rng import RNG_NAME, new_seed
 from sept_seg import SevenSegmentDisplay
+from gpio_frames import SEGMENT_MAP
+from pio_display import PioDisplay
 from joystick import update_bet_amount
 from buzzer import SlotMachineSoundPlayer
+from isr_profiler import ISR_PROFILER, SerialCommands
 
 ########## LCD SCREEN CONFIGURATION ##########
 I2C_ADDR = (
@@ -25,15 +30,14 @@ lcd = I2cLcd(i2c, I2C_ADDR, 2, 16)  # Écran LCD 2 lignes, 16 colonnes
 
 ########## Global variables ##########
 NUM_DIGITS = 3  # Nombre de chiffres à afficher
-NUMBERS_TO_GENERATE = random.randint(10, 15)  # Nombres à générer
-NUMBER_GENERATED_COUNT = 0  # Compteur pour suivre combien de chiffres ont été générés
 random_timer = Timer()  # Timer pour générer les chiffres successivement
 SCORE = 0  # Variable pour stocker le SCORE
 BET_AMOUNT = 10  # Somme initiale pariée
 DISPLAY_FREQ = NUM_DIGITS * 100
+SPIN_PERIOD_MS = 500  # Un tirage affiché toutes les 500 ms (2 Hz)
+PIO_DISPLAY = False  # True : balayage de l'afficheur par la PIO (plus de timer)
 RUN_CODE = False
 CURRENT_DIGIT = 0
-digits = [7, 7, 7]
 USER_BALANCE = 0  # Solde du joueur, à récupérer depuis Firebase
 
 ########## Button to start display ##########
@@ -43,6 +47,12 @@ BUTTON_PRESSED = False
 SEGMENTS_PINS = [3, 4, 5, 6, 7, 9, 8, 10]  # a, b, c, d, e, f, g, pt
 DISPLAY_SELECT_PINS = [0, 1, 2]  # GPIO 0, 1, 2
 seven_segment = SevenSegmentDisplay(SEGMENTS_PINS, DISPLAY_SELECT_PINS, NUM_DIGITS)
+pio_display = (
+    PioDisplay(SEGMENTS_PINS, DISPLAY_SELECT_PINS[:NUM_DIGITS], SEGMENT_MAP)
+    if PIO_DISPLAY
+    else None
+)  # Si actif, seven_segment ne sert plus qu'à garder les chiffres
+spin_planner = SpinPlanner(NUM_DIGITS)  # Tirages de la partie, calculés à l'appui
 
 ###################### Configuration des axes X et Y du joystick ######################
 x_axis = ADC(Pin(28))
@@ -50,8 +60,20 @@ y_axis = ADC(Pin(27))
 
 ###################### Firebase  ######################
 GAME_COUNT = 0  # Compteur d’identifiants personnalisés
-combinations = []  # Liste de toutes les combinaisons générées
+COMPACT_COMBINAISON = False  # True : envoie 'combinaison' au format compact (base64)
+SHARED_DATABASE = False  # True : plusieurs machines sur la base (écritures conditionnelles)
+SEEDED_SPINS = True  # True : graine enregistrée avec la partie (rejouable, tools/replay.py)
 FIREBASE_URL = "https://machine-a-sous-default-rtdb.europe-west1.firebasedatabase.app"
+spin_queue = SpinQueue()  # Résultats en attente d'envoi (persistés sur la flash)
+FLUSH_PERIOD_MS = 10000  # Intervalle entre deux essais d'envoi hors ligne
+next_flush = time.ticks_ms()  # Prochain essai d'envoi de la file
+listener = FirebaseListener(FIREBASE_URL)  # Miroir temps réel des parties non jouées
+game_index = GameIndex()  # Prochaine partie non jouée, gardée sur la flash
+firebase_client = AsyncFirebaseClient(
+    FIREBASE_URL, index=game_index, breaker=BREAKER, metrics=METRICS
+)  # Requêtes sans bloquer le jeu, avec nouveaux essais et disjoncteur
+METRICS_PERIOD_MS = 60000  # Intervalle d'affichage des mesures réseau sur la console
+balance_requested = asyncio.Event()  # Demande de relecture du solde par la tâche réseau
 
 buzzer_timer = Timer(-1)  # Timer dédié à la musique
 slot_sound = SlotMachineSoundPlayer()  # Instanciation du SlotMachineSoundPlayer
@@ -78,52 +100,101 @@ def write_displays(timer):
 
 def generate_random(timer):
     """
-    Fonction appelée par le timer pour générer un chiffre aléatoire.
+    Fonction appelée par le timer pour afficher le tirage suivant de la
+    partie. Les tirages sont calculés à l'appui sur le bouton : ce callback
+    n'alloue rien et laisse la fin de partie à la boucle principale.
     """
-    global digits, NUMBER_GENERATED_COUNT, random_timer, SCORE, RUN_CODE, combinations, NUMBERS_TO_GENERATE, BET_AMOUNT, buzzer_timer, slot_sound
+    if spin_planner.advance(seven_segment.digits):
+        seven_segment.publish()  # Affiché à la fin du balayage en cours
+    else:
+        timer.deinit()
 
-    if NUMBER_GENERATED_COUNT < NUMBERS_TO_GENERATE:
-        random_num = random.randrange(10 ** (NUM_DIGITS - 1), 10**NUM_DIGITS)
-        digits = seven_segment.number_to_digits(random_num)
-        print(f"Generated digits: {digits}")  # Affiche les chiffres générés
-        combinations.append(digits[:])  # copie pour éviter les effets de bord
-        NUMBER_GENERATED_COUNT += 1
 
-    else:
-        random_timer.deinit()
-        buzzer_timer.deinit()  # Arrête la musique
-        slot_sound.stop()  # Arrête le son slot machine
-        stop_led_blinking()  # Arrête le clignotement des LEDs
-        SCORE = calculer_gain(digits, BET_AMOUNT)
-        updated_data = {
-            "gain": SCORE,
-            "combinaison": combinations,
-            "partieJouee": True,
-            "timestamp": time.time(),
-            "mise": BET_AMOUNT,
-            "partieAffichee": False,
-        }
-        update_first_unplayed_game(updated_data)
-        NUMBER_GENERATED_COUNT = 0
-        combinations.clear()  # Réinitialiser pour la prochaine partie
-        RUN_CODE = False
+def finish_spin():
+    """
+    Fin de partie, appelée par la boucle principale : arrête l'animation,
+    calcule le gain et met le résultat dans la file d'envoi.
+    """
+    global SCORE, RUN_CODE
+    buzzer_timer.deinit()  # Arrête la musique
+    slot_sound.stop()  # Arrête le son slot machine
+    stop_led_blinking()  # Arrête le clignotement des LEDs
+    spin_planner.finished = False
+    digits = spin_planner.outcome()
+    print(f"Generated digits: {digits}")  # Affiche le résultat
+    SCORE = calculer_gain(digits, BET_AMOUNT)
+    updated_data = {
+        "gain": SCORE,
+        "combinaison": spin_planner.combinations(),
+        "partieJouee": True,
+        "timestamp": time.time(),
+        "mise": BET_AMOUNT,
+        "partieAffichee": False,
+    }
+    if spin_planner.seed is not None:
+        updated_data["seed"] = spin_planner.seed
+        updated_data["rng"] = RNG_NAME
+    if COMPACT_COMBINAISON:
+        updated_data["combinaison"] = encode_combinaison(spin_planner.frames)
+        updated_data["combinaisonFormat"] = COMBINAISON_FORMAT
+    spin_queue.append(updated_data)  # Envoyé par la tâche réseau
+    RUN_CODE = False
 
 
-# Attache l'interruption au bouton
-button_pin.irq(trigger=Pin.IRQ_FALLING, handler=button_callback)
-timer1 = Timer()
-timer1.init(freq=DISPLAY_FREQ, mode=Timer.PERIODIC, callback=write_displays)
-connect_to_wifi()  # Connexion au Wi-Fi
-USER_BALANCE = get_balance_from_firebase(
-    fetch_from_firebase, USER_BALANCE
-)  # Récupère le solde avant la boucle principale
-while 1:
-    try:
+async def network_loop():
+    """
+    Tâche réseau : (r)ouvre le flux temps réel, relit le solde à la demande
+    et envoie la file d'attente, pendant que la boucle de jeu continue de
+    tourner.
+    """
+    global USER_BALANCE, next_flush
+    next_metrics = time.ticks_add(time.ticks_ms(), METRICS_PERIOD_MS)
+    while True:
+        if listener.reconnect_due():
+            await listener.connect()  # Flux temps réel, (r)ouvert sans bloquer le jeu
+        if balance_requested.is_set():
+            balance_requested.clear()
+            # Flux indisponible : interroge Firebase
+            USER_BALANCE = await firebase_client.get_balance()
+            listener.seen(firebase_client.latest_key)
+        if (
+            not RUN_CODE
+            and len(spin_queue)
+            and time.ticks_diff(time.ticks_ms(), next_flush) >= 0
+        ):
+            # Envoie les parties en attente (un seul PATCH, ou une réservation
+            # conditionnelle par partie si la base est partagée), sinon réessaie plus tard
+            free_keys = None
+            if listener.synced:
+                free_keys = listener.unplayed_keys()
+                game_index.resync(free_keys)  # Recalage gratuit depuis le miroir
+            if SHARED_DATABASE:
+                flush = firebase_client.claim_spin_queue
+            else:
+                flush = firebase_client.flush_spin_queue
+            if not await flush(spin_queue, free_keys):
+                next_flush = time.ticks_add(time.ticks_ms(), FLUSH_PERIOD_MS)
+            print("Session Firebase :", firebase_client.stats())
+        if time.ticks_diff(time.ticks_ms(), next_metrics) >= 0:
+            firebase_client.dump_metrics()
+            next_metrics = time.ticks_add(time.ticks_ms(), METRICS_PERIOD_MS)
+        await asyncio.sleep_ms(100)
+
+
+async def game_loop():
+    """
+    Boucle de jeu : joystick, bouton, écran et musique. Aucun appel réseau
+    bloquant n'y est fait.
+    """
+    global USER_BALANCE, BET_AMOUNT, BUTTON_PRESSED, RUN_CODE
+    while 1:
         if USER_BALANCE < 0:
             lcd.clear()
             lcd.putstr("No money or game")
-            time.sleep(2)
+            await asyncio.sleep(2)
             raise KeyboardInterrupt
+        if RUN_CODE and spin_planner.finished:
+            finish_spin()  # Signalé par le timer, traité hors interruption
         if not RUN_CODE:
             BET_AMOUNT = update_bet_amount(
                 x_axis, y_axis, lcd, BET_AMOUNT, USER_BALANCE
@@ -131,24 +202,68 @@ while 1:
         if BUTTON_PRESSED:
             RUN_CODE = True  # bloque l'affichage de la mise
             BUTTON_PRESSED = False  # Réinitialise le flag
-            NUMBER_GENERATED_COUNT = 0  # Réinitialise le compteur
-            NUMBERS_TO_GENERATE = random.randint(10, 15)
-            print(NUMBERS_TO_GENERATE)
+            # Tous les tirages de la partie, d'avance
+            if SEEDED_SPINS:
+                print(spin_planner.plan_seeded(new_seed()))
+            else:
+                print(spin_planner.plan())
             lcd.clear()
             lcd.putstr("Generating...")  # Affiche un message sur l'écran LCD
             start_led_blinking()  # Démarre le clignotement des LEDs
             slot_sound.start()  # Lance la musique slot machine non bloquante
-            random_timer.init(period=500, mode=Timer.PERIODIC, callback=generate_random)
-            USER_BALANCE = get_balance_from_firebase(
-                fetch_from_firebase, USER_BALANCE
-            )  # Récupère le solde avant la boucle principale
+            ISR_PROFILER.rearm("spin")  # Pas de périodes manquées entre deux parties
+            random_timer.init(period=SPIN_PERIOD_MS, mode=Timer.PERIODIC, callback=spin_callback)
+            if listener.synced:
+                USER_BALANCE = listener.balance()  # Solde en mémoire, sans réseau
+            else:
+                balance_requested.set()  # Relu par la tâche réseau
+        if listener.poll() and listener.synced and not RUN_CODE:
+            # Un nouveau solde poussé par Firebase s'affiche aussitôt
+            if listener.balance() >= 0:
+                USER_BALANCE = listener.balance()
         slot_sound.tick()  # Appelle tick à chaque boucle pour jouer la musique
-        time.sleep(0.1)  # Petite pause pour éviter une utilisation excessive du CPU
-    except KeyboardInterrupt:
-        print("Goodbye")
-        lcd.clear()
-        lcd.putstr("Goodbye")  # Affiche un message d'adieu sur l'écran LCD
-        time.sleep(0.01)
-        timer1.deinit()
-        random_timer.deinit()
-        sys.exit()
+        console.poll()  # Commandes de la console série (isr, metrics)
+        if pio_display:
+            pio_display.show(seven_segment.digits)  # Poussé seulement s'il a changé
+        await asyncio.sleep_ms(100)  # Laisse la main à la tâche réseau
+
+
+async def main():
+    global USER_BALANCE
+    USER_BALANCE = await firebase_client.get_balance()  # Solde avant la boucle de jeu
+    listener.seen(firebase_client.latest_key)  # Même partie la plus récente pour le miroir
+    # Recale une fois l'index local sur la base (parties jouées ailleurs
+    # pendant que la machine était éteinte) : GameIndex.resync
+    await firebase_client.query_free_keys()
+    asyncio.create_task(network_loop())
+    await game_loop()
+
+
+# Callbacks mesurés par ISR_PROFILER (commande « isr » sur la console série)
+display_callback = ISR_PROFILER.wrap("display", write_displays, 1000000 // DISPLAY_FREQ)
+spin_callback = ISR_PROFILER.wrap("spin", generate_random, SPIN_PERIOD_MS * 1000)
+console = SerialCommands(
+    {
+        "isr": ISR_PROFILER.dump,
+        "isr reset": ISR_PROFILER.reset,
+        "metrics": firebase_client.dump_metrics,
+    }
+)
+# Attache l'interruption au bouton
+button_pin.irq(trigger=Pin.IRQ_FALLING, handler=ISR_PROFILER.wrap("button", button_callback))
+timer1 = Timer()
+if not pio_display:
+    timer1.init(freq=DISPLAY_FREQ, mode=Timer.PERIODIC, callback=display_callback)
+connect_to_wifi()  # Connexion au Wi-Fi
+try:
+    asyncio.run(main())
+except KeyboardInterrupt:
+    print("Goodbye")
+    lcd.clear()
+    lcd.putstr("Goodbye")  # Affiche un message d'adieu sur l'écran LCD
+    time.sleep(0.01)
+    timer1.deinit()
+    if pio_display:
+        pio_display.stop()
+    random_timer.deinit()
+    sys.exit()
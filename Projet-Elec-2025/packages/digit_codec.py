@@ -0,0 +1,70 @@
+"""
+Conversion nombre -> chiffres partagée par tous les affichages.
+Les chiffres sont obtenus par divisions entières et écrits dans un tampon
+fourni par l'appelant (liste, bytearray ou array), complétés à gauche par
+des zéros : 57 sur 3 chiffres donne 0, 5, 7. Aucune chaîne ni liste n'est
+créée, ce qui permet de l'appeler depuis un callback de timer.
+"""
+
+
+def to_digits(number, out, width=None, start=0):
+    """
+    Écrit les chiffres de `number` dans out[start:start + width].
+
+    Args:
+        number (int): Nombre positif à convertir.
+        out: Tampon modifiable (liste, bytearray...).
+        width (int): Nombre de chiffres ; par défaut, jusqu'à la fin de out.
+        start (int): Position du premier chiffre dans out.
+
+    Returns:
+        Le tampon out.
+
+    Raises:
+        ValueError: Nombre négatif ou trop grand pour la largeur.
+    """
+    if width is None:
+        width = len(out) - start
+    if number < 0:
+        raise ValueError("Nombre négatif")
+    i = start + width
+    while i > start:
+        i -= 1
+        out[i] = number % 10
+        number //= 10
+    if number:
+        raise ValueError("Nombre trop grand pour la largeur")
+    return out
+
+
+def digit_count(number):
+    """
+    Nombre de chiffres de `number` (1 pour 0).
+    """
+    count = 1
+    while number >= 10:
+        number //= 10
+        count += 1
+    return count
+
+
+def digits_of(number, width=None):
+    """
+    Liste des chiffres de `number` (alloue la liste : hors interruption).
+    Sans largeur, le nombre garde ses chiffres significatifs (7 -> [7]).
+    """
+    if width is None:
+        width = digit_count(number)
+    return to_digits(number, [0] * width)
+
+
+def decode_batch(numbers, out, width):
+    """
+    Écrit les chiffres de plusieurs tirages à la suite dans out (tirage k à
+    partir de k * width), par exemple tout le script d'une partie.
+    """
+    start = 0
+    for number in numbers:
+        to_digits(number, out, width, start)
+        start += width
+    return out
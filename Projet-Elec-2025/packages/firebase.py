@@ -6,134 +6,157 @@ mettre à jour la base de données Firebase et récupérer les données.
 
 import time
 import random
-import urequests
-from connexion_wifi import connect_to_wifi
+from firebase_session import FirebaseSession
+# Opérations partagées avec le client asynchrone (firebase_async.py)
+from firebase_ops import (
+    CLAIM_ATTEMPTS,
+    CLAIM_STATS,
+    ETAG_HEADERS,
+    GAME_FIELDS,
+    JSON_BUFFER,
+    UNPLAYED_QUERY,
+    claim_body,
+    first_unplayed_game,
+    game_number,
+    is_own_result,
+    latest_balance,
+    run,
+    scan_games,
+    unplayed_keys,
+)
+import firebase_ops
+from resilience import CircuitBreaker, EndpointMetrics, ResilientSession
+from payout import calculer_gain  # Table des gains précalculée
+from frame_recorder import FrameRecorder
+from digit_codec import digits_of
 
 NUMBER_TO_GENERATE = 15  # nombres à générer
 DIGITS = [1, 2, 3]
 PARTIE_COUNT = 0  # Compteur d’identifiants personnalisés
-COMBINAISONS = {}  # Liste de toutes les combinaisons générées
 NUMBER_OF_DIGITS = 3
+COMBINAISONS = FrameRecorder(NUMBER_OF_DIGITS, NUMBER_TO_GENERATE)  # Tirages de la partie
 BET_AMOUNT = 10
 URL_FIREBASE = "https://machine-a-sous-default-rtdb.europe-west1.firebasedatabase.app"
+# Connexion persistante partagée par toutes les requêtes du module, avec
+# nouveaux essais, disjoncteur et mesures par point d'accès
+BREAKER = CircuitBreaker()
+METRICS = EndpointMetrics()
+SESSION = ResilientSession(FirebaseSession(URL_FIREBASE), BREAKER, METRICS)
+LAST_BALANCE = None  # Dernier solde lu, servi quand Firebase est injoignable
 
 
-def update_first_unplayed_game(updated_data):
+def fetch_unplayed_games():
+    """
+    Récupère toutes les parties non jouées via la requête indexée.
+    Si le serveur refuse la requête (index absent), parcourt toute la base en
+    flux sans la charger en mémoire.
+    Retourne un dictionnaire {clé: {champ: valeur}} limité à GAME_FIELDS,
+    ou None en cas d'erreur.
+    """
+    return run(firebase_ops.fetch_unplayed_games(), SESSION)
+
+
+def fetch_latest_game():
+    """
+    Récupère seulement la partie la plus récente (jouée ou non), sous la forme
+    {clé: partie} attendue par get_balance_from_firebase.
+    Retourne None en cas d'erreur.
+    """
+    return run(firebase_ops.fetch_latest_game(), SESSION)
+
+
+def fetch_first_unplayed_game():
+    """
+    Récupère (clé, partie) de la première partie non jouée.
+    Retourne (None, None) si aucune partie n'est disponible ou en cas d'erreur.
+    """
+    return run(firebase_ops.fetch_first_unplayed_game(), SESSION)
+
+
+def update_first_unplayed_game(updated_data, index=None):
     """
     Met à jour le premier élément de la base de données Firebase où 'partieJouee' est False.
+    Avec un index local, la partie visée est connue sans requête de recherche
+    et réservée par une écriture conditionnelle ; un conflit resynchronise
+    l'index. Retourne la clé mise à jour, ou None.
+
+    Args:
+        updated_data (dict): Résultat de la partie.
+        index (GameIndex): Index local des parties (optionnel).
     """
-    response = None
-    try:
-        # Récupérer toutes les données de Firebase
-        data = fetch_from_firebase()
-        print("Données récupérées depuis Firebase :", data)
-        key_data = sorted(data.keys(), key=lambda key: int(key.replace("MA", "")))
-        if data is None:
-            print("Aucune donnée récupérée depuis Firebase.")
-            return
-        # Trouver la première partie où 'partieJouee' est False
-        for key in key_data:
-            value = data[key]
-            if not value.get(
-                "partieJouee", True
-            ):  # Par défaut, considère True si la clé est absente
-                # Construire l'URL pour mettre à jour cet élément spécifique
-                firebase_url = f"{URL_FIREBASE}/{key}.json"
-                # Envoyer les données mises à jour
-                response = urequests.patch(firebase_url, json=updated_data)
-
-                # Vérifier manuellement le code de statut HTTP
-                if response.status_code != 200:
-                    raise RuntimeError(f"Erreur HTTP : {response.status_code}")
-
-                print(f"Données mises à jour pour la partie {key}")
-                response.close()
-                return  # Arrêter après avoir mis à jour le premier élément
+    return run(firebase_ops.update_first_unplayed_game(updated_data, index), SESSION)
 
-        print("Aucune partie non jouée trouvée.")
-    except OSError as e:
-        print("Erreur réseau ou problème de connexion :", e)
-    except ValueError as e:
-        print("Erreur lors de la conversion JSON :", e)
-    except RuntimeError as e:
-        print("Erreur HTTP :", e)
-    finally:
-        if response:
-            try:
-                response.close()
-            except AttributeError:
-                pass
+
+def query_free_keys(index=None):
+    """
+    Lit les parties non jouées (requête indexée) et retourne leurs clés
+    triées par numéro, ou None en cas d'erreur. Recale l'index s'il est fourni.
+
+    Args:
+        index (GameIndex): Index local des parties (optionnel).
+    """
+    return run(firebase_ops.query_free_keys(index), SESSION)
+
+
+def flush_spin_queue(queue, free_keys=None, index=None):
+    """
+    Envoie tous les résultats en attente dans la file en un seul PATCH
+    multi-chemins à la racine (voir firebase_ops.flush_spin_queue).
+    Retourne True si la file est vide après l'appel.
+    """
+    return run(firebase_ops.flush_spin_queue(queue, free_keys, index), SESSION)
+
+
+def claim_game(key, updated_data, game=None, etag=None):
+    """
+    Réserve et écrit la partie `key` en une seule écriture conditionnelle
+    (voir firebase_ops.claim_game).
+    Retourne True si la partie porte le résultat, False si une autre machine
+    l'a prise, None en cas d'erreur (à réessayer plus tard).
+    """
+    return run(firebase_ops.claim_game(key, updated_data, game, etag), SESSION)
 
 
-def calculer_gain(rouleaux: list[int], mise: int) -> int:
-    """Calcule le gain en fonction du tirage et du MONTANT misé."""
-    r2, r1, r3 = rouleaux
-    multiplicateur = 0
-    presence_event = False
-
-    if r1 == r2 == r3:
-        return mise * 100 if r1 == 7 else mise * 10  # (Méga) Jackpot ou Jackpot
-    if (r1 + 1 == r3 and r2 + 1 == r1) or (r1 - 1 == r3 and r2 - 1 == r1):
-        multiplicateur = 5  # Suite
-        presence_event = True
-    elif r1 == r3 and r1 != r2:
-        multiplicateur = 2  # Sandwich
-        presence_event = True
-    if r1 % 2 == r2 % 2 == r3 % 2:
-        multiplicateur = 1.5  # Pair/Impair
-        presence_event = True
-
-    count_7 = rouleaux.count(7)
-    multiplicateur += count_7 * 0.5
-    if not presence_event:
-        if count_7 == 1:
-            multiplicateur = 0.5  # Perdre 50% de sa somme
-        elif count_7 == 2:
-            multiplicateur = 1  # Récupérer sa mise
-
-    gain = int(mise * multiplicateur)
-    return gain
+def claim_spin_queue(queue, free_keys=None, index=None):
+    """
+    Variante de flush_spin_queue pour plusieurs machines sur une même base,
+    chaque résultat réservant sa partie (voir firebase_ops.claim_spin_queue).
+    Retourne True si la file est vide après l'appel.
+    """
+    return run(firebase_ops.claim_spin_queue(queue, free_keys, index), SESSION)
 
 
 def number_to_digits(number):
     """
-    Convertit un nombre en tableau de ses chiffres.
+    Convertit un nombre en tableau de ses chiffres (sans zéros de tête).
     """
-    # Convert number to string, extract DIGITS and convert back to integers
-    list_digits = [int(digit) for digit in str(number)]
-    # Return the array of DIGITS (as integers)
-    return list_digits
+    return digits_of(number)
 
 
 def generate_random():
     """
     Fonction appelée par le timer pour générer un chiffre aléatoire.
     """
-    global DIGITS, SCORE, RUN_CODE, COMBINAISONS
-    for generated_count in range(NUMBER_TO_GENERATE):
+    global DIGITS, SCORE, RUN_CODE
+    for _ in range(NUMBER_TO_GENERATE):
         random_num = random.randrange(
             10 ** (NUMBER_OF_DIGITS - 1), 10**NUMBER_OF_DIGITS
         )
-        DIGITS = number_to_digits(random_num)
-
-        # Mettre à jour COMBINAISONS avec le bon format
-        COMBINAISONS[generated_count] = {i: DIGITS[i] for i in range(len(DIGITS))}
-
-        generated_count += 1
+        COMBINAISONS.append_number(random_num)
+    DIGITS = COMBINAISONS.last()
 
     SCORE = calculer_gain(DIGITS, BET_AMOUNT)
 
     updated_data = {
         "gain": SCORE,
-        "combinaison": COMBINAISONS,
+        "combinaison": COMBINAISONS.to_lists(),
         "partieJouee": True,
         "timestamp": time.time(),
         "mise": BET_AMOUNT,
         "partieAffichee": False,
     }
     update_first_unplayed_game(updated_data)
-    generated_count = 0
-    COMBINAISONS.clear()  # Réinitialiser pour la prochaine partie
+    COMBINAISONS.reset()  # Réinitialiser pour la prochaine partie
     RUN_CODE = False
     return 0  # Indiquer que la fonction s'est terminée avec succès
 
@@ -144,8 +167,7 @@ def fetch_from_firebase():
     """
     response = None
     try:
-        headers = {"Content-Type": "application/json", "Accept": "application/json"}
-        response = urequests.get(f"{URL_FIREBASE}/.json", headers=headers, timeout=5)
+        response = SESSION.get("/.json")
         if response.status_code != 200:
             raise RuntimeError(f"Erreur HTTP : {response.status_code}")
         print(response)
@@ -170,26 +192,50 @@ def fetch_from_firebase():
 def get_balance_from_firebase(fetch_from_firebase_func, user_balance):
     """
     Récupère le solde de l'utilisateur depuis Firebase.
+    Le solde est celui de la partie la plus récente, -1 si elle est déjà
+    jouée. Avec fetch_latest_game, seule cette partie est téléchargée ; avec
+    fetch_from_firebase, toute la base est lue.
+    Si Firebase est injoignable (erreur réseau, circuit ouvert), le dernier
+    solde lu est renvoyé au lieu de -1, pour ne pas arrêter la machine.
     """
+    global LAST_BALANCE
     try:
         data = fetch_from_firebase_func()
         print("Données récupérées de Firebase:", data)
-        if data:
-            last_key = max(data, key=lambda k: int(k.replace("MA", "")))
-            game = data[last_key]
-            if "solde" in game and not game["partieJouee"]:
-                user_balance = float(game["solde"])
-            else:
-                user_balance = -1
-        else:
-            user_balance = -1
+        if data is None and LAST_BALANCE is not None:
+            print("Firebase injoignable, solde en cache :", LAST_BALANCE)
+            return LAST_BALANCE
+        user_balance = latest_balance(data)
     except OSError as e:
         print("Erreur réseau ou problème de connexion :", e)
-        user_balance = -1
+        if LAST_BALANCE is not None:
+            return LAST_BALANCE
+        return -1
+    LAST_BALANCE = user_balance if user_balance >= 0 else None
     return user_balance
 
 
+def session_stats():
+    """
+    Retourne les compteurs de la connexion persistante (poignées de main
+    évitées...) et ceux des réservations de parties (conflits...).
+    """
+    stats = SESSION.stats()
+    stats.update(CLAIM_STATS)
+    return stats
+
+
+def dump_metrics():
+    """
+    Affiche sur la console série l'état du disjoncteur et les mesures par
+    point d'accès (requêtes, échecs, nouveaux essais, latences).
+    """
+    METRICS.dump(BREAKER)
+
+
 if __name__ == "__main__":
+    from connexion_wifi import connect_to_wifi
+
     # Exemple d'utilisation
     connect_to_wifi()
     # generate_random()
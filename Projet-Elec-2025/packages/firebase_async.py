@@ -0,0 +1,460 @@
+"""
+Client Firebase asynchrone (uasyncio) pour que le réseau ne bloque jamais la
+boucle de jeu. Les requêtes passent par des connexions keep-alive réutilisées,
+limitées en nombre, avec un délai maximal et l'annulation propre d'une
+requête en cours.
+Les opérations (requête indexée, réservation des parties, file d'attente)
+sont celles de firebase_ops.py, partagées avec les fonctions synchrones de
+firebase.py : seul le transport est asynchrone ici.
+"""
+
+import json
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+import firebase_ops
+from firebase_ops import BODY_JSON, BODY_READ, BODY_STREAM, JSON_BUFFER, latest_balance
+from game_index import key_number
+from json_stream import JsonStream
+from resilience import RETRY_ATTEMPTS, CircuitBreaker, EndpointMetrics, RetryState
+from firebase_session import (
+    DRAIN_LIMIT,
+    build_request,
+    parse_header_line,
+    parse_status_line,
+    split_url,
+)
+
+DEFAULT_TIMEOUT = 5  # secondes
+MAX_CONNECTIONS = 2  # requêtes simultanées au maximum
+
+
+async def stream_readinto(reader, buf):
+    """
+    Lit au plus len(buf) octets du flux dans buf. uasyncio écrit directement
+    dans le tampon ; asyncio (CPython, tests sur l'hôte) n'a que read().
+    """
+    if hasattr(reader, "readinto"):
+        return await reader.readinto(buf)
+    data = await reader.read(len(buf))
+    buf[: len(data)] = data
+    return len(data)
+
+
+class AsyncResponse:
+    """
+    Réponse dont le corps est lu au fil de l'eau sur la connexion uasyncio,
+    par morceaux de la taille du tampon de l'appelant (chunked, content-length
+    ou jusqu'à la fermeture) : la mémoire ne dépend pas de la taille du corps.
+    La réponse garde sa connexion et sa place dans le client jusqu'à close().
+    """
+
+    def __init__(self, client, connection, buffer, status_code, headers, timeout):
+        self._client = client
+        self._connection = connection
+        self.buffer = buffer  # Tampon JsonStream propre à cette connexion
+        self.status_code = status_code
+        self.headers = headers
+        self._timeout = timeout
+        self._chunked = headers.get("transfer-encoding", "").lower() == "chunked"
+        self._keep_alive = headers.get("connection", "").lower() != "close"
+        # Sans longueur ni chunks, le corps se termine à la fermeture de la connexion
+        self._until_close = not self._chunked and "content-length" not in headers
+        if self._until_close:
+            self._remaining = -1 if status_code not in (204, 304) else 0
+            self._keep_alive = False
+        elif self._chunked:
+            self._remaining = 0
+        else:
+            self._remaining = int(headers["content-length"])
+        self._done = not self._chunked and self._remaining == 0
+
+    async def _readinto(self, buf, nbytes):
+        reader = self._connection[0]
+        if self._chunked and self._remaining == 0:
+            line = await reader.readline()
+            if not line:
+                raise OSError("Connexion fermée pendant la lecture du corps")
+            size = int(line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                # Ignore les éventuels en-têtes de fin
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                self._done = True
+                return 0
+            self._remaining = size
+        size = len(buf) if nbytes is None else nbytes
+        if 0 <= self._remaining < size:
+            size = self._remaining
+        count = await stream_readinto(reader, memoryview(buf)[:size])
+        if not count:
+            if self._until_close:
+                self._done = True
+                return 0
+            raise OSError("Connexion fermée pendant la lecture du corps")
+        self._remaining -= count
+        if self._remaining == 0:
+            if self._chunked:
+                await reader.readline()  # CRLF après chaque chunk
+            else:
+                self._done = True
+        return count
+
+    async def readinto(self, buf, nbytes=None):
+        """
+        Lit une partie du corps dans buf. Retourne 0 à la fin du corps.
+        Lève OSError en cas d'erreur réseau ou de délai dépassé.
+        """
+        if self._done or self._connection is None:
+            return 0
+        try:
+            return await asyncio.wait_for(self._readinto(buf, nbytes), self._timeout)
+        except asyncio.TimeoutError:
+            self._client.timeouts += 1
+            self._keep_alive = False
+            raise OSError("Délai dépassé")
+        except (OSError, ValueError, EOFError) as e:
+            self._keep_alive = False
+            raise OSError(f"Erreur de connexion : {e}")
+        except asyncio.CancelledError:
+            self._client.cancelled += 1
+            self._keep_alive = False
+            raise
+
+    async def json(self):
+        """
+        Lit et décode tout le corps (à réserver aux petites réponses).
+        """
+        content = bytearray()
+        while True:
+            count = await self.readinto(self.buffer)
+            if not count:
+                break
+            content.extend(memoryview(self.buffer)[:count])
+        return json.loads(content)
+
+    async def close(self):
+        """
+        Rend la connexion au client : recyclée si le corps a été lu (ou s'il
+        reste peu à lire), fermée sinon.
+        """
+        if self._connection is None:
+            return
+        try:
+            drained = 0
+            while not self._done and self._keep_alive and drained < DRAIN_LIMIT:
+                drained += await self.readinto(self.buffer)
+        except OSError:
+            pass
+        finally:
+            # Sans attente : close() peut suivre l'annulation de la tâche
+            connection, self._connection = self._connection, None
+            if not (self._done and self._keep_alive):
+                try:
+                    connection[1].close()
+                except (OSError, AttributeError):
+                    pass
+                connection = None
+            self._client._release(connection, self.buffer)
+
+
+class AsyncFirebaseClient:
+    """
+    Client REST Firebase à base de flux uasyncio.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        max_connections=MAX_CONNECTIONS,
+        timeout=DEFAULT_TIMEOUT,
+        index=None,
+        breaker=None,
+        metrics=None,
+        attempts=RETRY_ATTEMPTS,
+    ):
+        """
+        Args:
+            base_url (str): URL de la base Firebase.
+            max_connections (int): Nombre maximal de requêtes en cours.
+            timeout (float): Délai maximal d'une requête, en secondes.
+            index (GameIndex): Index local des parties (optionnel).
+            breaker (CircuitBreaker): Disjoncteur, partageable avec firebase.py.
+            metrics (EndpointMetrics): Mesures, partageables avec firebase.py.
+            attempts (int): Nombre maximal d'essais par requête.
+        """
+        self.scheme, self.host, self.port, self.prefix = split_url(base_url)
+        self.index = index
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or EndpointMetrics()
+        self.attempts = attempts
+        self.last_balance = None  # Dernier solde lu, servi si Firebase est injoignable
+        self.latest_key = None  # Clé de la partie la plus récente lue par get_balance
+        self.timeout = timeout
+        self._idle = []  # Connexions (reader, writer) disponibles
+        self._slots = max_connections
+        # Un tampon JsonStream par requête en cours : les corps sont lus en
+        # parallèle, chacun dans le sien
+        self._buffers = [bytearray(len(JSON_BUFFER)) for _ in range(max_connections)]
+        self._slot_freed = asyncio.Event()
+        self.requests = 0
+        self.connections = 0
+        self.timeouts = 0
+        self.cancelled = 0
+
+    async def _acquire(self):
+        while not self._slots:
+            self._slot_freed.clear()
+            await self._slot_freed.wait()
+        self._slots -= 1
+        return (self._idle.pop() if self._idle else None), self._buffers.pop()
+
+    def _release(self, connection, buffer):
+        if connection is not None:
+            self._idle.append(connection)
+        self._buffers.append(buffer)
+        self._slots += 1
+        self._slot_freed.set()
+
+    async def _open(self):
+        ssl = True if self.scheme == "https" else None
+        connection = await asyncio.open_connection(self.host, self.port, ssl=ssl)
+        self.connections += 1
+        return connection
+
+    async def _close(self, connection):
+        try:
+            connection[1].close()
+            await connection[1].wait_closed()
+        except (OSError, AttributeError):
+            pass
+
+    async def _exchange(self, connection, data):
+        reader, writer = connection
+        writer.write(data)
+        await writer.drain()
+        line = await reader.readline()
+        if not line:
+            raise OSError("Connexion fermée par le serveur")
+        status_code, _ = parse_status_line(line)
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, value = parse_header_line(line)
+            headers[name] = value
+        return status_code, headers
+
+    async def request(self, method, path, json_data=None, headers=None, timeout=None):
+        """
+        Envoie une requête et retourne son AsyncResponse, dont le corps reste
+        à lire ; l'appelant doit la fermer (close) pour libérer la connexion.
+        Les erreurs réseau et les réponses 5xx sont réessayées avec une
+        attente exponentielle aléatoire, sauf si le disjoncteur s'ouvre ;
+        la dernière réponse 5xx est rendue à l'appelant.
+        Lève OSError en cas d'erreur réseau ou de délai dépassé, et
+        CircuitOpenError sans appel réseau quand le circuit est ouvert.
+
+        Args:
+            method (str): Verbe HTTP.
+            path (str): Chemin relatif à la base, requête comprise.
+            json_data: Corps à encoder en JSON (optionnel).
+            headers (dict): En-têtes supplémentaires (optionnel).
+            timeout (float): Délai propre à chaque essai (optionnel).
+        """
+        retry = RetryState(method, path, self.breaker, self.metrics, self.attempts)
+        while True:
+            retry.begin()
+            try:
+                response = await self._request_once(method, path, json_data, headers, timeout)
+            except OSError:
+                delay = retry.failed()
+                if delay < 0:
+                    raise
+            else:
+                delay = retry.answered(response.status_code)
+                if delay < 0:
+                    return response  # Réponse < 500 ou dernière 5xx, traitée par l'appelant
+                await response.close()
+            await asyncio.sleep(delay / 1000)
+
+    async def _request_once(self, method, path, json_data=None, headers=None, timeout=None):
+        """
+        Un seul essai de requête, sans nouvel essai ni disjoncteur.
+        Une requête annulée ferme sa connexion avant de propager CancelledError.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        body = None
+        request_headers = {"Accept": "application/json"}
+        if headers:
+            request_headers.update(headers)
+        if json_data is not None:
+            body = json.dumps(json_data).encode()
+            request_headers["Content-Type"] = "application/json"
+        data = build_request(method, self.host, self.prefix + path, request_headers, body)
+        connection, buffer = await self._acquire()
+        self.requests += 1
+        try:
+            for attempt in range(2):
+                reused = connection is not None
+                if connection is None:
+                    connection = await asyncio.wait_for(self._open(), timeout)
+                try:
+                    status_code, response_headers = await asyncio.wait_for(
+                        self._exchange(connection, data), timeout
+                    )
+                except (OSError, ValueError, EOFError) as e:
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise
+                    await self._close(connection)
+                    connection = None
+                    # Connexion recyclée fermée par le serveur : un seul nouvel essai
+                    if reused and attempt == 0:
+                        continue
+                    raise OSError(f"Erreur de connexion : {e}")
+                response = AsyncResponse(
+                    self, connection, buffer, status_code, response_headers, timeout
+                )
+                buffer = None  # Connexion et tampon rendus par response.close()
+                return response
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            if connection is not None:
+                await self._close(connection)
+                connection = None
+            raise OSError("Délai dépassé")
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            if connection is not None:
+                await self._close(connection)
+                connection = None
+            raise
+        finally:
+            if buffer is not None:
+                self._release(connection, buffer)
+
+    async def close(self):
+        """
+        Ferme les connexions inactives.
+        """
+        while self._idle:
+            await self._close(self._idle.pop())
+
+    async def run(self, operation):
+        """
+        Exécute une opération de firebase_ops et retourne son résultat.
+        Chaque requête passe par request() (nouveaux essais, disjoncteur) ;
+        le corps est lu morceau par morceau dans le tampon de la connexion
+        (étapes BODY_STREAM et BODY_READ). Une erreur réseau est relancée
+        dans l'opération qui la traite.
+        """
+        response = None
+        reply = None
+        error = None
+        try:
+            while True:
+                try:
+                    if error is not None:
+                        step = operation.throw(error)
+                    else:
+                        step = operation.send(reply)
+                except StopIteration as e:
+                    return e.value
+                reply = error = None
+                try:
+                    if step[0] == BODY_STREAM:
+                        reply = JsonStream(None, response.buffer)
+                    elif step[0] == BODY_READ:
+                        stream = step[1]
+                        stream.feed(await response.readinto(stream.space()))
+                    elif step[0] == BODY_JSON:
+                        reply = await response.json()
+                    else:
+                        if response is not None:
+                            await response.close()
+                            response = None
+                        response = reply = await self.request(*step)
+                except (OSError, ValueError) as e:
+                    error = e
+        finally:
+            if response is not None:
+                await response.close()
+
+    async def fetch_unplayed_games(self):
+        """
+        Version asynchrone de firebase.fetch_unplayed_games, lecture complète
+        comprise quand la requête indexée est refusée.
+        """
+        return await self.run(firebase_ops.fetch_unplayed_games())
+
+    async def get_balance(self):
+        """
+        Version asynchrone de get_balance_from_firebase : solde de la partie
+        la plus récente, -1 si elle est déjà jouée ou si la base est vide.
+        """
+        data = await self.run(firebase_ops.fetch_latest_game())
+        if data is None and self.last_balance is not None:
+            print("Firebase injoignable, solde en cache :", self.last_balance)
+            return self.last_balance
+        if data:
+            self.latest_key = max(data, key=key_number)
+        balance = latest_balance(data)
+        self.last_balance = balance if balance >= 0 else None
+        return balance
+
+    async def query_free_keys(self):
+        """
+        Version asynchrone de firebase.query_free_keys (recale l'index).
+        """
+        return await self.run(firebase_ops.query_free_keys(self.index))
+
+    async def update_first_unplayed_game(self, updated_data):
+        """
+        Version asynchrone de firebase.update_first_unplayed_game.
+        Retourne la clé mise à jour, ou None.
+        """
+        return await self.run(firebase_ops.update_first_unplayed_game(updated_data, self.index))
+
+    async def flush_spin_queue(self, queue, free_keys=None):
+        """
+        Version asynchrone de firebase.flush_spin_queue : un seul PATCH
+        multi-chemins pour tous les résultats en attente.
+        Retourne True si la file est vide après l'appel.
+        """
+        return await self.run(firebase_ops.flush_spin_queue(queue, free_keys, self.index))
+
+    async def claim_game(self, key, updated_data, game=None, etag=None):
+        """
+        Version asynchrone de firebase.claim_game (PUT conditionnel avec
+        if-match). Retourne True, False (partie prise) ou None (erreur).
+        """
+        return await self.run(firebase_ops.claim_game(key, updated_data, game, etag))
+
+    async def claim_spin_queue(self, queue, free_keys=None):
+        """
+        Version asynchrone de firebase.claim_spin_queue.
+        Retourne True si la file est vide après l'appel.
+        """
+        return await self.run(firebase_ops.claim_spin_queue(queue, free_keys, self.index))
+
+    def dump_metrics(self):
+        """
+        Affiche sur la console série le disjoncteur et les mesures par point d'accès.
+        """
+        self.metrics.dump(self.breaker)
+
+    def stats(self):
+        """
+        Compteurs du client (requêtes, connexions ouvertes, délais, annulations).
+        """
+        return {
+            "requests": self.requests,
+            "handshakes": self.connections,
+            "handshakes_avoided": self.requests - self.connections,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+        }
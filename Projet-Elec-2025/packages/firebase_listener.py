@@ -0,0 +1,341 @@
+"""
+Écoute en temps réel des parties non jouées via l'API REST de streaming de
+Firebase (text/event-stream).
+Le module garde en mémoire un miroir des parties non jouées (partieJouee et
+solde) : la boucle principale lit le solde et la partie active sans attendre
+le réseau. Le flux est ouvert (et rouvert) par la tâche réseau avec connect(),
+sans bloquer ; poll() traite les événements reçus sans jamais bloquer.
+"""
+
+import json
+import select
+import socket
+
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+from firebase_session import (
+    build_request,
+    parse_header_line,
+    parse_status_line,
+    split_url,
+)
+from ticks import ticks_ms, ticks_diff, ticks_add
+from game_index import is_game_key, key_number
+
+UNPLAYED_STREAM_QUERY = "orderBy=%22partieJouee%22&equalTo=false"
+MIRROR_FIELDS = ("partieJouee", "solde")
+READ_SIZE = 256
+RECONNECT_DELAY_MS = 5000
+CONNECT_TIMEOUT = 10  # secondes, poignée de main TLS comprise
+
+
+def stream_socket(writer):
+    """
+    Socket non bloquant d'une connexion ouverte par asyncio.open_connection,
+    lu directement par poll(). uasyncio l'expose (TLS compris) ; sur CPython
+    (tests sur l'hôte, http seulement), la lecture par le transport est
+    suspendue et le socket dupliqué.
+    """
+    sock = getattr(writer, "s", None)
+    if sock is not None:
+        return sock
+    writer.transport.pause_reading()
+    raw = writer.get_extra_info("socket")
+    sock = socket.fromfd(raw.fileno(), raw.family, raw.type)
+    sock.setblocking(False)
+    return sock
+
+
+class FirebaseListener:
+    """
+    Miroir local des parties non jouées, tenu à jour par les événements
+    'put' et 'patch' du flux Firebase.
+    """
+
+    def __init__(self, base_url, path="/.json", query=UNPLAYED_STREAM_QUERY):
+        """
+        Args:
+            base_url (str): URL de la base Firebase.
+            path (str): Emplacement écouté.
+            query (str): Paramètres de requête du flux (filtre des parties non jouées).
+        """
+        self.scheme, self.host, self.port, self.prefix = split_url(base_url)
+        self.path = f"{path}?{query}" if query else path
+        self.games = {}  # {clé: {champ: valeur}} des parties non jouées
+        self.connected = False  # En-tête 200 reçu
+        self.synced = False  # Premier 'put' complet reçu
+        self.failed = False  # Flux refusé par le serveur (pas de nouvel essai)
+        self.events = 0
+        # Numéro de la partie la plus récente vue, jouée ou non : une partie
+        # jouée quitte le miroir mais reste la plus récente
+        self.latest_number = 0
+        self._sock = None
+        self._writer = None
+        self._poller = None
+        self._readinto = None
+        self._buf = bytearray(READ_SIZE)
+        self._retry_at = None
+        self._reset_parser()
+
+    def _reset_parser(self):
+        self._raw = b""
+        self._lines = b""
+        self._head_done = False
+        self._chunked = False
+        self._chunk_left = 0
+        self._skip = 0
+        self._event = None
+        self._data = b""
+
+    def reconnect_due(self):
+        """
+        Vrai si le flux est fermé et qu'il est temps de le (r)ouvrir.
+        """
+        return (
+            self._sock is None
+            and not self.failed
+            and (self._retry_at is None or ticks_diff(ticks_ms(), self._retry_at) >= 0)
+        )
+
+    async def connect(self):
+        """
+        Ouvre le flux sans bloquer la boucle de jeu (asyncio.open_connection),
+        depuis la tâche réseau une fois le Wi-Fi connecté. En cas d'échec, un
+        nouvel essai est prévu après RECONNECT_DELAY_MS.
+        """
+        self.close()
+        self._retry_at = None
+        request = build_request(
+            "GET", self.host, self.prefix + self.path, {"Accept": "text/event-stream"}, None
+        )
+        try:
+            _, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(
+                    self.host, self.port, ssl=True if self.scheme == "https" else None
+                ),
+                CONNECT_TIMEOUT,
+            )
+            sock = stream_socket(self._writer)
+            self._writer.write(request)
+            await self._writer.drain()
+        except (OSError, asyncio.TimeoutError) as e:
+            print("Erreur réseau ou problème de connexion :", e)
+            self._schedule_retry()
+            return
+        self._sock = sock
+        self._readinto = getattr(sock, "recv_into", None) or sock.readinto
+        self._poller = select.poll()
+        self._poller.register(sock, select.POLLIN)
+
+    def close(self):
+        """
+        Ferme le flux. Le miroir est conservé mais n'est plus tenu à jour.
+        """
+        for stream in (self._sock, self._writer):
+            if stream is not None:
+                try:
+                    stream.close()
+                except (OSError, RuntimeError):
+                    pass
+        self._sock = None
+        self._writer = None
+        self._poller = None
+        self.connected = False
+        self.synced = False
+        self._reset_parser()
+
+    def _schedule_retry(self):
+        self.close()
+        self._retry_at = ticks_add(ticks_ms(), RECONNECT_DELAY_MS)
+
+    def _readable(self):
+        return bool(self._poller.poll(0))
+
+    def poll(self):
+        """
+        Traite sans bloquer toutes les données disponibles sur le flux déjà
+        ouvert ; un flux fermé est rouvert par connect(), pas ici.
+        Retourne le nombre d'événements 'put'/'patch' appliqués au miroir.
+        """
+        if self._sock is None:
+            return 0
+        applied = 0
+        try:
+            while self._sock is not None and self._readable():
+                count = self._readinto(self._buf)
+                if count is None:
+                    break  # Enregistrement TLS incomplet : la suite au prochain appel
+                if not count:
+                    raise OSError("Flux fermé par le serveur")
+                applied += self._feed(bytes(self._buf[:count]))
+        except (OSError, ValueError) as e:
+            print("Erreur du flux Firebase :", e)
+            self._schedule_retry()
+        return applied
+
+    def _feed(self, data):
+        self._raw += data
+        if not self._head_done:
+            end = self._raw.find(b"\r\n\r\n")
+            if end < 0:
+                return 0
+            lines = self._raw[:end].split(b"\r\n")
+            self._raw = self._raw[end + 4 :]
+            status_code, _ = parse_status_line(lines[0])
+            headers = dict(parse_header_line(line) for line in lines[1:])
+            if status_code in (301, 302, 307, 308) and "location" in headers:
+                # Firebase peut rediriger le flux vers un autre serveur
+                self._follow(headers["location"])
+                return 0
+            if status_code != 200:
+                print(f"Flux Firebase refusé : HTTP {status_code}")
+                self.close()
+                self.failed = True
+                return 0
+            self._chunked = headers.get("transfer-encoding", "").lower() == "chunked"
+            self._head_done = True
+            self.connected = True
+        if not self._chunked:
+            body, self._raw = self._raw, b""
+            return self._feed_lines(body)
+        applied = 0
+        while self._raw:
+            if self._skip:
+                # CRLF qui termine le chunk précédent
+                count = min(self._skip, len(self._raw))
+                self._raw = self._raw[count:]
+                self._skip -= count
+                continue
+            if not self._chunk_left:
+                end = self._raw.find(b"\r\n")
+                if end < 0:
+                    break
+                size = int(self._raw[:end].split(b";")[0].strip() or b"0", 16)
+                self._raw = self._raw[end + 2 :]
+                if not size:
+                    raise OSError("Flux terminé par le serveur")
+                self._chunk_left = size
+            count = min(self._chunk_left, len(self._raw))
+            applied += self._feed_lines(self._raw[:count])
+            self._raw = self._raw[count:]
+            self._chunk_left -= count
+            if not self._chunk_left:
+                self._skip = 2
+        return applied
+
+    def _follow(self, location):
+        scheme, _, rest = location.partition("://")
+        host, _, path = rest.partition("/")
+        self.scheme, self.host, self.port, self.prefix = split_url(f"{scheme}://{host}")
+        self.path = "/" + path
+        self.close()
+        self._retry_at = None  # Rouvert aussitôt par la tâche réseau
+
+    def _feed_lines(self, data):
+        self._lines += data
+        applied = 0
+        while True:
+            end = self._lines.find(b"\n")
+            if end < 0:
+                return applied
+            line = self._lines[:end].rstrip(b"\r")
+            self._lines = self._lines[end + 1 :]
+            if line:
+                if line.startswith(b"event:"):
+                    self._event = line[6:].strip().decode()
+                elif line.startswith(b"data:"):
+                    self._data = line[5:].strip()
+                continue
+            # Ligne vide : fin de l'événement
+            event, data = self._event, self._data
+            self._event, self._data = None, b""
+            if event in ("put", "patch"):
+                message = json.loads(data)
+                self.apply(event, message["path"], message["data"])
+                applied += 1
+            elif event in ("cancel", "auth_revoked"):
+                raise OSError(f"Flux Firebase interrompu ({event})")
+
+    def apply(self, event, path, data):
+        """
+        Applique un événement 'put' ou 'patch' au miroir.
+
+        Args:
+            event (str): "put" ou "patch".
+            path (str): Chemin de l'événement ("/", "/MA5", "/MA5/solde"...).
+            data: Données JSON de l'événement.
+        """
+        parts = [part for part in path.split("/") if part]
+        if event == "patch":
+            for child, value in data.items():
+                self._put(parts + [part for part in child.split("/") if part], value)
+        else:
+            self._put(parts, data)
+        self.events += 1
+        if not parts and event == "put":
+            self.synced = True
+
+    def _put(self, parts, value):
+        if not parts:
+            self.games = {}
+            if isinstance(value, dict):
+                for key, game in value.items():
+                    self._put([key], game)
+            return
+        key = parts[0]
+        self.seen(key)
+        if len(parts) == 1:
+            if isinstance(value, dict):
+                self.games[key] = {f: value[f] for f in MIRROR_FIELDS if f in value}
+            else:
+                self.games.pop(key, None)
+        elif len(parts) == 2 and parts[1] in MIRROR_FIELDS:
+            game = self.games.setdefault(key, {})
+            if value is None:
+                game.pop(parts[1], None)
+            else:
+                game[parts[1]] = value
+        if self.games.get(key, {}).get("partieJouee") is True:
+            del self.games[key]
+
+    def seen(self, key):
+        """
+        Note une partie connue par ailleurs (requête REST du solde) : le flux
+        filtré ne montre pas les parties déjà jouées à l'ouverture.
+        """
+        if key is not None and is_game_key(key):
+            self.latest_number = max(self.latest_number, key_number(key))
+
+    def unplayed_keys(self):
+        """
+        Clés des parties non jouées du miroir, triées par numéro croissant.
+        """
+        keys = [
+            k for k, g in self.games.items() if is_game_key(k) and g.get("partieJouee") is False
+        ]
+        keys.sort(key=key_number)
+        return keys
+
+    def active_game(self):
+        """
+        Clé de la prochaine partie à jouer, ou None.
+        """
+        keys = self.unplayed_keys()
+        return keys[0] if keys else None
+
+    def balance(self):
+        """
+        Solde de la partie la plus récente (même règle que
+        firebase_ops.latest_balance) : -1 si elle est déjà jouée, s'il n'y en
+        a pas ou si elle n'a pas de solde.
+        """
+        keys = self.unplayed_keys()
+        if not keys or key_number(keys[-1]) < self.latest_number:
+            return -1
+        game = self.games[keys[-1]]
+        if "solde" not in game:
+            return -1
+        return float(game["solde"])
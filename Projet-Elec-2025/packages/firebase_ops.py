@@ -0,0 +1,593 @@
+"""
+Opérations Firebase indépendantes du transport, partagées par les fonctions
+synchrones de firebase.py et par le client asynchrone (firebase_async.py).
+
+Chaque opération est un générateur : elle produit les requêtes sous la forme
+(méthode, chemin, corps, en-têtes) et reçoit la réponse de chacune
+(status_code, headers). Le corps de la dernière réponse est lu par des étapes
+à part, pour que le transport asynchrone puisse attendre les octets :
+(BODY_STREAM,) reçoit un JsonStream sur le corps, (BODY_READ, stream) remplit
+ce JsonStream quand il est vide, (BODY_JSON,) reçoit le corps décodé (petites
+réponses seulement). Une erreur réseau est relancée dans le générateur
+(throw), qui la traite comme une requête synchrone. Le résultat de
+l'opération est la valeur de retour du générateur. Seul le transport change :
+run() pour une session synchrone, AsyncFirebaseClient.run() pour les flux
+uasyncio.
+"""
+
+from json_stream import (
+    ARRAY_END,
+    ARRAY_START,
+    EOF,
+    KEY,
+    OBJECT_END,
+    OBJECT_START,
+    VALUE,
+    JsonStream,
+    NeedData,
+)
+from game_index import is_game_key, key_number
+
+# Requête indexée sur 'partieJouee' (nécessite la règle ".indexOn" décrite dans
+# le README). Firebase classe les ex aequo par clé sous forme de chaîne
+# ("MA10" avant "MA9") : une fenêtre limitToFirst peut donc manquer la plus
+# petite clé numérique. On lit toutes les parties non jouées (en flux, seuls
+# GAME_FIELDS sont gardés) et l'ordre numérique est appliqué ici.
+UNPLAYED_QUERY = "orderBy=%22partieJouee%22&equalTo=false"
+# Seuls ces champs sont conservés lors du parcours d'une réponse : le reste
+# (combinaisons...) est sauté au fil de la lecture.
+GAME_FIELDS = ("partieJouee", "solde")
+JSON_BUFFER = bytearray(256)  # Tampon de lecture réutilisé par JsonStream
+
+# Partie la plus récente : le champ numérique 'numero' (écrit par le site avec
+# la clé MA<n>) est trié comme un nombre, contrairement aux clés.
+LATEST_QUERY = "orderBy=%22numero%22&limitToLast=1"
+LATEST_FIELDS = GAME_FIELDS + ("numero",)
+
+ETAG_HEADERS = {"X-Firebase-ETag": "true"}
+CLAIM_ATTEMPTS = 3  # Écritures conditionnelles tentées par partie
+CLAIM_STATS = {"claimed": 0, "conflicts": 0, "etag_retries": 0}
+
+# Étapes de lecture du corps de la dernière réponse
+BODY_STREAM = "STREAM"
+BODY_READ = "READ"
+BODY_JSON = "JSON"
+
+# États de scan_games
+_ROOT, _ENTRY, _GAME, _FIELD, _FIELD_VALUE, _SKIP = range(6)
+
+
+def game_number(key):
+    """
+    Retourne le numéro d'une clé de partie ('MA12' -> 12).
+    """
+    return key_number(key)
+
+
+def first_unplayed_game(data):
+    """
+    Retourne (clé, partie) de la première partie non jouée de data, ou (None, None).
+    Les clés qui ne sont pas de la forme 'MA<n>' sont ignorées.
+    """
+    first_key = None
+    first_number = 0
+    for key, value in data.items():
+        # Par défaut, considère True si la clé est absente
+        if not is_game_key(key) or value.get("partieJouee", True):
+            continue
+        number = game_number(key)
+        if first_key is None or number < first_number:
+            first_key, first_number = key, number
+    if first_key is None:
+        return None, None
+    return first_key, data[first_key]
+
+
+def unplayed_keys(data):
+    """
+    Retourne les clés des parties non jouées de data, triées par numéro croissant.
+    """
+    keys = [
+        key
+        for key, value in data.items()
+        if is_game_key(key) and not value.get("partieJouee", True)
+    ]
+    keys.sort(key=game_number)
+    return keys
+
+
+def latest_balance(data):
+    """
+    Solde lu sur la partie la plus récente de data ({clé: partie}) : -1 si
+    data est vide, si cette partie est déjà jouée ou si elle n'a pas de solde.
+    """
+    keys = [key for key in data or () if is_game_key(key)]
+    if not keys:
+        return -1
+    game = data[max(keys, key=game_number)]
+    if "solde" in game and not game.get("partieJouee", True):
+        return float(game["solde"])
+    return -1
+
+
+def scan_games(stream, fields=GAME_FIELDS):
+    """
+    Parcourt un objet {clé: partie} au fil de la lecture et produit
+    (clé, {champ: valeur}) en ne construisant que les champs demandés, qui
+    doivent être des valeurs simples (un objet ou un tableau est sauté). Une
+    partie qui n'est pas un objet est produite vide.
+    Avec un JsonStream alimenté, produit None quand le tampon doit être
+    complété (space() puis feed()) avant de reprendre. L'appelant peut
+    s'arrêter à tout moment.
+    """
+    state = _ROOT
+    key = field = game = None
+    depth = 0  # Profondeur de la valeur sautée
+    resume = _FIELD  # État qui suit la valeur sautée
+    while True:
+        keep = state != _SKIP and (state != _FIELD_VALUE or field in fields)
+        try:
+            event = stream.next_event(keep)
+        except NeedData:
+            yield None
+            continue
+        if event == EOF:
+            if state == _ROOT:
+                raise ValueError("Objet JSON attendu")
+            raise ValueError("JSON tronqué")
+        if state == _ROOT:
+            if event == VALUE and stream.value is None:
+                return
+            if event != OBJECT_START:
+                raise ValueError("Objet JSON attendu")
+            state = _ENTRY
+        elif state == _ENTRY:
+            if event == OBJECT_END:
+                return
+            if event != KEY:
+                raise ValueError("Clé JSON attendue")
+            key = stream.value
+            state = _GAME
+        elif state == _GAME:
+            game = {}
+            if event == OBJECT_START:
+                state = _FIELD
+            elif event == ARRAY_START:
+                depth, resume, state = 1, _ENTRY, _SKIP
+            elif event == VALUE:
+                state = _ENTRY
+                yield key, game
+            else:
+                raise ValueError("Valeur JSON attendue")
+        elif state == _FIELD:
+            if event == OBJECT_END:
+                state = _ENTRY
+                yield key, game
+            elif event == KEY:
+                field = stream.value
+                state = _FIELD_VALUE
+            else:
+                raise ValueError("Clé JSON attendue")
+        elif state == _FIELD_VALUE:
+            if event == VALUE:
+                if field in fields:
+                    game[field] = stream.value
+                state = _FIELD
+            elif event == OBJECT_START or event == ARRAY_START:
+                depth, resume, state = 1, _FIELD, _SKIP
+            else:
+                raise ValueError("Valeur JSON attendue")
+        else:
+            if event == OBJECT_START or event == ARRAY_START:
+                depth += 1
+            elif event == OBJECT_END or event == ARRAY_END:
+                depth -= 1
+            if not depth:
+                state = resume
+                if state == _ENTRY:
+                    yield key, game
+
+
+def scan_body(on_game, fields=GAME_FIELDS):
+    """
+    Opération : parcourt le corps de la dernière réponse avec scan_games et
+    appelle on_game(clé, partie) pour chaque partie, sans garder le corps.
+    """
+    stream = yield (BODY_STREAM,)
+    for item in scan_games(stream, fields):
+        if item is None:
+            yield (BODY_READ, stream)
+        else:
+            on_game(*item)
+
+
+def is_own_result(game, updated_data):
+    """
+    Vrai si la partie porte déjà exactement le résultat envoyé (envoi
+    précédent reçu par Firebase mais dont la réponse s'est perdue).
+    """
+    if not isinstance(game, dict):
+        return False
+    for field, value in updated_data.items():
+        if game.get(field) != value:
+            return False
+    return True
+
+
+def claim_body(game, updated_data):
+    """
+    Corps du PUT conditionnel qui réserve la partie : sa valeur actuelle
+    complétée par le résultat. None si la partie n'est plus libre.
+    """
+    if not isinstance(game, dict) or game.get("partieJouee") is not False:
+        return None
+    body = dict(game)
+    body.update(updated_data)
+    return body
+
+
+def close_response(response):
+    if response:
+        try:
+            response.close()
+        except AttributeError:
+            pass
+
+
+def send(session, method, path, body=None, headers=None):
+    """
+    Envoie une requête par une session synchrone (FirebaseSession ou
+    ResilientSession) et retourne sa réponse.
+    """
+    call = getattr(session, method.lower())
+    args = (path,) if method == "GET" else (path, body)
+    if headers:
+        return call(*args, headers=headers)
+    return call(*args)
+
+
+def run(operation, session):
+    """
+    Exécute une opération avec une session synchrone et retourne son
+    résultat. Chaque réponse est fermée dès que l'opération passe à la
+    requête suivante. Le corps est lu directement par le JsonStream
+    (readinto bloquant) : l'étape BODY_READ n'a pas lieu.
+    """
+    response = None
+    reply = None
+    error = None
+    try:
+        while True:
+            try:
+                if error is not None:
+                    step = operation.throw(error)
+                else:
+                    step = operation.send(reply)
+            except StopIteration as e:
+                return e.value
+            reply = error = None
+            try:
+                if step[0] == BODY_STREAM:
+                    reply = JsonStream(response, JSON_BUFFER)
+                elif step[0] == BODY_JSON:
+                    reply = response.json()
+                else:
+                    close_response(response)
+                    response = None
+                    response = reply = send(session, *step)
+            except (OSError, ValueError) as e:
+                error = e
+    finally:
+        close_response(response)
+
+
+def report_error(error):
+    """
+    Affiche une erreur d'opération comme les fonctions synchrones d'origine.
+    """
+    if isinstance(error, OSError):
+        print("Erreur réseau ou problème de connexion :", error)
+    elif isinstance(error, ValueError):
+        print("Erreur lors de la conversion JSON :", error)
+    else:
+        print("Erreur HTTP :", error)
+
+
+def fetch_unplayed_games():
+    """
+    Opération : toutes les parties non jouées via la requête indexée.
+    Si le serveur refuse la requête (index absent), parcourt toute la base en
+    flux sans la charger en mémoire.
+    Résultat : {clé: {champ: valeur}} limité à GAME_FIELDS, ou None en cas
+    d'erreur.
+    """
+    try:
+        response = yield ("GET", f"/.json?{UNPLAYED_QUERY}", None, None)
+        if response.status_code == 400:
+            # Règle ".indexOn" absente : on retombe sur la lecture complète
+            print("Requête indexée refusée, lecture complète de la base.")
+            response = yield ("GET", "/.json", None, None)
+        if response.status_code != 200:
+            raise RuntimeError(f"Erreur HTTP : {response.status_code}")
+        games = {}
+
+        def keep(key, game):
+            if is_game_key(key) and not game.get("partieJouee", True):
+                games[key] = game
+
+        yield from scan_body(keep)
+        return games
+    except (OSError, ValueError, RuntimeError) as e:
+        report_error(e)
+    return None
+
+
+def fetch_latest_game():
+    """
+    Opération : seulement la partie la plus récente de la base, jouée ou non,
+    sous la forme {clé: partie} ({} si la base est vide).
+    Firebase trie les clés '$key' comme des chaînes ("MA99" après "MA100") :
+    la requête porte sur le champ numérique 'numero'. Si ce champ manque
+    (parties créées avant son ajout) ou si le serveur refuse la requête
+    (index absent), la base est parcourue en flux en ne gardant que la plus
+    grande clé numérique.
+    Résultat : None en cas d'erreur.
+    """
+    try:
+        response = yield ("GET", f"/.json?{LATEST_QUERY}", None, None)
+        if response.status_code == 200:
+            latest = {}
+            seen = []
+
+            def keep(key, game):
+                seen.append(key)
+                if is_game_key(key) and "numero" in game:
+                    latest[key] = game
+
+            yield from scan_body(keep, LATEST_FIELDS)
+            # Les parties sans 'numero' sont classées en premier : si la
+            # dernière n'en a pas, aucune n'en a
+            if latest or not seen:
+                return latest
+            print("Champ 'numero' absent, lecture complète de la base.")
+        elif response.status_code == 400:
+            print("Requête indexée refusée, lecture complète de la base.")
+        else:
+            raise RuntimeError(f"Erreur HTTP : {response.status_code}")
+        response = yield ("GET", "/.json", None, None)
+        if response.status_code != 200:
+            raise RuntimeError(f"Erreur HTTP : {response.status_code}")
+        latest = {}
+
+        def keep(key, game):
+            if is_game_key(key) and (
+                not latest or game_number(key) > game_number(next(iter(latest)))
+            ):
+                latest.clear()
+                latest[key] = game
+
+        yield from scan_body(keep)
+        return latest
+    except (OSError, ValueError, RuntimeError) as e:
+        report_error(e)
+    return None
+
+
+def fetch_first_unplayed_game():
+    """
+    Opération : (clé, partie) de la première partie non jouée, ou
+    (None, None) si aucune partie n'est disponible ou en cas d'erreur.
+    """
+    data = yield from fetch_unplayed_games()
+    if not data:
+        return None, None
+    return first_unplayed_game(data)
+
+
+def query_free_keys(index=None):
+    """
+    Opération : clés des parties non jouées (requête indexée) triées par
+    numéro, ou None en cas d'erreur. Recale l'index s'il est fourni.
+
+    Args:
+        index (GameIndex): Index local des parties (optionnel).
+    """
+    data = yield from fetch_unplayed_games()
+    if data is None:
+        return None
+    keys = unplayed_keys(data)
+    if index is not None:
+        index.resync(keys)
+    return keys
+
+
+def claim_game(key, updated_data, game=None, etag=None):
+    """
+    Opération : réserve et écrit la partie `key` en une seule écriture
+    conditionnelle (PUT avec if-match) : la partie passe de non jouée à jouée
+    avec le résultat, ou rien n'est écrit si elle a changé depuis sa lecture.
+    Sur un conflit (412), Firebase renvoie la valeur et l'ETag actuels :
+    on réécrit sans relire, seulement si la partie est toujours libre.
+    Résultat : True si la partie porte le résultat, False si une autre
+    machine l'a prise, None en cas d'erreur (à réessayer plus tard).
+
+    Args:
+        key (str): Clé 'MA<n>' de la partie.
+        updated_data (dict): Résultat de la partie.
+        game (dict): Valeur de la partie déjà lue avec son ETag (optionnel).
+        etag (str): ETag de cette valeur, None pour la lire d'abord.
+    """
+    try:
+        if etag is None:
+            response = yield ("GET", f"/{key}.json", None, ETAG_HEADERS)
+            if response.status_code != 200:
+                raise RuntimeError(f"Erreur HTTP : {response.status_code}")
+            etag = response.headers.get("etag")
+            game = yield (BODY_JSON,)
+        for _ in range(CLAIM_ATTEMPTS):
+            if is_own_result(game, updated_data):
+                CLAIM_STATS["claimed"] += 1
+                return True
+            body = claim_body(game, updated_data)
+            if body is None:
+                CLAIM_STATS["conflicts"] += 1
+                print(f"Partie {key} déjà prise par une autre machine")
+                return False
+            if etag is None:
+                raise RuntimeError("ETag absent de la réponse")
+            response = yield ("PUT", f"/{key}.json", body, {"if-match": etag})
+            if response.status_code == 200:
+                CLAIM_STATS["claimed"] += 1
+                print(f"Données mises à jour pour la partie {key}")
+                return True
+            if response.status_code != 412:
+                raise RuntimeError(f"Erreur HTTP : {response.status_code}")
+            # La partie a changé depuis la lecture : le 412 porte la nouvelle valeur
+            CLAIM_STATS["etag_retries"] += 1
+            etag = response.headers.get("etag")
+            game = yield (BODY_JSON,)
+        print(f"Partie {key} modifiée pendant l'écriture, nouvel essai plus tard")
+    except (OSError, ValueError, RuntimeError) as e:
+        report_error(e)
+    return None
+
+
+def update_first_unplayed_game(updated_data, index=None):
+    """
+    Opération : met à jour la première partie non jouée avec le résultat.
+    Avec un index local, la partie visée est connue sans requête de recherche
+    et réservée par une écriture conditionnelle ; un conflit resynchronise
+    l'index.
+    Résultat : la clé mise à jour, ou None.
+
+    Args:
+        updated_data (dict): Résultat de la partie.
+        index (GameIndex): Index local des parties (optionnel).
+    """
+    if index is not None and index.next_key() is not None:
+        key = index.next_key()
+        result = yield from claim_game(key, updated_data)
+        if result:
+            index.played(key)
+            return key
+        if result is None:
+            return None
+        index.resync([])  # Partie prise ou absente : curseur à relire
+    key, _ = yield from fetch_first_unplayed_game()
+    if key is None:
+        print("Aucune partie non jouée trouvée.")
+        return None
+    try:
+        response = yield ("PATCH", f"/{key}.json", updated_data, None)
+        if response.status_code != 200:
+            raise RuntimeError(f"Erreur HTTP : {response.status_code}")
+        print(f"Données mises à jour pour la partie {key}")
+        if index is not None:
+            index.played(key)
+        return key
+    except (OSError, ValueError, RuntimeError) as e:
+        report_error(e)
+    return None
+
+
+def flush_spin_queue(queue, free_keys=None, index=None):
+    """
+    Opération : envoie tous les résultats en attente dans la file en un seul
+    PATCH multi-chemins à la racine. Les résultats sans clé reçoivent
+    d'abord les premières parties non jouées.
+    Avec un index local, ces parties suivent son curseur sans requête de
+    recherche, tant qu'elles ont été vues non jouées à sa dernière
+    resynchronisation ; sinon (index vide ou dépassé), la requête indexée
+    recale l'index.
+    Résultat : True si la file est vide après l'appel.
+
+    Args:
+        queue (SpinQueue): File des résultats en attente.
+        free_keys (list): Parties non jouées déjà connues (miroir temps réel),
+            pour éviter la requête de recherche. None pour interroger Firebase.
+        index (GameIndex): Index local, avancé après l'envoi (optionnel).
+    """
+    if not queue.pending:
+        return True
+    if queue.unassigned_count():
+        if free_keys is None and index is not None:
+            # Les clés déjà attribuées suivent aussi le curseur : assign les saute
+            free_keys = index.candidates(len(queue.pending), known=True) or None
+        if free_keys is None:
+            # Les clés déjà attribuées sont encore non jouées côté serveur
+            free_keys = yield from query_free_keys(index)
+            if free_keys is None:
+                return False
+        queue.assign(free_keys)
+    body = queue.multipath_body()
+    if not body:
+        print("Aucune partie non jouée trouvée.")
+        return False
+    try:
+        response = yield ("PATCH", "/.json", body, None)
+        if response.status_code != 200:
+            raise RuntimeError(f"Erreur HTTP : {response.status_code}")
+        sent = [entry[0] for entry in queue.pending if entry[0] is not None]
+        queue.commit()
+        if index is not None:
+            index.played(max(sent, key=key_number))
+        print(f"{len(sent)} partie(s) envoyée(s) depuis la file d'attente")
+    except (OSError, ValueError, RuntimeError) as e:
+        report_error(e)
+    return not queue.pending
+
+
+def claim_spin_queue(queue, free_keys=None, index=None):
+    """
+    Opération : variante de flush_spin_queue pour plusieurs machines sur une
+    même base. Chaque résultat réserve sa partie avec claim_game. Une partie
+    prise par une autre machine est remplacée par la suivante ; un résultat
+    déjà reçu (nouvel essai) n'est pas réécrit.
+    Avec un index local, les parties visées suivent son curseur sans requête
+    de recherche ; la requête indexée n'est faite qu'au premier conflit.
+    Résultat : True si la file est vide après l'appel.
+
+    Args:
+        queue (SpinQueue): File des résultats en attente.
+        free_keys (list): Parties non jouées déjà connues (miroir temps réel),
+            pour éviter la requête de recherche. None pour interroger Firebase.
+        index (GameIndex): Index local des parties (optionnel).
+    """
+    if not queue.pending:
+        return True
+    resynced = False
+    if free_keys is None and queue.unassigned_count():
+        if index is not None and index.next_key() is not None:
+            free_keys = index.candidates(queue.unassigned_count())
+        else:
+            free_keys = yield from query_free_keys(index)
+            if free_keys is None:
+                return False
+            resynced = True
+    candidates = iter(free_keys or [])
+    for entry in list(queue.pending):
+        while True:
+            if entry[0] is None:
+                used = {e[0] for e in queue.pending}
+                key = next((k for k in candidates if k not in used), None)
+                if key is None:
+                    print("Aucune partie non jouée trouvée.")
+                    return False
+                queue.rekey(entry, key)  # Un nouvel essai visera la même partie
+            result = yield from claim_game(entry[0], entry[1])
+            if result:
+                if index is not None:
+                    index.played(entry[0])
+                queue.remove(entry)
+                break
+            if result is None:
+                return False
+            queue.rekey(entry, None)  # Partie prise : on passe à la suivante
+            if not resynced:
+                # Premier conflit : l'indication est périmée, on relit la base
+                free_keys = yield from query_free_keys(index)
+                if free_keys is None:
+                    return False
+                candidates = iter(free_keys)
+                resynced = True
+    return True
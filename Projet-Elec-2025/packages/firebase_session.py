@@ -0,0 +1,337 @@
+"""
+Client HTTP/1.1 persistant pour l'API REST de Firebase.
+Garde une seule connexion (keep-alive) ouverte vers l'hôte Firebase pour éviter
+une poignée de main TLS complète à chaque requête, se reconnecte en cas d'échec
+et reprend la session TLS quand le port le permet.
+"""
+
+import json
+import socket
+import ssl
+
+DEFAULT_TIMEOUT = 5  # secondes
+DRAIN_LIMIT = 1024  # octets lus au maximum pour recycler une connexion
+
+
+def split_url(url):
+    """
+    Découpe une URL en (schéma, hôte, port, préfixe de chemin).
+    """
+    scheme, _, rest = url.partition("://")
+    host, _, prefix = rest.partition("/")
+    if ":" in host:
+        host, port = host.split(":", 1)
+        port = int(port)
+    else:
+        port = 443 if scheme == "https" else 80
+    prefix = "/" + prefix.rstrip("/") if prefix else ""
+    return scheme, host, port, prefix
+
+
+def build_request(method, host, path, headers, body):
+    """
+    Construit la requête HTTP/1.1 brute (en-têtes + corps) sous forme de bytes.
+    """
+    lines = [f"{method} {path} HTTP/1.1", f"Host: {host}", "Connection: keep-alive"]
+    for name, value in headers.items():
+        lines.append(f"{name}: {value}")
+    if body is not None:
+        lines.append(f"Content-Length: {len(body)}")
+    head = ("\r\n".join(lines) + "\r\n\r\n").encode()
+    return head + body if body else head
+
+
+def parse_status_line(line):
+    """
+    Retourne (code, raison) à partir de la ligne de statut HTTP.
+    """
+    parts = line.decode().rstrip("\r\n").split(" ", 2)
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise OSError(f"Réponse HTTP invalide : {line}")
+    return int(parts[1]), parts[2] if len(parts) > 2 else ""
+
+
+def parse_header_line(line):
+    """
+    Retourne (nom en minuscules, valeur) d'une ligne d'en-tête.
+    """
+    name, _, value = line.decode().partition(":")
+    return name.strip().lower(), value.strip()
+
+
+class Response:
+    """
+    Réponse HTTP lue depuis la connexion persistante.
+    Interface compatible avec celle de urequests (status_code, json(), text, close()).
+    """
+
+    def __init__(self, session, stream, status_code, reason, headers):
+        self._session = session
+        self._stream = stream
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self._content = None
+        self._chunked = headers.get("transfer-encoding", "").lower() == "chunked"
+        self._keep_alive = headers.get("connection", "").lower() != "close"
+        # Sans longueur ni chunks, le corps se termine à la fermeture de la connexion
+        self._until_close = not self._chunked and "content-length" not in headers
+        if self._until_close:
+            self._remaining = -1 if status_code not in (204, 304) else 0
+            self._keep_alive = False
+        elif self._chunked:
+            self._remaining = 0
+        else:
+            self._remaining = int(headers["content-length"])
+        self._done = not self._chunked and self._remaining == 0
+        self._closed = False
+
+    def _next_chunk(self):
+        """
+        Lit l'en-tête du chunk suivant (encodage 'chunked').
+        """
+        line = self._stream.readline()
+        if not line:
+            raise OSError("Connexion fermée pendant la lecture du corps")
+        size = int(line.split(b";", 1)[0].strip() or b"0", 16)
+        if size == 0:
+            # Ignore les éventuels en-têtes de fin
+            while self._stream.readline() not in (b"\r\n", b"\n", b""):
+                pass
+            self._done = True
+        self._remaining = size
+
+    def readinto(self, buf, nbytes=None):
+        """
+        Lit une partie du corps dans buf. Retourne 0 à la fin du corps.
+        """
+        if self._done:
+            return 0
+        if self._chunked and self._remaining == 0:
+            self._next_chunk()
+            if self._done:
+                return 0
+        size = len(buf) if nbytes is None else nbytes
+        if 0 <= self._remaining < size:
+            size = self._remaining
+        view = memoryview(buf)[:size]
+        count = self._stream.readinto(view)
+        if not count:
+            if self._until_close:
+                self._done = True
+                return 0
+            raise OSError("Connexion fermée pendant la lecture du corps")
+        self._session.bytes_received += count
+        self._remaining -= count
+        if self._remaining == 0:
+            if self._chunked:
+                self._stream.readline()  # CRLF après chaque chunk
+            else:
+                self._done = True
+        return count
+
+    @property
+    def content(self):
+        if self._content is None:
+            parts = []
+            buf = bytearray(512)
+            while True:
+                count = self.readinto(buf)
+                if not count:
+                    break
+                parts.append(bytes(buf[:count]))
+            self._content = b"".join(parts)
+            self.close()
+        return self._content
+
+    @property
+    def text(self):
+        return self.content.decode()
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        """
+        Libère la réponse. La connexion est recyclée si le corps a été lu
+        (ou s'il reste peu à lire), sinon elle est fermée.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            buf = bytearray(64)
+            drained = 0
+            while not self._done and drained < DRAIN_LIMIT:
+                drained += self.readinto(buf)
+        except (OSError, ValueError):
+            self._keep_alive = False
+        self._session.release(self._done and self._keep_alive)
+
+
+class FirebaseSession:
+    """
+    Connexion persistante (keep-alive) vers un hôte Firebase.
+    """
+
+    def __init__(self, base_url, timeout=DEFAULT_TIMEOUT):
+        """
+        Args:
+            base_url (str): URL de la base, par ex. "https://xxx.firebasedatabase.app".
+            timeout (float): Délai maximal par opération réseau, en secondes.
+        """
+        self.scheme, self.host, self.port, self.prefix = split_url(base_url)
+        self.timeout = timeout
+        self._sock = None
+        self._stream = None
+        self._tls_context = None
+        self._tls_session = None
+        self.connections = 0  # Poignées de main effectuées
+        self.resumed = 0  # Poignées de main TLS abrégées (reprise de session)
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def _wrap_tls(self, sock):
+        """
+        Établit TLS sur sock en réutilisant la session précédente si possible.
+        """
+        if not hasattr(ssl, "create_default_context"):
+            # MicroPython : même appel que urequests, sans reprise de session
+            return ssl.wrap_socket(sock, server_hostname=self.host)
+        if self._tls_context is None:
+            self._tls_context = ssl.create_default_context()
+        tls = self._tls_context.wrap_socket(
+            sock, server_hostname=self.host, session=self._tls_session
+        )
+        if getattr(tls, "session_reused", False):
+            self.resumed += 1
+        self._tls_session = getattr(tls, "session", None)
+        return tls
+
+    def open_socket(self):
+        """
+        Ouvre et retourne une nouvelle connexion (TLS si https) vers l'hôte,
+        sans l'associer à la session.
+        """
+        address = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_STREAM)[0][-1]
+        sock = socket.socket()
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(address)
+            if self.scheme == "https":
+                sock = self._wrap_tls(sock)
+        except OSError:
+            sock.close()
+            raise
+        self.connections += 1
+        return sock
+
+    def _connect(self):
+        """
+        Ouvre une nouvelle connexion persistante vers l'hôte.
+        """
+        sock = self.open_socket()
+        self._sock = sock
+        self._stream = sock.makefile("rwb") if hasattr(sock, "makefile") else sock
+
+    def close(self):
+        """
+        Ferme la connexion courante (la prochaine requête se reconnectera).
+        """
+        if self._sock is not None:
+            try:
+                if self._stream is not self._sock:
+                    self._stream.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._stream = None
+
+    def release(self, reusable):
+        """
+        Appelée par Response.close() : garde la connexion si elle est réutilisable.
+        """
+        if not reusable:
+            self.close()
+
+    def _send(self, data):
+        self._stream.write(data)
+        if hasattr(self._stream, "flush"):
+            self._stream.flush()
+        self.bytes_sent += len(data)
+
+    def _read_head(self):
+        line = self._stream.readline()
+        if not line:
+            raise OSError("Connexion fermée par le serveur")
+        self.bytes_received += len(line)
+        status_code, reason = parse_status_line(line)
+        headers = {}
+        while True:
+            line = self._stream.readline()
+            self.bytes_received += len(line)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, value = parse_header_line(line)
+            headers[name] = value
+        return status_code, reason, headers
+
+    def request(self, method, path, json_data=None, headers=None):
+        """
+        Envoie une requête sur la connexion persistante et retourne la Response.
+        La réponse doit être fermée (close) avant la requête suivante.
+
+        Args:
+            method (str): Verbe HTTP ("GET", "PATCH", "PUT"...).
+            path (str): Chemin relatif à la base, requête comprise ("/MA1.json?...").
+            json_data: Corps à encoder en JSON (optionnel).
+            headers (dict): En-têtes supplémentaires (optionnel).
+        """
+        body = None
+        request_headers = {"Accept": "application/json"}
+        if headers:
+            request_headers.update(headers)
+        if json_data is not None:
+            body = json.dumps(json_data).encode()
+            request_headers["Content-Type"] = "application/json"
+        data = build_request(method, self.host, self.prefix + path, request_headers, body)
+        self.requests += 1
+        for attempt in range(2):
+            reused = self._sock is not None
+            if not reused:
+                self._connect()
+            try:
+                self._send(data)
+                status_code, reason, response_headers = self._read_head()
+            except (OSError, ValueError):
+                self.close()
+                # Une connexion recyclée a pu être fermée par le serveur : on
+                # réessaie une seule fois sur une connexion neuve.
+                if reused and attempt == 0:
+                    continue
+                raise
+            return Response(self, self._stream, status_code, reason, response_headers)
+
+    def get(self, path, headers=None):
+        return self.request("GET", path, headers=headers)
+
+    def patch(self, path, json_data, headers=None):
+        return self.request("PATCH", path, json_data=json_data, headers=headers)
+
+    def put(self, path, json_data, headers=None):
+        return self.request("PUT", path, json_data=json_data, headers=headers)
+
+    def stats(self):
+        """
+        Retourne les compteurs de la session, dont les poignées de main évitées.
+        """
+        return {
+            "requests": self.requests,
+            "handshakes": self.connections,
+            "handshakes_avoided": self.requests - self.connections,
+            "tls_resumed": self.resumed,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
@@ -0,0 +1,101 @@
+"""
+Enregistreur des tirages d'une partie, à capacité fixe.
+Les chiffres sont rangés dans un bytearray alloué une seule fois
+(capacité x nombre de chiffres) utilisé comme tampon circulaire : ajouter un
+tirage ne fait qu'écrire quelques octets, reset() ne libère rien, et les
+tirages se lisent par des memoryview sans copie (sérialisation). Le tas de
+MicroPython ne se fragmente donc plus au fil des parties.
+"""
+
+from digit_codec import to_digits
+
+MAX_FRAMES = 15  # Tirages au plus par partie
+
+
+class FrameRecorder:
+    """
+    Tampon circulaire de `capacity` tirages de `num_digits` chiffres. Une
+    fois plein, un nouveau tirage remplace le plus ancien.
+    """
+
+    def __init__(self, num_digits=3, capacity=MAX_FRAMES):
+        """
+        Args:
+            num_digits (int): Nombre de chiffres par tirage.
+            capacity (int): Nombre maximal de tirages gardés.
+        """
+        self.num_digits = num_digits
+        self.capacity = capacity
+        self.buffer = bytearray(num_digits * capacity)
+        self._view = memoryview(self.buffer)
+        self.start = 0  # Index du plus ancien tirage
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def _slot(self, index):
+        """
+        Position (en octets) du tirage n° index, du plus ancien au plus récent.
+        """
+        return (self.start + index) % self.capacity * self.num_digits
+
+    def _next_slot(self):
+        if self.count < self.capacity:
+            self.count += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+        return self._slot(self.count - 1)
+
+    def append(self, digits):
+        """
+        Ajoute un tirage donné par ses chiffres, en O(1) et sans allocation.
+        """
+        base = self._next_slot()
+        for i in range(self.num_digits):
+            self.buffer[base + i] = digits[i]
+
+    def append_number(self, number):
+        """
+        Ajoute un tirage donné par sa valeur (804 -> 8, 0, 4), sans passer
+        par une chaîne.
+        """
+        to_digits(number, self.buffer, self.num_digits, self._next_slot())
+
+    def digit(self, index, position):
+        """
+        Chiffre `position` du tirage n° index, sans allocation.
+        """
+        return self.buffer[self._slot(index) + position]
+
+    def frame(self, index):
+        """
+        Tirage n° index (0 = le plus ancien) : memoryview sur le tampon.
+        """
+        if not 0 <= index < self.count:
+            raise IndexError("Tirage absent")
+        base = self._slot(index)
+        return self._view[base : base + self.num_digits]
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.frame(index)
+
+    def last(self):
+        """
+        Chiffres du dernier tirage (liste).
+        """
+        return list(self.frame(self.count - 1))
+
+    def to_lists(self):
+        """
+        Tirages en liste de listes, pour le JSON envoyé à Firebase.
+        """
+        return [list(frame) for frame in self]
+
+    def reset(self):
+        """
+        Vide l'enregistreur sans rien libérer ni réallouer.
+        """
+        self.start = 0
+        self.count = 0
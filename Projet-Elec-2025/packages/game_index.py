@@ -0,0 +1,139 @@
+"""
+Index local des parties, conservé sur la flash.
+Il retient le numéro de la dernière partie jouée par la machine et celui de
+la prochaine partie non jouée : la prochaine clé 'MA<n>' est connue sans
+relire ni trier les parties de la base. L'index n'est qu'une indication :
+l'écriture conditionnelle (firebase.claim_game) la vérifie, et un conflit
+provoque une resynchronisation par la requête indexée.
+"""
+
+import json
+import os
+
+INDEX_FILE = "game_index.json"
+
+
+def key_number(key):
+    """
+    Retourne le numéro d'une clé de partie ('MA12' -> 12) sans créer de
+    chaîne intermédiaire. Lève ValueError si la clé n'est pas de la forme
+    'MA<chiffres>'.
+    """
+    if len(key) < 3 or key[0] != "M" or key[1] != "A":
+        raise ValueError(f"Clé de partie invalide : {key}")
+    number = 0
+    for i in range(2, len(key)):
+        digit = ord(key[i]) - 48
+        if not 0 <= digit <= 9:
+            raise ValueError(f"Clé de partie invalide : {key}")
+        number = number * 10 + digit
+    return number
+
+
+def is_game_key(key):
+    """
+    Vrai si key est une clé de partie 'MA<chiffres>'. Les autres clés de la
+    base (ajoutées à la main, réglages...) sont ignorées par les lectures.
+    """
+    try:
+        key_number(key)
+    except ValueError:
+        return False
+    return True
+
+
+class GameIndex:
+    """
+    Curseur des parties : dernière jouée, prochaine non jouée.
+    """
+
+    def __init__(self, path=INDEX_FILE):
+        """
+        Args:
+            path (str): Fichier de l'index sur la flash.
+        """
+        self.path = path
+        self.last_played = 0
+        self.next_unplayed = None  # Inconnu tant qu'aucune resynchronisation
+        self.last_unplayed = None  # Dernière partie non jouée lue à la resynchronisation
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+            self.last_played = data.get("lastPlayed", 0)
+            self.next_unplayed = data.get("nextUnplayed")
+            self.last_unplayed = data.get("lastUnplayed")
+        except (OSError, ValueError, AttributeError):
+            pass  # Pas encore d'index, ou fichier interrompu par une coupure
+
+    def _save(self):
+        """
+        Écrit l'index de façon atomique (fichier temporaire + rename).
+        """
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(
+                {
+                    "lastPlayed": self.last_played,
+                    "nextUnplayed": self.next_unplayed,
+                    "lastUnplayed": self.last_unplayed,
+                },
+                file,
+            )
+        os.rename(tmp_path, self.path)
+
+    def next_key(self):
+        """
+        Clé de la prochaine partie non jouée, ou None si elle est inconnue.
+        """
+        if self.next_unplayed is None:
+            return None
+        return f"MA{self.next_unplayed}"
+
+    def candidates(self, count, known=False):
+        """
+        Clés des `count` parties qui suivent le curseur (les parties sont
+        créées avec des numéros consécutifs). Liste vide si le curseur est
+        inconnu.
+
+        Args:
+            count (int): Nombre de clés voulues.
+            known (bool): Seulement si ces parties ont toutes été vues non
+                jouées à la dernière resynchronisation, liste vide sinon :
+                pour une écriture sans condition, qui ne doit pas créer de
+                partie.
+        """
+        if self.next_unplayed is None:
+            return []
+        end = self.next_unplayed + count
+        if known and (self.last_unplayed is None or end - 1 > self.last_unplayed):
+            return []
+        return [f"MA{n}" for n in range(self.next_unplayed, end)]
+
+    def played(self, key):
+        """
+        Note qu'une partie vient d'être jouée par la machine : la suivante
+        devient la prochaine partie non jouée présumée.
+        """
+        number = key_number(key)
+        if number > self.last_played:
+            self.last_played = number
+        if self.next_unplayed is None or number >= self.next_unplayed:
+            self.next_unplayed = number + 1
+        self._save()
+
+    def resync(self, keys):
+        """
+        Recale le curseur sur les parties non jouées lues dans la base.
+
+        Args:
+            keys (list): Clés non jouées, triées par numéro croissant.
+        """
+        next_unplayed = key_number(keys[0]) if keys else None
+        last_unplayed = key_number(keys[-1]) if keys else None
+        if next_unplayed != self.next_unplayed or last_unplayed != self.last_unplayed:
+            self.next_unplayed = next_unplayed
+            self.last_unplayed = last_unplayed
+            self._save()
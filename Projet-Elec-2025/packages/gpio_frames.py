@@ -0,0 +1,193 @@
+"""
+Trames GPIO précalculées pour le multiplexage de l'afficheur 7 segments.
+Pour chaque couple (afficheur, chiffre), on calcule une fois les masques
+des broches à mettre à 1 et à 0 dans tout le banc GPIO. Un rafraîchissement
+se résume alors à deux écritures atomiques dans les registres SIO du RP2040
+(GPIO_OUT_SET puis GPIO_OUT_CLR, via machine.mem32) au lieu d'une dizaine
+d'appels Pin.value().
+
+Ordre des écritures : SET allume les segments du chiffre et désactive tous
+les afficheurs (sélection active à 0) ; CLR éteint les autres segments et
+active l'afficheur voulu. Entre les deux, aucun afficheur n'est actif : le
+chiffre précédent ne « bave » pas sur le suivant.
+
+FrameBuffer publie les trames par double tampon : la logique de jeu encode
+les chiffres dans le tampon arrière, le rafraîchissement ne lit que le
+tampon avant et échange les deux en fin de balayage.
+
+FakeRegisters remplace machine.mem32 dans les tests sur l'hôte.
+"""
+
+from array import array
+
+GPIO_OUT = 0xD0000010  # SIO : état des sorties
+GPIO_OUT_SET = 0xD0000014  # SIO : met à 1 les broches du masque
+GPIO_OUT_CLR = 0xD0000018  # SIO : met à 0 les broches du masque
+
+SEGMENT_MAP = [
+    0b0111111,
+    0b0000110,
+    0b1011011,
+    0b1001111,
+    0b1100110,
+    0b1101101,
+    0b1111101,
+    0b0000111,
+    0b1111111,
+    0b1101111,
+]
+
+
+def pin_mask(pins):
+    """
+    Masque du banc GPIO couvrant les broches données.
+    """
+    mask = 0
+    for pin in pins:
+        mask |= 1 << pin
+    return mask
+
+
+def segment_masks(segment_pins, value):
+    """
+    Masques (à 1, à 0) des broches de segments pour la valeur binaire
+    `value` (bit i -> segment_pins[i]).
+    """
+    on = off = 0
+    for i, pin in enumerate(segment_pins):
+        if (value >> i) & 1:
+            on |= 1 << pin
+        else:
+            off |= 1 << pin
+    return on, off
+
+
+def frame_masks(segment_pins, select_pins, segment_map=SEGMENT_MAP):
+    """
+    Table des masques : pour l'afficheur p et le chiffre v, le masque SET est
+    à l'index (p * len(segment_map) + v) * 2 et le masque CLR juste après.
+    """
+    selects = pin_mask(select_pins)
+    masks = array("I", [0] * (2 * len(select_pins) * len(segment_map)))
+    index = 0
+    for select in select_pins:
+        for value in segment_map:
+            on, off = segment_masks(segment_pins, value)
+            masks[index] = on | selects
+            masks[index + 1] = off | (1 << select)
+            index += 2
+    return masks
+
+
+def write_frame(registers, masks, index):
+    """
+    Affiche une trame : écriture SET puis écriture CLR.
+    """
+    registers[GPIO_OUT_SET] = masks[index]
+    registers[GPIO_OUT_CLR] = masks[index + 1]
+
+
+class FrameBuffer:
+    """
+    Double tampon des masques SET/CLR affichés, un couple par afficheur.
+
+    publish() (logique de jeu) encode les chiffres dans le tampon arrière ;
+    refresh() (callback du timer) écrit une trame du tampon avant, sans
+    recherche dans la table, et n'échange les tampons qu'à la fin d'un
+    balayage complet. Un balayage montre donc toujours les chiffres d'un
+    même tirage.
+
+    Sans verrou : publish() remet `pending` à False avant d'écrire, ce qui
+    empêche l'échange pendant l'écriture, puis le remet à True. Si plusieurs
+    publications ont lieu dans le même balayage, seule la dernière est
+    affichée.
+    """
+
+    def __init__(self, masks, num_digits, num_values=10):
+        """
+        Args:
+            masks (array): Table de frame_masks.
+            num_digits (int): Nombre d'afficheurs.
+            num_values (int): Nombre de chiffres par afficheur dans la table.
+        """
+        self.masks = masks
+        self.num_digits = num_digits
+        self.num_values = num_values
+        self.buffers = (array("I", [0] * 2 * num_digits), array("I", [0] * 2 * num_digits))
+        self.front_index = 0
+        self.front = self.buffers[0]
+        self.position = 0  # Afficheur rafraîchi au prochain appel
+        self.pending = False  # Tampon arrière prêt à être affiché
+        self.swaps = 0
+        zeros = [0] * num_digits
+        self.encode(self.buffers[0], zeros)
+        self.encode(self.buffers[1], zeros)
+
+    def encode(self, buffer, digits):
+        """
+        Copie dans `buffer` les masques des chiffres `digits`.
+        """
+        masks = self.masks
+        for position in range(self.num_digits):
+            index = (position * self.num_values + digits[position]) * 2
+            buffer[2 * position] = masks[index]
+            buffer[2 * position + 1] = masks[index + 1]
+
+    def publish(self, digits):
+        """
+        Prépare l'affichage de `digits`, pris en compte à la fin du balayage
+        en cours. Sans allocation.
+        """
+        self.pending = False  # Plus d'échange tant que le tampon arrière change
+        self.encode(self.buffers[self.front_index ^ 1], digits)
+        self.pending = True
+
+    def refresh(self, registers):
+        """
+        Affiche la trame de l'afficheur suivant (deux écritures SIO) et
+        échange les tampons en fin de balayage si une publication attend.
+        """
+        position = self.position
+        write_frame(registers, self.front, 2 * position)
+        position += 1
+        if position == self.num_digits:
+            position = 0
+            if self.pending:
+                self.front_index ^= 1
+                self.front = self.buffers[self.front_index]
+                self.pending = False
+                self.swaps += 1
+        self.position = position
+
+
+class FakeRegisters:
+    """
+    Registres SIO simulés (même interface que machine.mem32) : applique les
+    écritures SET/CLR à un état des sorties et garde l'historique.
+    """
+
+    def __init__(self, out=0):
+        self.out = out
+        self.writes = []
+
+    def __setitem__(self, address, value):
+        self.writes.append((address, value))
+        if address == GPIO_OUT_SET:
+            self.out |= value
+        elif address == GPIO_OUT_CLR:
+            self.out &= ~value
+        elif address == GPIO_OUT:
+            self.out = value
+        else:
+            raise ValueError(f"Registre inconnu : {address:#x}")
+
+    def __getitem__(self, address):
+        if address != GPIO_OUT:
+            raise ValueError(f"Registre inconnu : {address:#x}")
+        return self.out
+
+    def pin(self, pin):
+        """
+        Niveau de la broche `pin`.
+        """
+        return (self.out >> pin) & 1
@@ -0,0 +1,236 @@
+"""
+Mesure des callbacks d'interruption (timers et IRQ du bouton) : durée de
+chaque appel (ticks_us) rangée dans un histogramme en puissances de 2,
+durée maximale, périodes manquées et dépassements. Les compteurs sont
+alloués une fois à l'enveloppe du callback : un appel n'alloue rien et ne
+coûte que deux lectures de ticks_us et quelques opérations sur des petits
+entiers, ce qui permet de laisser la mesure active en production.
+
+Les mesures se lisent sur la console série : SerialCommands lit sans
+bloquer les commandes tapées (« isr », « isr reset »).
+"""
+
+from array import array
+from ticks import ticks_us, ticks_diff
+
+PROFILING = True  # False : wrap() rend le callback tel quel
+HISTOGRAM_BUCKETS = 16  # [0,1) µs, [1,2), [2,4), ... , >= 16,384 ms
+TOTAL_MAX = (1 << 30) - 1  # Plus grand petit entier (pas d'allocation)
+
+
+class CallbackStats:
+    """
+    Compteurs d'un callback. Une période manquée est un appel qui n'a pas eu
+    lieu à l'heure (écart entre deux débuts d'au moins 1,5 période) ; un
+    dépassement est un appel plus long que la période. La durée mesurée ne
+    comprend pas celle de record() elle-même.
+    """
+
+    def __init__(self, name, period_us=0):
+        """
+        Args:
+            name (str): Nom affiché.
+            period_us (int): Période attendue en µs (0 : IRQ sans période).
+        """
+        self.name = name
+        self.period_us = period_us
+        self.histogram = array("I", [0] * HISTOGRAM_BUCKETS)
+        self.reset()
+
+    def reset(self):
+        for i in range(HISTOGRAM_BUCKETS):
+            self.histogram[i] = 0
+        self.calls = 0
+        self.total_us = 0  # Durée cumulée des mean_calls derniers appels (moyenne)
+        self.mean_calls = 0
+        self.max_us = 0
+        self.missed = 0
+        self.overruns = 0
+        self.last_start = -1  # Début de l'appel précédent (-1 : aucun)
+
+    def record(self, start, end):
+        """
+        Enregistre un appel commencé à `start` et fini à `end` (ticks_us).
+        Sans allocation.
+        """
+        elapsed = ticks_diff(end, start)
+        bucket = 0  # Nombre de bits de la durée (sans appel de fonction)
+        value = elapsed
+        while value > 0 and bucket < HISTOGRAM_BUCKETS - 1:
+            value >>= 1
+            bucket += 1
+        self.histogram[bucket] += 1
+        self.calls += 1
+        total = self.total_us
+        count = self.mean_calls
+        while total + elapsed > TOTAL_MAX and count > 1:
+            # Au-delà de ~18 min cumulées, la moitié des appels est retirée de la
+            # somme à la durée moyenne : la moyenne est conservée et la somme
+            # reste un petit entier
+            half = count >> 1
+            total -= total // count * half
+            count -= half
+        self.total_us = min(total + elapsed, TOTAL_MAX)
+        self.mean_calls = count + 1
+        if elapsed > self.max_us:
+            self.max_us = elapsed
+        period = self.period_us
+        if period:
+            if elapsed > period:
+                self.overruns += 1
+            if self.last_start >= 0:
+                late = (ticks_diff(start, self.last_start) + (period >> 1)) // period - 1
+                if late > 0:
+                    self.missed += late
+            self.last_start = start
+
+    def percentile_us(self, q):
+        """
+        Borne supérieure (µs) de la case qui contient le percentile q.
+        """
+        if not self.calls:
+            return 0
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if seen >= q * self.calls:
+                return 1 << bucket
+        return 1 << (HISTOGRAM_BUCKETS - 1)
+
+    def report(self):
+        return {
+            "calls": self.calls,
+            "mean_us": self.total_us // self.mean_calls if self.mean_calls else 0,
+            "max_us": self.max_us,
+            "p99_us": self.percentile_us(0.99),
+            "missed": self.missed,
+            "overruns": self.overruns,
+            "histogram": list(self.histogram),
+        }
+
+
+class IsrProfiler:
+    """
+    Registre des callbacks mesurés.
+    """
+
+    def __init__(self, enabled=PROFILING):
+        self.enabled = enabled
+        self.callbacks = []
+
+    def wrap(self, name, callback, period_us=0):
+        """
+        Enveloppe `callback` (un argument : timer ou broche) pour le mesurer.
+
+        Args:
+            name (str): Nom affiché dans le rapport.
+            callback: Fonction appelée par Timer.init ou Pin.irq.
+            period_us (int): Période attendue en µs (0 : IRQ sans période).
+
+        Returns:
+            Callback à passer à Timer.init ou Pin.irq.
+        """
+        if not self.enabled:
+            return callback
+        stats = CallbackStats(name, period_us)
+        self.callbacks.append(stats)
+        record = stats.record
+
+        def profiled(arg):
+            start = ticks_us()
+            callback(arg)
+            record(start, ticks_us())
+
+        return profiled
+
+    def stats(self, name):
+        for stats in self.callbacks:
+            if stats.name == name:
+                return stats
+        return None
+
+    def reset(self):
+        for stats in self.callbacks:
+            stats.reset()
+
+    def rearm(self, name):
+        """
+        À appeler quand le timer `name` est relancé : l'attente depuis son
+        arrêt ne compte pas comme des périodes manquées.
+        """
+        stats = self.stats(name)
+        if stats is not None:
+            stats.last_start = -1
+
+    def report(self):
+        return {stats.name: stats.report() for stats in self.callbacks}
+
+    def dump(self):
+        """
+        Affiche les mesures sur la console série.
+        """
+        if not self.callbacks:
+            print("Interruptions : aucune mesure")
+        for stats in self.callbacks:
+            report = stats.report()
+            histogram = report["histogram"]
+            last = max([i for i, count in enumerate(histogram) if count] or [0])
+            print(
+                f"{stats.name} : {report['calls']} appel(s), "
+                f"moy {report['mean_us']} µs, max {report['max_us']} µs, "
+                f"p99<{report['p99_us']} µs, {report['missed']} période(s) manquée(s), "
+                f"{report['overruns']} dépassement(s), histo={histogram[: last + 1]}"
+            )
+
+
+ISR_PROFILER = IsrProfiler()
+
+
+class SerialCommands:
+    """
+    Commandes tapées sur la console série (REPL USB), lues caractère par
+    caractère sans bloquer la boucle de jeu.
+    """
+
+    def __init__(self, commands, stream=None, poller=None):
+        """
+        Args:
+            commands (dict): Commande -> fonction sans argument.
+            stream: Flux lu (sys.stdin par défaut).
+            poller: Objet select.poll sur le flux (créé par défaut).
+        """
+        if stream is None:
+            import sys
+
+            stream = sys.stdin
+        if poller is None:
+            import select
+
+            poller = select.poll()
+            poller.register(stream, select.POLLIN)
+        self.commands = commands
+        self.stream = stream
+        self.poller = poller
+        self.line = ""
+
+    def poll(self):
+        """
+        Lit les caractères disponibles et exécute la commande d'une ligne
+        complète. Retourne la commande exécutée (ou None).
+        """
+        done = None
+        while self.poller.poll(0):
+            char = self.stream.read(1)
+            if not char:
+                break
+            if char not in "\r\n":
+                self.line += char
+                continue
+            command = self.line.strip()
+            self.line = ""
+            if command in self.commands:
+                self.commands[command]()
+                done = command
+            elif command:
+                print("Commandes :", ", ".join(sorted(self.commands)))
+        return done
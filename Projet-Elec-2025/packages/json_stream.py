@@ -0,0 +1,276 @@
+"""
+Lecteur JSON incrémental (par événements) pour les réponses Firebase.
+Les octets sont lus avec readinto dans un tampon préalloué de taille fixe :
+la mémoire utilisée dépend de la taille du tampon et des seules valeurs
+conservées par l'appelant, pas de la taille de la réponse.
+Sans source, le flux est alimenté par l'appelant (space() puis feed()), ce
+qui permet de lire le corps depuis un flux uasyncio sans appel bloquant.
+"""
+
+EOF = 0
+OBJECT_START = 1
+OBJECT_END = 2
+ARRAY_START = 3
+ARRAY_END = 4
+KEY = 5
+VALUE = 6
+
+# Octets ignorés entre deux jetons : espaces, ',' et ':'
+_SEPARATORS = b" \t\r\n,:"
+_DELIMITERS = b" \t\r\n,:]}"
+_ESCAPES = {
+    ord('"'): ord('"'),
+    ord("\\"): ord("\\"),
+    ord("/"): ord("/"),
+    ord("b"): 8,
+    ord("f"): 12,
+    ord("n"): 10,
+    ord("r"): 13,
+    ord("t"): 9,
+}
+
+
+class NeedData(Exception):
+    """
+    Flux alimenté : le tampon est vide avant la fin du jeton. Le jeton sera
+    relu en entier au prochain next_event(), après feed().
+    """
+
+
+class JsonStream:
+    """
+    Analyseur JSON « pull » : chaque appel à next_event() consomme un jeton.
+    """
+
+    def __init__(self, source, buffer=None, buffer_size=256):
+        """
+        Args:
+            source: Objet possédant readinto(buf) (réponse HTTP, socket,
+                fichier), ou None pour un flux alimenté par feed().
+            buffer (bytearray): Tampon à réutiliser (optionnel).
+            buffer_size (int): Taille du tampon créé si buffer n'est pas fourni.
+        """
+        self._source = source
+        self._buf = buffer if buffer is not None else bytearray(buffer_size)
+        self._pos = 0
+        self._end = 0
+        self._mark = 0  # Début du jeton en cours (flux alimenté)
+        self._eof = False
+        self._stack = []  # True pour un objet, False pour un tableau
+        self._expect_key = False
+        self._token = bytearray()
+        self.value = None
+
+    def _next_byte(self):
+        if self._pos >= self._end:
+            if self._source is None:
+                if self._eof:
+                    return -1
+                self._pos = self._mark
+                raise NeedData()
+            self._pos = 0
+            self._end = self._source.readinto(self._buf) or 0
+            if not self._end:
+                return -1
+        c = self._buf[self._pos]
+        self._pos += 1
+        return c
+
+    def space(self):
+        """
+        Flux alimenté : retourne la partie libre du tampon (memoryview) à
+        remplir avant d'appeler feed(). Le début du jeton en cours est d'abord
+        ramené en tête du tampon.
+        """
+        buf = self._buf
+        keep = self._end - self._mark
+        if keep >= len(buf):
+            raise ValueError("Jeton JSON plus long que le tampon")
+        for i in range(keep):
+            buf[i] = buf[self._mark + i]
+        self._pos -= self._mark
+        self._mark = 0
+        self._end = keep
+        return memoryview(buf)[keep:]
+
+    def feed(self, count):
+        """
+        Flux alimenté : count octets ont été écrits dans space() ; 0 marque
+        la fin du corps.
+        """
+        if count:
+            self._end += count
+        else:
+            self._eof = True
+
+    def _value_done(self):
+        self._expect_key = bool(self._stack) and self._stack[-1]
+
+    def _read_string(self, keep):
+        token = self._token
+        token[:] = b""
+        while True:
+            c = self._next_byte()
+            if c == -1:
+                raise ValueError("Chaîne JSON non terminée")
+            if c == 0x22:  # '"'
+                break
+            if c != 0x5C:  # '\'
+                if keep:
+                    token.append(c)
+                continue
+            c = self._next_byte()
+            if c == 0x75:  # 'u'
+                code = self._read_hex4()
+                if 0xD800 <= code < 0xDC00:
+                    # Paire de substitution (caractère hors du plan de base)
+                    self._next_byte()
+                    self._next_byte()
+                    code = 0x10000 + ((code - 0xD800) << 10) + (self._read_hex4() - 0xDC00)
+                if keep:
+                    token.extend(chr(code).encode())
+            elif c in _ESCAPES:
+                if keep:
+                    token.append(_ESCAPES[c])
+            else:
+                raise ValueError("Échappement JSON invalide")
+        return token.decode() if keep else None
+
+    def _read_hex4(self):
+        code = 0
+        for _ in range(4):
+            c = self._next_byte()
+            if c == -1:
+                raise ValueError("Échappement JSON tronqué")
+            code = code * 16 + int(chr(c), 16)
+        return code
+
+    def _read_scalar(self, first, keep):
+        token = self._token
+        token[:] = b""
+        token.append(first)
+        while True:
+            c = self._next_byte()
+            if c == -1:
+                break
+            if c in _DELIMITERS:
+                self._pos -= 1  # Le délimiteur appartient au jeton suivant
+                break
+            token.append(c)
+        if not keep:
+            return None
+        if token == b"true":
+            return True
+        if token == b"false":
+            return False
+        if token == b"null":
+            return None
+        text = token.decode()
+        if "." in text or "e" in text or "E" in text:
+            return float(text)
+        return int(text)
+
+    def next_event(self, keep=True):
+        """
+        Lit le jeton suivant et retourne son type (KEY, VALUE, OBJECT_START...).
+        Pour KEY et VALUE, la valeur lue est disponible dans self.value.
+
+        Args:
+            keep (bool): Si False, les chaînes et nombres ne sont pas construits.
+
+        Lève NeedData si le flux alimenté doit être complété.
+        """
+        self._mark = self._pos
+        c = self._next_byte()
+        while c != -1 and c in _SEPARATORS:
+            c = self._next_byte()
+        if c == -1:
+            return EOF
+        if c == 0x7B:  # '{'
+            self._stack.append(True)
+            self._expect_key = True
+            return OBJECT_START
+        if c == 0x5B:  # '['
+            self._stack.append(False)
+            self._expect_key = False
+            return ARRAY_START
+        if c == 0x7D or c == 0x5D:  # '}' ou ']'
+            if not self._stack:
+                raise ValueError("Fermeture JSON inattendue")
+            self._stack.pop()
+            self._value_done()
+            return OBJECT_END if c == 0x7D else ARRAY_END
+        if c == 0x22:  # '"'
+            if self._expect_key:
+                self.value = self._read_string(keep)
+                self._expect_key = False
+                return KEY
+            self.value = self._read_string(keep)
+        else:
+            self.value = self._read_scalar(c, keep)
+        self._value_done()
+        return VALUE
+
+    def _build(self, event):
+        if event == VALUE:
+            return self.value
+        if event == OBJECT_START:
+            result = {}
+            while True:
+                event = self.next_event()
+                if event == OBJECT_END:
+                    return result
+                if event != KEY:
+                    raise ValueError("Clé JSON attendue")
+                key = self.value
+                result[key] = self.read_value()
+        if event == ARRAY_START:
+            result = []
+            while True:
+                event = self.next_event()
+                if event == ARRAY_END:
+                    return result
+                result.append(self._build(event))
+        raise ValueError("Valeur JSON attendue")
+
+    def read_value(self):
+        """
+        Construit et retourne entièrement la valeur suivante (à réserver aux
+        petites valeurs : champs d'une partie, etc.).
+        """
+        return self._build(self.next_event())
+
+    def skip_value(self):
+        """
+        Passe la valeur suivante sans la construire.
+        """
+        depth = 0
+        while True:
+            event = self.next_event(keep=False)
+            if event == OBJECT_START or event == ARRAY_START:
+                depth += 1
+            elif event == OBJECT_END or event == ARRAY_END:
+                depth -= 1
+            elif event == EOF:
+                return
+            if depth == 0:
+                return
+
+    def iter_keys(self):
+        """
+        Parcourt les clés de l'objet suivant. Pour chaque clé produite,
+        l'appelant doit consommer la valeur (read_value, skip_value ou
+        iter_keys). Un 'null' est traité comme un objet vide.
+        """
+        event = self.next_event()
+        if event == VALUE and self.value is None:
+            return
+        if event != OBJECT_START:
+            raise ValueError("Objet JSON attendu")
+        while True:
+            event = self.next_event()
+            if event == OBJECT_END:
+                return
+            if event != KEY:
+                raise ValueError("Clé JSON attendue")
+            yield self.value
@@ -6,10 +6,12 @@ connectées aux broches 18 à 21.
 
 from time import sleep
 from machine import Pin, Timer
+from isr_profiler import ISR_PROFILER
 
 SET_LED = [Pin(i, Pin.OUT) for i in range(18, 22)]
 
 LED_TIMER = None
+LED_PERIOD_MS = 200  # 5 Hz
 LED_ACTIVE = 0
 
 
@@ -26,6 +28,9 @@ def _blink_led(timer):
     LED_ACTIVE = (LED_ACTIVE + 1) % len(SET_LED)
 
 
+_BLINK_CALLBACK = ISR_PROFILER.wrap("led", _blink_led, LED_PERIOD_MS * 1000)
+
+
 def start_led_blinking():
     """
     Démarre le clignotement cyclique des LEDs à l'aide d'un Timer.
@@ -34,7 +39,8 @@ def start_led_blinking():
     if LED_TIMER is None:
         LED_ACTIVE = 0
         LED_TIMER = Timer()
-        LED_TIMER.init(period=200, mode=Timer.PERIODIC, callback=_blink_led)
+        ISR_PROFILER.rearm("led")
+        LED_TIMER.init(period=LED_PERIOD_MS, mode=Timer.PERIODIC, callback=_BLINK_CALLBACK)
 
 
 def stop_led_blinking():
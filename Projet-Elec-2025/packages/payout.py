@@ -0,0 +1,108 @@
+"""
+Table des gains précalculée.
+Il n'y a que 1000 tirages possibles : le multiplicateur de chacun est
+calculé une fois à l'import, en virgule fixe (x10), dans un array('H')
+indexé par le nombre affiché (r2*100 + r1*10 + r3). calculer_gain se
+réduit alors à une lecture et une multiplication entière, utilisable dans
+une interruption de timer ou pour des simulations en masse.
+calculer_gain_reference garde les règles d'origine et sert d'oracle.
+La table est lue dans payout_table.bin, compilée depuis les règles par
+tools/payout_compiler.py ; sans ce fichier (ou si son CRC32 est faux, ou si
+le firmware n'a pas binascii.crc32), elle est recalculée depuis
+calculer_gain_reference.
+"""
+
+try:
+    import binascii
+except ImportError:
+    binascii = None  # Module optionnel selon le port MicroPython
+from array import array
+
+OUTCOMES = 1000
+FIXED_POINT = 10  # Multiplicateurs stockés en dixièmes
+TABLE_FILE = "payout_table.bin"  # Table compilée, à côté de ce module
+if "/" in __file__:
+    TABLE_FILE = __file__.rsplit("/", 1)[0] + "/" + TABLE_FILE
+
+
+def calculer_gain_reference(rouleaux: list[int], mise: int) -> int:
+    """Calcule le gain en fonction du tirage et du MONTANT misé."""
+    r2, r1, r3 = rouleaux
+    multiplicateur = 0
+    presence_event = False
+
+    if r1 == r2 == r3:
+        return mise * 100 if r1 == 7 else mise * 10  # (Méga) Jackpot ou Jackpot
+    if (r1 + 1 == r3 and r2 + 1 == r1) or (r1 - 1 == r3 and r2 - 1 == r1):
+        multiplicateur = 5  # Suite
+        presence_event = True
+    elif r1 == r3 and r1 != r2:
+        multiplicateur = 2  # Sandwich
+        presence_event = True
+    if r1 % 2 == r2 % 2 == r3 % 2:
+        multiplicateur = 1.5  # Pair/Impair
+        presence_event = True
+
+    count_7 = rouleaux.count(7)
+    multiplicateur += count_7 * 0.5
+    if not presence_event:
+        if count_7 == 1:
+            multiplicateur = 0.5  # Perdre 50% de sa somme
+        elif count_7 == 2:
+            multiplicateur = 1  # Récupérer sa mise
+
+    gain = int(mise * multiplicateur)
+    return gain
+
+
+def build_payout_table(rule=calculer_gain_reference):
+    """
+    Construit la table des multiplicateurs (x10) des 1000 tirages.
+    Tous les multiplicateurs sont des multiples de 0,5 : le gain pour une
+    mise de 10 est exactement le multiplicateur en dixièmes.
+
+    Args:
+        rule: Fonction de gain (rouleaux, mise) -> gain à tabuler.
+    """
+    table = array("H", [0] * OUTCOMES)
+    for number in range(OUTCOMES):
+        rouleaux = [number // 100, number // 10 % 10, number % 10]
+        table[number] = rule(rouleaux, FIXED_POINT)
+    return table
+
+
+def load_payout_table(path=TABLE_FILE):
+    """
+    Lit la table compilée (1000 entiers 16 bits little-endian puis leur
+    CRC32). Retourne None si le fichier est absent, tronqué ou corrompu.
+    """
+    table = array("H", [0] * OUTCOMES)
+    try:
+        with open(path, "rb") as file:
+            if file.readinto(table) != 2 * OUTCOMES:
+                return None
+            checksum = int.from_bytes(file.read(4), "little")
+    except OSError:
+        return None
+    try:
+        crc = binascii.crc32(table)
+    except AttributeError:
+        return None  # crc32 absent (option de compilation MicroPython) : table recalculée
+    if crc & 0xFFFFFFFF != checksum:
+        return None
+    return table
+
+
+PAYOUT_TABLE = load_payout_table() or build_payout_table()
+
+
+def gain_for_number(number, mise):
+    """
+    Gain du tirage affiché `number` (0 à 999) pour la mise donnée.
+    """
+    return mise * PAYOUT_TABLE[number] // FIXED_POINT
+
+
+def calculer_gain(rouleaux: list[int], mise: int) -> int:
+    """Calcule le gain en fonction du tirage et du MONTANT misé (lecture de table)."""
+    return mise * PAYOUT_TABLE[rouleaux[0] * 100 + rouleaux[1] * 10 + rouleaux[2]] // FIXED_POINT
@@ -0,0 +1,179 @@
+"""
+Multiplexage de l'afficheur par une machine à états PIO du RP2040.
+Le programme PIO balaie seul les afficheurs : il place le code du chiffre
+sur les broches de données (instruction out) et active l'afficheur
+correspondant par side-set, puis le maintient allumé par une boucle sur Y.
+Le processeur ne pousse un mot dans la FIFO que lorsque les chiffres
+changent ; sinon le programme réaffiche le dernier mot (pull noblock recopie
+X dans l'OSR). Les appels Wi-Fi et le ramasse-miettes ne font plus clignoter
+l'affichage.
+
+Le programme est décrit par une liste d'instructions (scan_program) qui sert
+à la fois à l'assembler pour la carte (build_asm) et à l'émuler sur l'hôte
+(tools/pio_emulator.py).
+"""
+
+HOLD_LOOPS = 31  # Y : l'afficheur reste actif HOLD_LOOPS + 2 cycles
+REFRESH_HZ = 100  # Balayages complets par seconde (comme le timer à 300 Hz)
+
+PULL = "pull_noblock"
+MOV_X_OSR = "mov_x_osr"
+OUT_PINS = "out_pins"
+SET_Y = "set_y"
+JMP_Y_DEC = "jmp_y_dec"
+
+
+def select_levels(select_count, digit, active_low=True):
+    """
+    Valeur side-set qui active l'afficheur `digit` (-1 : aucun afficheur).
+    """
+    all_pins = (1 << select_count) - 1
+    if digit < 0:
+        return all_pins if active_low else 0
+    return all_pins & ~(1 << digit) if active_low else 1 << digit
+
+
+def scan_program(num_digits=3, width=8, active_low=True, hold=HOLD_LOOPS):
+    """
+    Instructions du balayage : (opération, argument, side-set). L'argument
+    de jmp est l'index de l'instruction visée.
+    """
+    off = select_levels(num_digits, -1, active_low)
+    program = [(PULL, None, off), (MOV_X_OSR, None, off)]
+    for digit in range(num_digits):
+        on = select_levels(num_digits, digit, active_low)
+        program.append((OUT_PINS, width, off))
+        program.append((SET_Y, hold, on))
+        program.append((JMP_Y_DEC, len(program), on))
+    return program
+
+
+def scan_cycles(num_digits=3, hold=HOLD_LOOPS):
+    """
+    Cycles PIO d'un balayage complet.
+    """
+    return 2 + num_digits * (hold + 3)
+
+
+def out_codes(data_pins, codes):
+    """
+    Recode chaque valeur de `codes` dans l'ordre des broches de sortie : le
+    bit i d'un code pilote data_pins[i], et les broches doivent former un
+    bloc contigu (out_base = la plus petite).
+    """
+    base = min(data_pins)
+    if sorted(data_pins) != list(range(base, base + len(data_pins))):
+        raise ValueError("Broches de données non contiguës")
+    table = bytearray(len(codes))
+    for value, code in enumerate(codes):
+        word = 0
+        for i, pin in enumerate(data_pins):
+            if (code >> i) & 1:
+                word |= 1 << (pin - base)
+        table[value] = word
+    return table
+
+
+def encode_frame(digits, table, width=8):
+    """
+    Mot de 32 bits poussé dans la FIFO : chiffre 0 dans les bits de poids
+    faible (premier sorti par out, décalage à droite).
+    """
+    word = 0
+    for i in range(len(digits)):
+        word |= table[digits[i]] << (i * width)
+    return word
+
+
+def build_asm(rp2, program, width, select_count, active_low=True):
+    """
+    Assemble `program` avec rp2.asm_pio. Le corps est exécuté par
+    l'assembleur avec ses propres globales : les données passent par la
+    fermeture.
+    """
+    targets = {arg for op, arg, _ in program if op == JMP_Y_DEC}
+    side_init = rp2.PIO.OUT_HIGH if active_low else rp2.PIO.OUT_LOW
+
+    @rp2.asm_pio(
+        out_init=(rp2.PIO.OUT_LOW,) * width,
+        sideset_init=(side_init,) * select_count,
+        out_shiftdir=rp2.PIO.SHIFT_RIGHT,
+        fifo_join=rp2.PIO.JOIN_TX,
+    )
+    def display_scan():
+        wrap_target()
+        for index, (op, arg, side) in enumerate(program):
+            if index in targets:
+                label("hold" + str(index))
+            if op == "pull_noblock":
+                pull(noblock).side(side)
+            elif op == "mov_x_osr":
+                mov(x, osr).side(side)
+            elif op == "out_pins":
+                out(pins, arg).side(side)
+            elif op == "set_y":
+                set(y, arg).side(side)
+            else:
+                jmp(y_dec, "hold" + str(arg)).side(side)
+        wrap()
+
+    return display_scan
+
+
+class PioDisplay:
+    """
+    Afficheur multiplexé par la PIO. show() ne pousse un mot que si les
+    chiffres ont changé.
+    """
+
+    def __init__(
+        self,
+        data_pins,
+        select_pins,
+        codes,
+        active_low=True,
+        state_machine=0,
+        refresh_hz=REFRESH_HZ,
+    ):
+        """
+        Args:
+            data_pins (list): Broche pilotée par chaque bit d'un code (bloc
+                contigu de GPIO).
+            select_pins (list): Broches de sélection, consécutives et dans
+                l'ordre des afficheurs.
+            codes (list): Code envoyé pour chaque chiffre (segments ou BCD).
+            active_low (bool): Sélection active à 0.
+            state_machine (int): Numéro de la machine à états (0-7).
+            refresh_hz (int): Balayages complets par seconde.
+        """
+        import rp2
+        from machine import Pin
+
+        base = select_pins[0]
+        if list(select_pins) != list(range(base, base + len(select_pins))):
+            raise ValueError("Broches de sélection non consécutives")
+        self.width = len(data_pins)
+        self.table = out_codes(data_pins, codes)
+        program = scan_program(len(select_pins), self.width, active_low)
+        self.sm = rp2.StateMachine(
+            state_machine,
+            build_asm(rp2, program, self.width, len(select_pins), active_low),
+            freq=scan_cycles(len(select_pins)) * refresh_hz,
+            out_base=Pin(min(data_pins)),
+            sideset_base=Pin(base),
+        )
+        self.last = None
+        self.sm.active(1)
+
+    def show(self, digits):
+        """
+        Affiche `digits` (poussé seulement s'il a changé et si la FIFO a de
+        la place : ne bloque jamais).
+        """
+        word = encode_frame(digits, self.table, self.width)
+        if word != self.last and self.sm.tx_fifo() < 8:
+            self.sm.put(word)
+            self.last = word
+
+    def stop(self):
+        self.sm.active(0)
@@ -0,0 +1,287 @@
+"""
+Couche de fiabilité des requêtes Firebase : nouveaux essais avec attente
+exponentielle bornée et aléatoire, disjoncteur (circuit breaker) qui cesse
+d'interroger un serveur en panne, et mesures par point d'accès (compteurs et
+histogramme des latences en puissances de 2) lisibles sur la console série.
+"""
+
+import random
+import time
+from ticks import ticks_ms, ticks_diff
+
+RETRY_ATTEMPTS = 3  # Essais par requête
+BACKOFF_BASE_MS = 250  # Attente maximale avant le 2e essai
+BACKOFF_CAP_MS = 4000  # Attente maximale entre deux essais
+BREAKER_THRESHOLD = 5  # Échecs consécutifs avant d'ouvrir le circuit
+BREAKER_RESET_MS = 30000  # Durée d'ouverture avant un essai de reprise
+HISTOGRAM_BUCKETS = 16  # [0,1) ms, [1,2), [2,4), ... , >= 16 s
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(OSError):
+    """
+    Requête refusée sans appel réseau : le circuit est ouvert.
+    """
+
+
+def backoff_delay(attempt, base_ms=BACKOFF_BASE_MS, cap_ms=BACKOFF_CAP_MS):
+    """
+    Attente avant le nouvel essai n° attempt + 1, en ms : tirage uniforme
+    entre 0 et min(cap_ms, base_ms * 2^attempt) (« full jitter »), pour que
+    plusieurs machines ne réessaient pas en même temps.
+    """
+    return random.randint(0, min(cap_ms, base_ms << attempt))
+
+
+def endpoint_name(method, path):
+    """
+    Nom du point d'accès d'une requête, sans paramètres et avec les numéros
+    de partie regroupés : ("PATCH", "/MA12.json") -> "PATCH /MA*.json".
+    """
+    path = path.split("?", 1)[0]
+    parts = path.split("/")
+    for i, part in enumerate(parts):
+        if part.startswith("MA") and len(part) > 2 and "0" <= part[2] <= "9":
+            end = 2
+            while end < len(part) and "0" <= part[end] <= "9":
+                end += 1
+            parts[i] = "MA*" + part[end:]
+    return method + " " + "/".join(parts)
+
+
+def latency_bucket(elapsed_ms):
+    """
+    Case de l'histogramme d'une latence : nombre de bits de la durée en ms.
+    """
+    bucket = 0
+    while elapsed_ms > 0 and bucket < HISTOGRAM_BUCKETS - 1:
+        elapsed_ms >>= 1
+        bucket += 1
+    return bucket
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur : après `threshold` échecs consécutifs, les requêtes sont
+    refusées pendant `reset_ms`, puis une seule requête d'essai est permise :
+    les autres sont refusées jusqu'à son résultat (success ou failure). Un
+    essai sans résultat après `reset_ms` (requête annulée) est abandonné et
+    un nouvel essai est permis.
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_ms=BREAKER_RESET_MS):
+        self.threshold = threshold
+        self.reset_ms = reset_ms
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._opened_at = 0
+        self._trial = False  # Essai de reprise en cours
+        self._trial_at = 0
+
+    def allow(self):
+        """
+        Vrai si une requête peut partir. En demi-ouvert, seul l'appelant qui
+        obtient l'essai de reprise reçoit True.
+        """
+        now = ticks_ms()
+        if self.state == OPEN:
+            if ticks_diff(now, self._opened_at) < self.reset_ms:
+                return False
+            self.state = HALF_OPEN
+            self._trial = False
+        if self.state == HALF_OPEN:
+            if self._trial and ticks_diff(now, self._trial_at) < self.reset_ms:
+                return False
+            self._trial = True
+            self._trial_at = now
+        return True
+
+    def success(self):
+        self.failures = 0
+        self.state = CLOSED
+        self._trial = False
+
+    def failure(self):
+        self.failures += 1
+        self._trial = False
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self._opened_at = ticks_ms()
+
+
+class EndpointMetrics:
+    """
+    Compteurs par point d'accès : requêtes, échecs, nouveaux essais, refus
+    par le disjoncteur et histogramme des latences.
+    """
+
+    def __init__(self):
+        self.endpoints = {}
+
+    def _entry(self, endpoint):
+        entry = self.endpoints.get(endpoint)
+        if entry is None:
+            entry = self.endpoints[endpoint] = {
+                "requests": 0,
+                "errors": 0,
+                "retries": 0,
+                "rejected": 0,
+                "histogram": [0] * HISTOGRAM_BUCKETS,
+            }
+        return entry
+
+    def record(self, endpoint, elapsed_ms, ok):
+        entry = self._entry(endpoint)
+        entry["requests"] += 1
+        if not ok:
+            entry["errors"] += 1
+        entry["histogram"][latency_bucket(elapsed_ms)] += 1
+
+    def retry(self, endpoint):
+        self._entry(endpoint)["retries"] += 1
+
+    def rejected(self, endpoint):
+        self._entry(endpoint)["rejected"] += 1
+
+    @staticmethod
+    def percentile_ms(histogram, q):
+        """
+        Borne supérieure (ms) de la case qui contient le percentile q.
+        """
+        total = sum(histogram)
+        if not total:
+            return 0
+        seen = 0
+        for bucket, count in enumerate(histogram):
+            seen += count
+            if seen >= q * total:
+                return 1 << bucket
+        return 1 << (HISTOGRAM_BUCKETS - 1)
+
+    def dump(self, breaker=None):
+        """
+        Affiche les mesures sur la console série.
+        """
+        if breaker is not None:
+            print(f"Circuit Firebase : {breaker.state} ({breaker.trips} ouverture(s))")
+        for endpoint, entry in self.endpoints.items():
+            histogram = entry["histogram"]
+            last = max([i for i, count in enumerate(histogram) if count] or [0])
+            print(
+                f"{endpoint} : {entry['requests']} req, {entry['errors']} err, "
+                f"{entry['retries']} essai(s), {entry['rejected']} refus, "
+                f"p50<{self.percentile_ms(histogram, 0.5)} ms, "
+                f"p99<{self.percentile_ms(histogram, 0.99)} ms, "
+                f"histo={histogram[: last + 1]}"
+            )
+
+
+class RetryState:
+    """
+    Suivi des essais d'une requête, sans entrée-sortie : partagé par
+    ResilientSession (attente avec time.sleep) et par le client asynchrone
+    (asyncio.sleep). Lève CircuitOpenError sans appel réseau quand le
+    circuit est ouvert.
+    """
+
+    def __init__(self, method, path, breaker, metrics, attempts=RETRY_ATTEMPTS):
+        self.endpoint = endpoint_name(method, path)
+        self.breaker = breaker
+        self.metrics = metrics
+        self.attempts = attempts
+        self.attempt = 0
+        self.start = 0
+        if not breaker.allow():
+            metrics.rejected(self.endpoint)
+            raise CircuitOpenError("Circuit ouvert : Firebase indisponible")
+
+    def begin(self):
+        """
+        À appeler juste avant chaque essai.
+        """
+        self.start = ticks_ms()
+
+    def answered(self, status_code):
+        """
+        Essai terminé par une réponse. Retourne l'attente (ms) avant un
+        nouvel essai, ou -1 pour rendre la réponse à l'appelant (code < 500,
+        ou dernière réponse 5xx).
+        """
+        if status_code < 500:
+            self.metrics.record(self.endpoint, ticks_diff(ticks_ms(), self.start), True)
+            self.breaker.success()
+            return -1
+        return self.failed()
+
+    def failed(self):
+        """
+        Essai en échec (erreur réseau ou 5xx). Retourne l'attente (ms) avant
+        un nouvel essai, ou -1 quand les essais sont épuisés ou que le
+        disjoncteur s'est ouvert.
+        """
+        self.metrics.record(self.endpoint, ticks_diff(ticks_ms(), self.start), False)
+        self.breaker.failure()
+        self.attempt += 1
+        if self.attempt >= self.attempts or not self.breaker.allow():
+            return -1
+        self.metrics.retry(self.endpoint)
+        return backoff_delay(self.attempt - 1)
+
+
+class ResilientSession:
+    """
+    Enveloppe d'une FirebaseSession (même interface) qui ajoute les nouveaux
+    essais, le disjoncteur et les mesures. Une réponse 5xx compte comme un
+    échec ; les autres codes sont rendus à l'appelant.
+    """
+
+    def __init__(self, session, breaker=None, metrics=None, attempts=RETRY_ATTEMPTS):
+        """
+        Args:
+            session (FirebaseSession): Session à envelopper.
+            breaker (CircuitBreaker): Disjoncteur partagé (optionnel).
+            metrics (EndpointMetrics): Mesures partagées (optionnel).
+            attempts (int): Nombre maximal d'essais par requête.
+        """
+        self.session = session
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or EndpointMetrics()
+        self.attempts = attempts
+
+    def request(self, method, path, json_data=None, headers=None):
+        retry = RetryState(method, path, self.breaker, self.metrics, self.attempts)
+        while True:
+            retry.begin()
+            try:
+                response = self.session.request(method, path, json_data, headers)
+            except OSError:
+                delay = retry.failed()
+                if delay < 0:
+                    raise
+            else:
+                delay = retry.answered(response.status_code)
+                if delay < 0:
+                    return response  # Réponse < 500 ou dernière 5xx, traitée par l'appelant
+                response.close()
+            time.sleep(delay / 1000)
+
+    def get(self, path, headers=None):
+        return self.request("GET", path, headers=headers)
+
+    def patch(self, path, json_data, headers=None):
+        return self.request("PATCH", path, json_data=json_data, headers=headers)
+
+    def put(self, path, json_data, headers=None):
+        return self.request("PUT", path, json_data=json_data, headers=headers)
+
+    def close(self):
+        self.session.close()
+
+    def stats(self):
+        return self.session.stats()
@@ -1,31 +1,22 @@
 """
-7-Segment Display with ESP32
-This code is designed to work with an ESP32 microcontroller and a 7-segment display.
-It uses the machine module to control GPIO pins and a timer for periodic updates.
+7-Segment Display with RP2040
+This code is designed to work with an RP2040 microcontroller (Raspberry Pi Pico)
+and a multiplexed 7-segment display. Each refresh writes precomputed pin masks
+to the RP2040 SIO GPIO_OUT_SET/GPIO_OUT_CLR registers through machine.mem32
+(see gpio_frames.py), driven by a timer for periodic updates.
 """
 
-from machine import Pin
-
-SEGMENT_MAP = [
-    0b0111111,
-    0b0000110,
-    0b1011011,
-    0b1001111,
-    0b1100110,
-    0b1101101,
-    0b1111101,
-    0b0000111,
-    0b1111111,
-    0b1101111,
-]
+from machine import Pin, mem32
+from digit_codec import to_digits
+from gpio_frames import SEGMENT_MAP, FrameBuffer, frame_masks
 
 
 class SevenSegmentDisplay:
     """
-    Classe pour contrôler un afficheur 7 segments avec ESP32.
+    Classe pour contrôler un afficheur 7 segments avec le RP2040 (registres SIO).
     """
 
-    def __init__(self, segment_pins, display_select_pins, num_digits=3):
+    def __init__(self, segment_pins, display_select_pins, num_digits=3, registers=None):
         """
         Initialise l'afficheur 7 segments.
 
@@ -33,12 +24,18 @@ class SevenSegmentDisplay:
             segment_pins (list): Liste des broches GPIO pour les segments.
             display_select_pins (list): Liste des broches GPIO pour la sélection des afficheurs.
             num_digits (int): Nombre de chiffres à afficher.
+            registers: Accès aux registres SIO (machine.mem32 par défaut,
+                gpio_frames.FakeRegisters pour les tests).
         """
         self.segments_pins = [Pin(i, Pin.OUT) for i in segment_pins]
         self.display_select_pins = [Pin(i, Pin.OUT) for i in display_select_pins]
         self.num_digits = num_digits
-        self.current_digit = 0
-        self.digits = [0] * num_digits
+        self.digits = [0] * num_digits  # Chiffres à publier (logique de jeu)
+        # Masques SET/CLR de chaque (afficheur, chiffre), calculés une fois
+        self.masks = frame_masks(segment_pins, display_select_pins[:num_digits])
+        # Trames affichées : double tampon échangé en fin de balayage
+        self.frame_buffer = FrameBuffer(self.masks, num_digits, len(SEGMENT_MAP))
+        self.registers = mem32 if registers is None else registers
 
     def display_segments(self, value):
         """
@@ -84,19 +81,23 @@ class SevenSegmentDisplay:
         Args:
             timer: Objet Timer appelant cette fonction périodiquement.
         """
-        # Désactive tous les afficheurs
-        self.select_display(0)
-        # Affiche le chiffre courant sur les segments
-        self.display_segments(self.number_to_7segment(self.digits[self.current_digit]))
-        # Active l'afficheur correspondant
-        self.select_display(1 << self.current_digit)
-        self.current_digit += 1
-        if self.current_digit == self.num_digits:
-            self.current_digit = 0
+        # Deux écritures SIO des masques déjà encodés (tampon avant) :
+        # segments + désactivation (SET), puis autres segments + activation
+        # de l'afficheur courant (CLR)
+        self.frame_buffer.refresh(self.registers)
+
+    def publish(self):
+        """
+        Publie self.digits : affichés à partir du prochain balayage complet,
+        jamais en partie. Sans allocation.
+        """
+        self.frame_buffer.publish(self.digits)
 
     def number_to_digits(self, number):
         """
         Convertit un nombre en une liste de chiffres, complétée à gauche si besoin.
+        Les chiffres sont écrits dans self.digits, sans allocation, puis
+        publiés.
 
         Args:
             number (int): Nombre à convertir.
@@ -104,5 +105,6 @@ class SevenSegmentDisplay:
         Returns:
             list: Liste des chiffres composant le nombre.
         """
-        self.digits = [int(digit) for digit in str(number)]
+        to_digits(number, self.digits)
+        self.publish()
         return self.digits
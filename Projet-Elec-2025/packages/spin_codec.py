@@ -0,0 +1,72 @@
+"""
+Encodage compact de l'historique des tirages ('combinaison') d'une partie.
+Chaque tirage de NUM_DIGITS chiffres est rangé dans une paire d'octets
+(valeur 0-999, gros-boutiste) et la suite est envoyée en base64, avec le
+champ 'combinaisonFormat' qui indique la version du schéma.
+Le décodeur est partagé par la machine, les outils et les tests ; le site
+(frontend) utilise son équivalent decodeCombinaison.
+"""
+
+import binascii
+from digit_codec import to_digits
+
+COMBINAISON_FORMAT = 1  # Version 1 : paires d'octets en base64
+
+
+def frame_value(frame):
+    """
+    Retourne la valeur entière d'un tirage ([8, 0, 4] -> 804).
+    """
+    value = 0
+    for digit in frame:
+        value = value * 10 + digit
+    return value
+
+
+def encode_combinaison(frames):
+    """
+    Encode une liste de tirages en chaîne base64 (2 octets par tirage).
+    """
+    packed = bytearray(2 * len(frames))
+    index = 0
+    for frame in frames:
+        value = frame_value(frame)
+        if value > 0xFFFF:
+            raise ValueError("Tirage trop grand pour une paire d'octets")
+        packed[index] = value >> 8
+        packed[index + 1] = value & 0xFF
+        index += 2
+    return binascii.b2a_base64(packed).decode().strip()
+
+
+def decode_combinaison(text, num_digits=3):
+    """
+    Décode une chaîne produite par encode_combinaison en liste de tirages.
+    """
+    packed = binascii.a2b_base64(text)
+    frames = []
+    for index in range(0, len(packed) - 1, 2):
+        value = (packed[index] << 8) | packed[index + 1]
+        frames.append(to_digits(value, [0] * num_digits))
+    return frames
+
+
+def game_frames(game, num_digits=3):
+    """
+    Retourne les tirages d'une partie Firebase, quel que soit leur format :
+    compact (combinaisonFormat 1), liste de listes ou dictionnaire indexé.
+    """
+    combinaison = game.get("combinaison") or []
+    fmt = game.get("combinaisonFormat")
+    if fmt == COMBINAISON_FORMAT:
+        return decode_combinaison(combinaison, num_digits)
+    if fmt is not None:
+        raise ValueError(f"Format de combinaison inconnu : {fmt}")
+    if isinstance(combinaison, dict):
+        combinaison = [combinaison[k] for k in sorted(combinaison, key=int)]
+    frames = []
+    for frame in combinaison:
+        if isinstance(frame, dict):
+            frame = [frame[k] for k in sorted(frame, key=int)]
+        frames.append(list(frame))
+    return frames
@@ -0,0 +1,95 @@
+"""
+Plan d'une partie, calculé à l'appui sur le bouton.
+Tous les tirages affichés pendant l'animation (le dernier est le résultat)
+sont écrits d'avance dans un FrameRecorder (bytearray alloué une seule
+fois). Le callback du timer se contente de copier la trame suivante dans les
+chiffres de l'afficheur et d'avancer un index : il n'alloue rien. Quand
+l'animation est finie, il lève un drapeau ; le calcul du gain et l'envoi à
+Firebase sont faits par la boucle principale.
+Avec plan_seeded, les tirages viennent de SpinRng : la graine, enregistrée
+avec le résultat, permet de rejouer la partie à l'identique.
+"""
+
+import random
+from frame_recorder import MAX_FRAMES, FrameRecorder
+from spin_rng import SpinRng
+
+MIN_FRAMES = 10  # Tirages affichés par partie (random.randint(10, 15))
+
+
+class SpinPlanner:
+    """
+    Trames d'une partie dans un tampon préalloué de max_frames x num_digits.
+    """
+
+    def __init__(self, num_digits=3, max_frames=MAX_FRAMES):
+        """
+        Args:
+            num_digits (int): Nombre de chiffres par tirage.
+            max_frames (int): Nombre maximal de tirages par partie.
+        """
+        self.num_digits = num_digits
+        self.max_frames = max_frames
+        self.frames = FrameRecorder(num_digits, max_frames)  # Trames de la partie
+        self.position = 0  # Prochaine trame à afficher
+        self.finished = False  # Levé par advance() après la dernière trame
+        self.seed = None  # Graine de la partie en cours (plan_seeded)
+
+    def plan(self, frame_count=None, rng=random):
+        """
+        Tire toutes les trames de la partie (hors interruption).
+
+        Args:
+            frame_count (int): Nombre de tirages ; tiré entre MIN_FRAMES et
+                MAX_FRAMES si absent.
+            rng: Générateur (module random par défaut).
+        """
+        if frame_count is None:
+            frame_count = rng.randint(MIN_FRAMES, self.max_frames)
+        if not 0 < frame_count <= self.max_frames:
+            raise ValueError("Nombre de tirages hors limites")
+        low = 10 ** (self.num_digits - 1)
+        self.frames.reset()
+        for _ in range(frame_count):
+            self.frames.append_number(rng.randrange(low, low * 10))
+        self.position = 0
+        self.finished = False
+        self.seed = None
+        return frame_count
+
+    def plan_seeded(self, seed, frame_count=None):
+        """
+        Tire la partie avec SpinRng(seed) : nombre de tirages compris, la
+        même graine donne toujours la même partie.
+        """
+        frame_count = self.plan(frame_count, SpinRng(seed))
+        self.seed = seed
+        return frame_count
+
+    def advance(self, digits):
+        """
+        Copie la trame suivante dans `digits` (liste de l'afficheur, modifiée
+        sur place). Sans allocation : appelable depuis un callback de timer.
+
+        Returns:
+            bool: False quand toutes les trames ont été affichées.
+        """
+        if self.position >= self.frames.count:
+            self.finished = True
+            return False
+        for i in range(self.num_digits):
+            digits[i] = self.frames.digit(self.position, i)
+        self.position += 1
+        return True
+
+    def outcome(self):
+        """
+        Chiffres du résultat (dernière trame).
+        """
+        return self.frames.last()
+
+    def combinations(self):
+        """
+        Liste des tirages de la partie, pour l'envoi à Firebase.
+        """
+        return self.frames.to_lists()
@@ -0,0 +1,160 @@
+"""
+File d'attente persistante des résultats de partie.
+Chaque résultat est ajouté en fin de fichier sur la flash avant tout envoi réseau :
+il survit aux coupures Wi-Fi et aux redémarrages, puis est envoyé plus tard
+avec les autres résultats en attente (voir firebase.flush_spin_queue).
+"""
+
+import json
+import os
+
+QUEUE_FILE = "spin_queue.jsonl"
+
+
+class SpinQueue:
+    """
+    File append-only de résultats [clé de partie ou None, données].
+    Une même clé n'apparaît qu'une fois : la dernière écriture l'emporte.
+    """
+
+    def __init__(self, path=QUEUE_FILE):
+        """
+        Args:
+            path (str): Fichier de la file sur la flash.
+        """
+        self.path = path
+        self.pending = []
+        self._load()
+
+    def _load(self):
+        """
+        Relit la file depuis la flash. Une ligne tronquée (écriture
+        interrompue par une coupure) est ignorée et le fichier est réécrit
+        sans elle : sinon le prochain append serait collé à sa suite et
+        perdu à son tour.
+        """
+        torn = False
+        try:
+            with open(self.path) as file:
+                for line in file:
+                    if not line.endswith("\n"):
+                        torn = True  # Fin de ligne jamais écrite
+                    try:
+                        key, data = json.loads(line)
+                    except (ValueError, TypeError):
+                        torn = True
+                        continue
+                    self._store(key, data)
+        except OSError:
+            return  # Pas encore de fichier
+        if torn:
+            self._rewrite()
+
+    def _store(self, key, data):
+        if key is not None:
+            for entry in self.pending:
+                if entry[0] == key:
+                    entry[1] = data
+                    return
+        self.pending.append([key, data])
+
+    def _rewrite(self):
+        """
+        Réécrit la file entière de façon atomique (fichier temporaire + rename).
+        """
+        if not self.pending:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as file:
+            for entry in self.pending:
+                file.write(json.dumps(entry))
+                file.write("\n")
+        os.rename(tmp_path, self.path)
+
+    def append(self, data, key=None):
+        """
+        Ajoute un résultat à la file et l'écrit immédiatement sur la flash.
+
+        Args:
+            data (dict): Données de la partie (updated_data).
+            key (str): Clé 'MA<n>' si elle est déjà connue, sinon None.
+        """
+        with open(self.path, "a") as file:
+            file.write(json.dumps([key, data]))
+            file.write("\n")
+        self._store(key, data)
+
+    def __len__(self):
+        return len(self.pending)
+
+    def unassigned_count(self):
+        """
+        Nombre de résultats qui n'ont pas encore de clé de partie.
+        """
+        return sum(1 for entry in self.pending if entry[0] is None)
+
+    def assign(self, free_keys):
+        """
+        Attribue, dans l'ordre, des clés libres aux résultats qui n'en ont pas.
+        Les attributions sont écrites sur la flash avant l'envoi, de sorte qu'un
+        nouvel essai réécrit exactement les mêmes parties.
+
+        Args:
+            free_keys (list): Clés non jouées, triées par numéro croissant.
+        """
+        used = {entry[0] for entry in self.pending if entry[0] is not None}
+        keys = iter(key for key in free_keys if key not in used)
+        changed = False
+        for entry in self.pending:
+            if entry[0] is None:
+                entry[0] = next(keys, None)
+                if entry[0] is None:
+                    break
+                changed = True
+        if changed:
+            self._rewrite()
+
+    def multipath_body(self):
+        """
+        Construit le corps d'un PATCH multi-chemins à la racine pour tous les
+        résultats qui ont une clé : {"MA5/gain": 20, "MA5/mise": 10, ...}.
+        """
+        body = {}
+        for key, data in self.pending:
+            if key is None:
+                continue
+            for field, value in data.items():
+                body[f"{key}/{field}"] = value
+        return body
+
+    def rekey(self, entry, key):
+        """
+        Change la clé d'un résultat de la file et l'écrit sur la flash.
+
+        Args:
+            entry (list): Élément [clé, données] de self.pending.
+            key (str): Nouvelle clé, ou None pour la libérer.
+        """
+        entry[0] = key
+        self._rewrite()
+
+    def remove(self, entry):
+        """
+        Retire un résultat envoyé de la file.
+
+        Args:
+            entry (list): Élément [clé, données] de self.pending.
+        """
+        self.pending.remove(entry)
+        self._rewrite()
+
+    def commit(self):
+        """
+        Retire de la file les résultats envoyés (ceux qui avaient une clé).
+        """
+        self.pending = [entry for entry in self.pending if entry[0] is None]
+        self._rewrite()
@@ -0,0 +1,68 @@
+"""
+Générateur pseudo-aléatoire déterministe des parties (xorshift32).
+Chaque partie tire une graine de 32 bits, enregistrée avec le résultat :
+la même graine redonne exactement les mêmes tirages, sur la carte comme sur
+l'hôte (tools/replay.py). xorshift32 n'utilise que des décalages et des
+ou-exclusifs sur 32 bits, peu coûteux en MicroPython (PCG demanderait des
+multiplications 64 bits). Il n'est pas cryptographique : la graine vient de
+os.urandom, le générateur ne sert qu'à rejouer la partie.
+"""
+
+import os
+
+RNG_NAME = "xorshift32"  # Enregistré avec la graine ('rng')
+MASK = 0xFFFFFFFF
+ZERO_SEED = 0x9E3779B9  # Remplace la graine 0, point fixe de xorshift
+
+
+def new_seed():
+    """
+    Graine de 32 bits tirée du générateur matériel.
+    """
+    return int.from_bytes(os.urandom(4), "little")
+
+
+class SpinRng:
+    """
+    xorshift32 de Marsaglia (13, 17, 5), avec l'interface de `random`
+    utilisée par le jeu (randrange, randint).
+    """
+
+    def __init__(self, seed):
+        """
+        Args:
+            seed (int): Graine (32 bits).
+        """
+        self.seed = seed & MASK
+        self.state = self.seed or ZERO_SEED
+
+    def next32(self):
+        """
+        Entier suivant, entre 1 et 2^32 - 1.
+        """
+        x = self.state
+        x ^= (x << 13) & MASK
+        x ^= x >> 17
+        x ^= (x << 5) & MASK
+        self.state = x
+        return x
+
+    def randrange(self, start, stop):
+        """
+        Entier uniforme dans [start, stop), sans biais de modulo (les valeurs
+        au-delà du dernier multiple de l'intervalle sont rejetées).
+        """
+        span = stop - start
+        if span <= 0:
+            raise ValueError("Intervalle vide")
+        limit = (MASK + 1) // span * span
+        x = self.next32()
+        while x >= limit:
+            x = self.next32()
+        return start + x % span
+
+    def randint(self, a, b):
+        """
+        Entier uniforme dans [a, b].
+        """
+        return self.randrange(a, b + 1)
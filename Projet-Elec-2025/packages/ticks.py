@@ -0,0 +1,22 @@
+"""
+Horloge en millisecondes / microsecondes commune à la carte et à l'hôte.
+Sur MicroPython, ce sont les fonctions ticks_* du module time ; sur CPython
+(tests et outils), un équivalent basé sur time.monotonic_ns.
+"""
+
+try:
+    from time import ticks_ms, ticks_us, ticks_diff, ticks_add
+except ImportError:  # CPython
+    from time import monotonic_ns
+
+    def ticks_ms():
+        return monotonic_ns() // 1000000
+
+    def ticks_us():
+        return monotonic_ns() // 1000
+
+    def ticks_diff(new, old):
+        return new - old
+
+    def ticks_add(ticks, delta):
+        return ticks + delta
@@ -4,6 +4,8 @@ from pico_i2c_lcd import I2cLcd  # Assurez-vous d'avoir installé cette biblioth
 import random
 import time, sys
 from ads1x15 import ADS1115  # Assurez-vous d'avoir installé cette bibliothèque
+from digit_codec import to_digits
+from pio_display import PioDisplay
 
 ########## Configuration matérielle ##########
 # Activation des composants
@@ -51,6 +53,7 @@ chiffres = [1, 2, 3]
 SCORE = 0  # Variable pour stocker le SCORE
 MISE = 10  # Somme initiale pariée
 FREQUENCE_AFFICHEUR = NOMBRE_DE_CHIFFRES * 100
+AFFICHAGE_PIO = False  # True : balayage des afficheurs par la PIO (plus de timer)
 CODE_EN_COURS = False
 BOUTON_APPUYE = False
 
@@ -83,9 +86,10 @@ def selectionner_afficheur(valeur):
 
 def convertir_nombre_en_chiffres(nombre):
     """
-    Convertit un nombre en un tableau de ses chiffres.
+    Écrit les chiffres d'un nombre dans la liste `chiffres` (lue par
+    ecrire_sur_afficheurs), complétés à gauche par des zéros. Sans allocation.
     """
-    return [int(chiffre) for chiffre in str(nombre)]
+    return to_digits(nombre, chiffres)
 
 
 ########## Fonctions principales ##########
@@ -110,47 +114,16 @@ def generer_aleatoire(timer):
     """
     Fonction appelée par le timer pour générer un chiffre aléatoire.
     """
-    global chiffres, COMPTEUR_GENERES
+    global COMPTEUR_GENERES
 
     if COMPTEUR_GENERES < NOMBRES_A_GENERER:
         nombre_aleatoire = random.randrange(
             10 ** (NOMBRE_DE_CHIFFRES - 1), 10**NOMBRE_DE_CHIFFRES
         )
-        chiffres = convertir_nombre_en_chiffres(nombre_aleatoire)
+        convertir_nombre_en_chiffres(nombre_aleatoire)  # Sur place
         COMPTEUR_GENERES += 1
 
 
-def calculer_gain(rouleaux: list[int], mise: int) -> int:
-    """
-    Calcule le gain en fonction du tirage et du montant misé.
-    """
-    r2, r1, r3 = rouleaux
-    multiplicateur = 0
-    presence_evenement = False
-
-    if r1 == r2 == r3:
-        return 100 if r1 == 7 else 10  # (Méga) Jackpot ou Jackpot
-    if (r1 + 1 == r3 and r2 + 1 == r1) or (r1 - 1 == r3 and r2 - 1 == r1):
-        multiplicateur = 5  # Suite
-        presence_evenement = True
-    elif r1 == r3 and r1 != r2:
-        multiplicateur = 2  # Sandwich
-        presence_evenement = True
-    if r1 % 2 == r2 % 2 == r3 % 2:
-        multiplicateur = 1.5  # Pair/Impair
-        presence_evenement = True
-
-    compte_7 = rouleaux.count(7)
-    multiplicateur += compte_7 * 0.5
-    if not presence_evenement:
-        if compte_7 == 1:
-            multiplicateur = 0.5  # Perdre 50% de sa somme
-        elif compte_7 == 2:
-            multiplicateur = 1  # Récupérer sa mise
-
-    return int(mise * multiplicateur)
-
-
 def mettre_a_jour_mise():
     """
     Met à jour la somme pariée en fonction de la position du joystick.
@@ -200,9 +173,16 @@ def bouton_callback(broche):
 broche_bouton.irq(trigger=Pin.IRQ_FALLING, handler=bouton_callback)
 
 timer_afficheur = Timer()
-timer_afficheur.init(
-    freq=FREQUENCE_AFFICHEUR, mode=Timer.PERIODIC, callback=ecrire_sur_afficheurs
-)
+afficheur_pio = None
+if AFFICHAGE_PIO:
+    # Bit i du code BCD -> broche : 3 (bit 0), 2, 1, 4 (bit 3) ; sélection active à 1
+    afficheur_pio = PioDisplay(
+        [3, 2, 1, 4], [19, 20, 21], list(range(10)), active_low=False
+    )
+else:
+    timer_afficheur.init(
+        freq=FREQUENCE_AFFICHEUR, mode=Timer.PERIODIC, callback=ecrire_sur_afficheurs
+    )
 
 ########## Boucle principale ##########
 
@@ -221,6 +201,8 @@ while True:
             TIMER_ALEATOIRE.init(
                 period=250, mode=Timer.PERIODIC, callback=generer_aleatoire
             )
+        if afficheur_pio:
+            afficheur_pio.show(chiffres)  # Poussé seulement s'il a changé
         time.sleep(0.1)
     except KeyboardInterrupt:
         print("Au revoir")
@@ -228,5 +210,7 @@ while True:
         ecran_lcd.putstr("Au revoir")
         time.sleep(0.01)
         timer_afficheur.deinit()
+        if afficheur_pio:
+            afficheur_pio.stop()
         TIMER_ALEATOIRE.deinit()
         sys.exit()
@@ -0,0 +1,128 @@
+import asyncio
+
+import firebase
+from firebase_async import AsyncFirebaseClient
+from firebase_session import FirebaseSession
+from spin_queue import SpinQueue
+from tools.firebase_standin import FirebaseStandin, etag_of
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_claim_game_single_put
+
+Vérifie qu'une partie libre est réservée et écrite en une lecture et un PUT
+conditionnel.
+
+2. test_claim_game_conflict_and_retry
+
+Vérifie qu'une partie prise par une autre machine est signalée (False),
+qu'un envoi déjà reçu est reconnu sans réécriture, et qu'un 412 sur une
+partie encore libre est réécrit sans nouvelle lecture.
+
+3. test_claim_spin_queue_two_cabinets
+
+Vérifie que deux machines qui visent les mêmes parties obtiennent chacune
+une partie différente.
+
+4. test_async_claim_game
+
+Vérifie la même réservation avec le client asynchrone.
+"""
+
+RESULT = {"gain": 20, "partieJouee": True, "mise": 10}
+
+
+def _games():
+    return {
+        "MA1": {"partieJouee": False, "solde": 100},
+        "MA2": {"partieJouee": False, "solde": 90},
+        "MA3": {"partieJouee": False, "solde": 80},
+    }
+
+
+def _use_server(monkeypatch, server):
+    session = FirebaseSession(server.url)
+    monkeypatch.setattr(firebase, "SESSION", session)
+    return session
+
+
+def test_claim_game_single_put(monkeypatch):
+    """
+    Une lecture avec ETag puis un PUT if-match.
+    """
+    server = FirebaseStandin(_games()).start()
+    try:
+        session = _use_server(monkeypatch, server)
+        assert firebase.claim_game("MA1", RESULT) is True
+        assert server.tree.data["MA1"] == {"partieJouee": True, "solde": 100, "gain": 20, "mise": 10}
+        assert session.stats()["requests"] == 2
+    finally:
+        server.stop()
+
+
+def test_claim_game_conflict_and_retry(monkeypatch):
+    """
+    Conflit signalé, nouvel essai reconnu, 412 réécrit sans relire.
+    """
+    server = FirebaseStandin(_games()).start()
+    try:
+        session = _use_server(monkeypatch, server)
+        server.tree.data["MA1"] = {"partieJouee": True, "solde": 100, "gain": 5}
+        assert firebase.claim_game("MA1", RESULT) is False
+
+        server.tree.data["MA2"].update(RESULT)  # Réponse précédente perdue
+        assert firebase.claim_game("MA2", RESULT) is True
+
+        stale = {"partieJouee": False, "solde": 80}
+        etag = etag_of(stale)
+        server.tree.data["MA3"]["solde"] = 85  # Modifié par le site entre-temps
+        before = session.stats()["requests"]
+        assert firebase.claim_game("MA3", RESULT, stale, etag) is True
+        assert session.stats()["requests"] - before == 2  # PUT 412 puis PUT 200
+        assert server.tree.data["MA3"]["solde"] == 85
+        assert server.tree.data["MA3"]["gain"] == 20
+    finally:
+        server.stop()
+
+
+def test_claim_spin_queue_two_cabinets(monkeypatch, tmp_path):
+    """
+    Deux files visent MA1 : la seconde passe à MA2.
+    """
+    server = FirebaseStandin(_games()).start()
+    try:
+        _use_server(monkeypatch, server)
+        first = SpinQueue(str(tmp_path / "a.jsonl"))
+        second = SpinQueue(str(tmp_path / "b.jsonl"))
+        first.append(dict(RESULT, gain=1))
+        second.append(dict(RESULT, gain=2))
+        assert firebase.claim_spin_queue(first, ["MA1", "MA2", "MA3"])
+        assert firebase.claim_spin_queue(second, ["MA1", "MA2", "MA3"])
+        assert server.tree.data["MA1"]["gain"] == 1
+        assert server.tree.data["MA2"]["gain"] == 2
+        assert server.tree.data["MA3"]["partieJouee"] is False
+        assert not first.pending and not second.pending
+    finally:
+        server.stop()
+
+
+def test_async_claim_game():
+    """
+    Réservation par le client asynchrone.
+    """
+    server = FirebaseStandin(_games()).start()
+    try:
+        client = AsyncFirebaseClient(server.url)
+
+        async def scenario():
+            taken = await client.claim_game("MA1", RESULT)
+            again = await client.claim_game("MA1", dict(RESULT, gain=99))
+            await client.close()
+            return taken, again
+
+        assert asyncio.run(scenario()) == (True, False)
+        assert server.tree.data["MA1"]["gain"] == 20
+    finally:
+        server.stop()
@@ -0,0 +1,63 @@
+import pytest
+
+from digit_codec import decode_batch, digit_count, digits_of, to_digits
+from tools.digit_benchmark import benchmark, string_digits
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_to_digits_pads_and_fills_in_place
+
+Vérifie que les chiffres sont écrits dans le tampon fourni (liste ou
+bytearray), complétés à gauche par des zéros, et qu'un nombre trop grand ou
+négatif est refusé.
+
+2. test_batch_and_variable_width
+
+Vérifie le décodage d'un script de partie en une fois et la largeur
+naturelle de digits_of, identique à l'ancienne conversion par chaîne.
+
+3. test_benchmark_reports_speedup
+
+Vérifie que le banc d'essai tourne et compare les trois conversions.
+"""
+
+
+def test_to_digits_pads_and_fills_in_place():
+    """
+    Tampon fourni et zéros de tête.
+    """
+    digits = [9, 9, 9]
+    assert to_digits(57, digits) is digits
+    assert digits == [0, 5, 7]
+    buffer = bytearray(6)
+    to_digits(804, buffer, 3, 3)
+    assert list(buffer) == [0, 0, 0, 8, 0, 4]
+    with pytest.raises(ValueError):
+        to_digits(1000, [0, 0, 0])
+    with pytest.raises(ValueError):
+        to_digits(-1, [0, 0, 0])
+
+
+def test_batch_and_variable_width():
+    """
+    Script complet et largeur naturelle.
+    """
+    script = bytearray(9)
+    decode_batch([123, 5, 990], script, 3)
+    assert list(script) == [1, 2, 3, 0, 0, 5, 9, 9, 0]
+    for number in (0, 7, 10, 999, 987654):
+        assert digits_of(number) == string_digits(number)
+        assert digit_count(number) == len(str(number))
+    assert digits_of(7, 3) == [0, 0, 7]
+
+
+def test_benchmark_reports_speedup():
+    """
+    Banc d'essai (petit échantillon).
+    """
+    report = benchmark(count=3000)
+    assert report["frames"] == 3000
+    assert {"string", "to_digits", "decode_batch"} <= set(report)
+    assert report["to_digits"]["speedup"] > 0
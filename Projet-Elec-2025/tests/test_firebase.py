@@ -0,0 +1,171 @@
+import io
+import json
+from unittest.mock import MagicMock, patch
+
+import firebase
+from firebase import first_unplayed_game, fetch_first_unplayed_game
+from firebase_session import FirebaseSession
+from tools.firebase_standin import FirebaseStandin
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_first_unplayed_game_numeric_order
+
+Vérifie que la première partie non jouée est choisie selon le numéro de la clé
+et non selon l'ordre des chaînes ("MA10" < "MA9").
+
+2. test_fetch_first_unplayed_game_indexed
+
+Vérifie que la requête indexée est utilisée et que seule la fenêtre renvoyée est lue.
+
+3. test_fetch_first_unplayed_game_fallback
+
+Vérifie le repli sur la lecture complète en flux quand le serveur refuse la requête (400).
+
+4. test_flush_spin_queue_single_patch
+
+Vérifie que la file d'attente est vidée en un seul PATCH multi-chemins.
+
+5. test_balance_from_latest_game
+
+Vérifie que le solde est lu sur la seule partie la plus récente (MA9 quand
+MA3 à MA9 sont non jouées), qu'il vaut -1 quand elle est jouée, et le repli
+sur la lecture complète sans champ 'numero' ou sans index.
+
+6. test_unplayed_beyond_nine_games
+
+Avec MA1 à MA8 jouées et MA9 à MA14 non jouées, Firebase classe « MA10 »
+avant « MA9 » : vérifie, contre le serveur local, que la première partie,
+les clés libres et les clés attribuées à la file suivent l'ordre numérique.
+"""
+
+
+def _response(status_code, data=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data
+    response.readinto.side_effect = io.BytesIO(json.dumps(data).encode()).readinto
+    return response
+
+
+def test_first_unplayed_game_numeric_order():
+    """
+    La plus petite clé numérique non jouée est retournée.
+    """
+    data = {
+        "MA10": {"partieJouee": False, "solde": 10},
+        "MA9": {"partieJouee": False, "solde": 9},
+        "MA2": {"partieJouee": True, "solde": 2},
+    }
+    assert first_unplayed_game(data) == ("MA9", data["MA9"])
+    assert first_unplayed_game({"MA1": {"partieJouee": True}}) == (None, None)
+
+
+@patch("firebase.SESSION.get")
+def test_fetch_first_unplayed_game_indexed(mock_get):
+    """
+    La requête indexée suffit quand le serveur l'accepte.
+    """
+    mock_get.return_value = _response(200, {"MA4": {"partieJouee": False}})
+    assert fetch_first_unplayed_game() == ("MA4", {"partieJouee": False})
+    path = mock_get.call_args[0][0]
+    assert "orderBy=%22partieJouee%22&equalTo=false" in path
+
+
+@patch("firebase.SESSION.get")
+def test_fetch_first_unplayed_game_fallback(mock_get):
+    """
+    Repli sur la lecture complète (en flux) si l'index n'est pas défini.
+    """
+    full = {
+        "MA1": {"partieJouee": True, "combinaison": [[1, 2, 3]]},
+        "MA2": {"partieJouee": False, "solde": 30, "joueurId": "5"},
+    }
+    mock_get.side_effect = [_response(400), _response(200, full)]
+    assert fetch_first_unplayed_game() == ("MA2", {"partieJouee": False, "solde": 30})
+    assert mock_get.call_args[0][0] == "/.json"
+
+
+@patch("firebase.SESSION")
+def test_flush_spin_queue_single_patch(mock_session, tmp_path):
+    """
+    Deux parties en attente sont envoyées en un seul PATCH à la racine.
+    """
+    from firebase import flush_spin_queue
+    from spin_queue import SpinQueue
+
+    queue = SpinQueue(str(tmp_path / "queue.jsonl"))
+    queue.append({"gain": 10, "partieJouee": True})
+    queue.append({"gain": 0, "partieJouee": True})
+    mock_session.get.return_value = _response(
+        200, {"MA8": {"partieJouee": False}, "MA9": {"partieJouee": False}}
+    )
+    mock_session.patch.return_value = _response(200, {})
+    assert flush_spin_queue(queue) is True
+    mock_session.patch.assert_called_once_with(
+        "/.json",
+        {
+            "MA8/gain": 10,
+            "MA8/partieJouee": True,
+            "MA9/gain": 0,
+            "MA9/partieJouee": True,
+        },
+    )
+    assert len(queue) == 0
+
+
+def test_balance_from_latest_game(monkeypatch):
+    """
+    Le solde vient de la partie la plus récente (numéro, pas chaîne), -1 si
+    elle est jouée, y compris sans index ni champ 'numero'.
+    """
+    from firebase import fetch_latest_game, get_balance_from_firebase
+
+    games = {f"MA{n}": {"partieJouee": n <= 2, "solde": 10 * n, "numero": n} for n in range(1, 10)}
+    server = FirebaseStandin(games, indexes=["partieJouee", "numero"]).start()
+    try:
+        monkeypatch.setattr(firebase, "SESSION", FirebaseSession(server.url))
+        monkeypatch.setattr(firebase, "LAST_BALANCE", None)
+        # MA3 à MA9 non jouées : la plus récente est MA9
+        assert fetch_latest_game() == {"MA9": {"partieJouee": False, "solde": 90, "numero": 9}}
+        assert get_balance_from_firebase(fetch_latest_game, 0) == 90.0
+        server.tree.data["MA9"]["partieJouee"] = True
+        assert get_balance_from_firebase(fetch_latest_game, 0) == -1
+        for game in server.tree.data.values():
+            del game["numero"]  # Parties créées avant le champ 'numero'
+        server.tree.data["MA10"] = {"partieJouee": False, "solde": 5}
+        assert fetch_latest_game() == {"MA10": {"partieJouee": False, "solde": 5}}
+    finally:
+        server.stop()
+    games = {f"MA{n}": {"partieJouee": n <= 2, "solde": 10 * n, "numero": n} for n in range(1, 10)}
+    server = FirebaseStandin(games, indexes=[]).start()
+    try:
+        monkeypatch.setattr(firebase, "SESSION", FirebaseSession(server.url))
+        assert fetch_latest_game() == {"MA9": {"partieJouee": False, "solde": 90}}
+        assert get_balance_from_firebase(fetch_latest_game, 0) == 90.0
+    finally:
+        server.stop()
+
+
+def test_unplayed_beyond_nine_games(monkeypatch, tmp_path):
+    """
+    La première partie non jouée est MA9, pas MA10 (ordre des chaînes).
+    """
+    from spin_queue import SpinQueue
+
+    games = {f"MA{n}": {"partieJouee": n <= 8, "solde": 200 - n} for n in range(1, 15)}
+    server = FirebaseStandin(games, indexes=["partieJouee"]).start()
+    try:
+        monkeypatch.setattr(firebase, "SESSION", FirebaseSession(server.url))
+        assert fetch_first_unplayed_game() == ("MA9", {"partieJouee": False, "solde": 191})
+        assert firebase.query_free_keys() == [f"MA{n}" for n in range(9, 15)]
+        queue = SpinQueue(str(tmp_path / "queue.jsonl"))
+        queue.append({"gain": 10, "partieJouee": True})
+        queue.append({"gain": 0, "partieJouee": True})
+        assert firebase.flush_spin_queue(queue) is True
+        played = [key for key, game in server.tree.data.items() if "gain" in game]
+        assert sorted(played) == ["MA10", "MA9"]
+    finally:
+        server.stop()
@@ -0,0 +1,194 @@
+import asyncio
+import socket
+
+import firebase_async
+from firebase_async import AsyncFirebaseClient
+from spin_queue import SpinQueue
+from tools.firebase_standin import FirebaseStandin
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_fetch_and_flush
+
+Vérifie, avec le serveur Firebase local, la lecture des parties non jouées,
+le solde et l'envoi de la file en un PATCH, sur une seule connexion.
+
+2. test_concurrency_cap
+
+Vérifie que des requêtes lancées en même temps n'ouvrent pas plus de
+connexions que la limite fixée.
+
+3. test_timeout_and_cancel
+
+Vérifie qu'un serveur muet fait échouer la requête après le délai et qu'une
+requête annulée libère sa place.
+
+4. test_fallback_without_index
+
+Vérifie qu'un serveur sans règle .indexOn (requête indexée refusée par un
+400) n'empêche pas le client asynchrone de lire les parties non jouées et
+le solde : il retombe sur la lecture complète, comme firebase.py.
+
+5. test_large_body_streamed
+
+Vérifie que la lecture complète d'une grande base passe par le tampon de
+256 octets de la connexion, morceau par morceau, sans charger le corps.
+"""
+
+
+def _games():
+    return {
+        "MA1": {"partieJouee": True, "solde": 100, "numero": 1},
+        "MA2": {"partieJouee": False, "solde": 90, "numero": 2},
+        "MA3": {"partieJouee": False, "solde": 80, "numero": 3},
+    }
+
+
+def test_fetch_and_flush(tmp_path):
+    """
+    Lecture, solde et PATCH multi-chemins par le client asynchrone.
+    """
+    server = FirebaseStandin(_games()).start()
+    try:
+        client = AsyncFirebaseClient(server.url)
+        queue = SpinQueue(str(tmp_path / "queue.jsonl"))
+        queue.append({"gain": 20, "partieJouee": True})
+
+        async def scenario():
+            games = await client.fetch_unplayed_games()
+            balance = await client.get_balance()
+            flushed = await client.flush_spin_queue(queue)
+            await client.close()
+            return games, balance, flushed
+
+        games, balance, flushed = asyncio.run(scenario())
+        assert sorted(games) == ["MA2", "MA3"]
+        assert balance == 80.0
+        assert flushed
+        assert server.tree.data["MA2"] == {"partieJouee": True, "solde": 90, "numero": 2, "gain": 20}
+        assert client.stats()["requests"] == 4
+        assert client.stats()["handshakes"] == 1
+    finally:
+        server.stop()
+
+
+def test_concurrency_cap():
+    """
+    Cinq requêtes simultanées, deux connexions au plus.
+    """
+    server = FirebaseStandin(_games()).start()
+    try:
+        client = AsyncFirebaseClient(server.url, max_connections=2)
+
+        async def scenario():
+            results = await asyncio.gather(
+                *[client.fetch_unplayed_games() for _ in range(5)]
+            )
+            await client.close()
+            return results
+
+        results = asyncio.run(scenario())
+        assert all(sorted(games) == ["MA2", "MA3"] for games in results)
+        assert client.stats()["handshakes"] <= 2
+    finally:
+        server.stop()
+
+
+def test_timeout_and_cancel():
+    """
+    Délai dépassé puis annulation, sans bloquer les requêtes suivantes.
+    """
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen(4)
+    host, port = silent.getsockname()
+    try:
+        client = AsyncFirebaseClient(
+            f"http://{host}:{port}", max_connections=1, timeout=0.2, attempts=1
+        )
+
+        async def scenario():
+            assert await client.fetch_unplayed_games() is None
+            task = asyncio.create_task(client.request("GET", "/.json", timeout=5))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            # La place libérée par l'annulation est réutilisable
+            assert await client.fetch_unplayed_games() is None
+
+        asyncio.run(scenario())
+        stats = client.stats()
+        assert stats["timeouts"] == 2
+        assert stats["cancelled"] == 1
+    finally:
+        silent.close()
+
+
+def test_fallback_without_index():
+    """
+    Requête indexée refusée : lecture complète de la base.
+    """
+    server = FirebaseStandin(_games(), indexes=[]).start()
+    try:
+        client = AsyncFirebaseClient(server.url)
+
+        async def scenario():
+            games = await client.fetch_unplayed_games()
+            balance = await client.get_balance()
+            await client.close()
+            return games, balance
+
+        games, balance = asyncio.run(scenario())
+        assert games == {
+            "MA2": {"partieJouee": False, "solde": 90},
+            "MA3": {"partieJouee": False, "solde": 80},
+        }
+        assert balance == 80.0
+        assert client.stats()["requests"] == 4  # Requête refusée puis lecture complète, deux fois
+    finally:
+        server.stop()
+
+
+def test_large_body_streamed(monkeypatch):
+    """
+    Lecture complète de 300 parties : aucune lecture plus grande que le tampon.
+    """
+    games = {
+        f"MA{n}": {
+            "partieJouee": n < 300,
+            "solde": 1000 - n,
+            "numero": n,
+            "combinaison": [[1, 2, 3]] * 15,
+        }
+        for n in range(1, 301)
+    }
+    server = FirebaseStandin(games, indexes=[]).start()
+    reads = []
+    stream_readinto = firebase_async.stream_readinto
+
+    async def recording_readinto(reader, buf):
+        reads.append(len(buf))
+        return await stream_readinto(reader, buf)
+
+    monkeypatch.setattr(firebase_async, "stream_readinto", recording_readinto)
+    try:
+        client = AsyncFirebaseClient(server.url)
+
+        async def scenario():
+            unplayed = await client.fetch_unplayed_games()
+            balance = await client.get_balance()
+            await client.close()
+            return unplayed, balance
+
+        unplayed, balance = asyncio.run(scenario())
+        assert unplayed == {"MA300": {"partieJouee": False, "solde": 700}}
+        assert balance == 700.0
+        assert len(reads) > 100  # Corps de plusieurs dizaines de Ko
+        assert max(reads) <= 256
+    finally:
+        server.stop()
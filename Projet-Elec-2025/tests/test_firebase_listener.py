@@ -0,0 +1,135 @@
+import asyncio
+import socket
+
+from firebase_listener import FirebaseListener
+from firebase_ops import latest_balance
+from tools.firebase_standin import FirebaseStandin
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_apply_put_and_patch
+
+Vérifie que les événements 'put' et 'patch' tiennent le miroir à jour
+(solde, partie active, parties qui deviennent jouées).
+
+2. test_listener_with_local_server
+
+Vérifie, avec le serveur Firebase local, que le miroir reçoit l'état initial
+puis les changements poussés, sans requête de la machine.
+
+3. test_balance_matches_latest_game
+
+Vérifie que le solde du miroir suit la même règle que la requête REST :
+partie la plus récente par numéro, -1 si elle est déjà jouée, même quand le
+flux filtré ne l'a jamais montrée.
+
+4. test_reconnect_does_not_block_poll
+
+Vérifie qu'un flux impossible à ouvrir est réessayé plus tard par connect()
+(tâche réseau) et que poll() ne tente jamais de se reconnecter.
+"""
+
+
+async def _poll_until(listener, condition, timeout=5):
+    for _ in range(int(timeout * 100)):
+        listener.poll()
+        if condition():
+            return True
+        await asyncio.sleep(0.01)
+    return False
+
+
+def test_apply_put_and_patch():
+    """
+    Miroir tenu à jour par put/patch, sans réseau.
+    """
+    listener = FirebaseListener("http://127.0.0.1:1")
+    listener.apply(
+        "put",
+        "/",
+        {
+            "MA9": {"partieJouee": False, "solde": 20, "combinaison": []},
+            "MA10": {"partieJouee": False, "solde": 35},
+        },
+    )
+    assert listener.synced
+    assert listener.active_game() == "MA9"
+    assert listener.balance() == 35.0
+    listener.apply("patch", "/MA10", {"solde": 40})
+    assert listener.balance() == 40.0
+    listener.apply("patch", "/", {"MA10/partieJouee": True})
+    assert listener.active_game() == "MA9"
+    assert listener.balance() == -1  # La plus récente (MA10) est jouée
+    listener.apply("put", "/MA11", {"partieJouee": False, "solde": 25})
+    assert listener.balance() == 25.0
+    listener.apply("put", "/MA11", None)
+    listener.apply("put", "/MA9", None)
+    assert listener.active_game() is None
+    assert listener.balance() == -1
+
+
+def test_listener_with_local_server():
+    """
+    État initial puis changements poussés par le serveur local.
+    """
+    server = FirebaseStandin(
+        {
+            "MA1": {"partieJouee": True, "solde": 10, "combinaison": [[1, 2, 3]]},
+            "MA2": {"partieJouee": False, "solde": 50, "joueurId": "3"},
+        }
+    ).start()
+    listener = FirebaseListener(server.url)
+
+    async def scenario():
+        assert listener.reconnect_due()
+        await listener.connect()
+        assert not listener.reconnect_due()
+        assert await _poll_until(listener, lambda: listener.synced)
+        assert listener.active_game() == "MA2"
+        assert listener.balance() == 50.0
+        server.tree.patch([], {"MA2/partieJouee": True, "MA2/gain": 20})
+        assert await _poll_until(listener, lambda: listener.active_game() is None)
+        server.tree.put(["MA3"], {"partieJouee": False, "solde": 70})
+        assert await _poll_until(listener, lambda: listener.balance() == 70.0)
+        listener.close()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        listener.close()
+        server.stop()
+
+
+def test_balance_matches_latest_game():
+    """
+    MA12 jouée avant l'ouverture du flux : même solde (-1) que latest_balance.
+    """
+    database = {
+        "MA11": {"partieJouee": False, "solde": 30, "numero": 11},
+        "MA12": {"partieJouee": True, "solde": 45, "numero": 12},
+    }
+    listener = FirebaseListener("http://127.0.0.1:1")
+    listener.apply("put", "/", {"MA11": database["MA11"]})  # Flux filtré
+    listener.seen("MA12")  # Partie la plus récente lue par get_balance
+    assert listener.balance() == latest_balance(database) == -1
+    listener.seen("config")  # Clés hors parties ignorées
+    assert listener.latest_number == 12
+
+
+def test_reconnect_does_not_block_poll():
+    """
+    Connexion refusée : nouvel essai différé, poll() sans effet réseau.
+    """
+    closed = socket.socket()
+    closed.bind(("127.0.0.1", 0))
+    port = closed.getsockname()[1]
+    closed.close()  # Port libre : connexion refusée
+    listener = FirebaseListener(f"http://127.0.0.1:{port}")
+    asyncio.run(listener.connect())
+    assert not listener.connected
+    assert not listener.reconnect_due()  # Attente de RECONNECT_DELAY_MS
+    listener._retry_at = None  # Délai écoulé
+    assert listener.poll() == 0
+    assert listener.reconnect_due()  # Rouvert par la tâche réseau, pas par poll()
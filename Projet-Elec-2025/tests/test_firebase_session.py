@@ -0,0 +1,108 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from firebase_session import FirebaseSession, split_url
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_split_url
+
+Vérifie le découpage d'une URL Firebase en schéma, hôte, port et préfixe.
+
+2. test_keep_alive_reuses_connection
+
+Vérifie que plusieurs requêtes passent par une seule connexion et que les
+poignées de main évitées sont comptées.
+
+3. test_reconnect_after_server_close
+
+Vérifie que la session se reconnecte si le serveur ferme la connexion.
+"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    close_after_reply = False
+
+    def _reply(self, data):
+        body = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if _Handler.close_after_reply:
+            self.close_connection = True
+
+    def do_GET(self):
+        self._reply({"path": self.path})
+
+    def do_PATCH(self):
+        length = int(self.headers["Content-Length"])
+        self._reply(json.loads(self.rfile.read(length)))
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = HTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_split_url():
+    """
+    Découpage des URL https et http avec port explicite.
+    """
+    assert split_url("https://x.firebasedatabase.app") == (
+        "https",
+        "x.firebasedatabase.app",
+        443,
+        "",
+    )
+    assert split_url("http://127.0.0.1:9000/db/") == ("http", "127.0.0.1", 9000, "/db")
+
+
+def test_keep_alive_reuses_connection():
+    """
+    Trois requêtes, une seule connexion.
+    """
+    server = _serve()
+    _Handler.close_after_reply = False
+    session = FirebaseSession(f"http://127.0.0.1:{server.server_port}")
+    try:
+        for i in range(2):
+            response = session.get(f"/MA{i}.json")
+            assert response.json() == {"path": f"/MA{i}.json"}
+            response.close()
+        response = session.patch("/MA1.json", {"gain": 5})
+        assert response.status_code == 200
+        assert response.json() == {"gain": 5}
+        stats = session.stats()
+        assert stats["handshakes"] == 1
+        assert stats["handshakes_avoided"] == 2
+    finally:
+        session.close()
+        server.shutdown()
+
+
+def test_reconnect_after_server_close():
+    """
+    Le serveur ferme après chaque réponse : la session rouvre une connexion.
+    """
+    server = _serve()
+    _Handler.close_after_reply = True
+    session = FirebaseSession(f"http://127.0.0.1:{server.server_port}")
+    try:
+        for i in range(3):
+            response = session.get("/.json")
+            assert response.json() == {"path": "/.json"}
+        assert session.stats()["handshakes"] == 3
+    finally:
+        _Handler.close_after_reply = False
+        session.close()
+        server.shutdown()
@@ -0,0 +1,116 @@
+import json
+import urllib.error
+import urllib.request
+
+from tools.firebase_standin import FirebaseStandin
+from tools.loadgen import percentile, run_load
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_query_parameters
+
+Vérifie orderBy/equalTo/limitToFirst/limitToLast (égalités départagées par
+la clé, comme Firebase) et le refus d'un champ non indexé (400).
+
+2. test_etag_conditional_put
+
+Vérifie qu'un PUT avec un if-match périmé est refusé (412) avec la valeur
+et l'ETag actuels.
+
+3. test_fault_injection
+
+Vérifie que les erreurs 503 configurées sont renvoyées et comptées.
+
+4. test_loadgen_report
+
+Vérifie qu'une courte charge de deux machines en mode réservation n'a
+aucun résultat perdu et que le rapport contient p50/p99 et les octets.
+"""
+
+GAMES = {
+    "MA1": {"partieJouee": True, "solde": 100},
+    "MA10": {"partieJouee": False, "solde": 60},
+    "MA2": {"partieJouee": False, "solde": 90},
+    "MA3": {"partieJouee": False, "solde": 80},
+}
+
+
+def _get(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, dict(response.headers), json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), json.loads(e.read())
+
+
+def test_query_parameters():
+    """
+    Requêtes ordonnées, limitées et index manquant.
+    """
+    server = FirebaseStandin(GAMES, indexes=["partieJouee"]).start()
+    try:
+        query = "/.json?orderBy=%22partieJouee%22&equalTo=false"
+        _, _, first = _get(server.url + query + "&limitToFirst=2")
+        assert list(first) == ["MA10", "MA2"]  # Ordre des clés en chaîne
+        _, _, last = _get(server.url + query + "&limitToLast=1")
+        assert list(last) == ["MA3"]
+        _, _, by_key = _get(server.url + '/.json?orderBy="$key"&startAt="MA2"')
+        assert list(by_key) == ["MA2", "MA3"]
+        status, _, _ = _get(server.url + '/.json?orderBy="solde"&limitToFirst=1')
+        assert status == 400
+    finally:
+        server.stop()
+
+
+def test_etag_conditional_put():
+    """
+    if-match périmé : 412 avec la valeur actuelle.
+    """
+    server = FirebaseStandin(GAMES).start()
+    try:
+        _, headers, value = _get(server.url + "/MA2.json", {"X-Firebase-ETag": "true"})
+        assert value == GAMES["MA2"]
+        server.tree.data["MA2"]["solde"] = 95
+        request = urllib.request.Request(
+            server.url + "/MA2.json",
+            data=json.dumps({"partieJouee": True}).encode(),
+            headers={"if-match": headers["ETag"]},
+            method="PUT",
+        )
+        try:
+            urllib.request.urlopen(request)
+            assert False, "PUT accepté malgré un ETag périmé"
+        except urllib.error.HTTPError as e:
+            assert e.code == 412
+            assert json.loads(e.read())["solde"] == 95
+            assert e.headers["ETag"] != headers["ETag"]
+    finally:
+        server.stop()
+
+
+def test_fault_injection():
+    """
+    Taux d'erreur de 100 % : chaque requête reçoit un 503.
+    """
+    server = FirebaseStandin(GAMES, error_rate=1.0, seed=1).start()
+    try:
+        status, _, _ = _get(server.url + "/.json")
+        assert status == 503
+        assert server.counters == {"requests": 1, "dropped": 0, "errors": 1}
+    finally:
+        server.stop()
+
+
+def test_loadgen_report():
+    """
+    Deux machines, réservations conditionnelles, quelques erreurs.
+    """
+    report = run_load(cabinets=2, spins=5, mode="claim", error_rate=0.05, seed=3)
+    assert report["committed"] == 10
+    assert report["lost"] == 0
+    assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+    assert report["bytes_per_spin"] > 0
+    assert percentile([3, 1, 2, 4], 0.5) == 2
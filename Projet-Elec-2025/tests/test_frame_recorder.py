@@ -0,0 +1,81 @@
+import tracemalloc
+
+import pytest
+
+from frame_recorder import FrameRecorder
+from spin_codec import decode_combinaison, encode_combinaison
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_append_and_views
+
+Vérifie l'ajout par chiffres ou par valeur (zéros de tête compris), la
+lecture par memoryview sans copie, to_lists et l'encodage compact direct
+depuis l'enregistreur.
+
+2. test_ring_overwrites_oldest
+
+Vérifie qu'une fois plein, l'enregistreur remplace le plus ancien tirage et
+garde l'ordre chronologique.
+
+3. test_reset_keeps_memory_flat
+
+Vérifie que reset() garde le même tampon et que des milliers de parties
+n'augmentent pas la mémoire allouée.
+"""
+
+
+def test_append_and_views():
+    """
+    Ajout, vues et sérialisation.
+    """
+    recorder = FrameRecorder(3, 15)
+    recorder.append([8, 0, 4])
+    recorder.append_number(57)  # Complété à gauche : 0, 5, 7
+    frame = recorder.frame(0)
+    assert isinstance(frame, memoryview) and frame.obj is recorder.buffer
+    assert recorder.to_lists() == [[8, 0, 4], [0, 5, 7]]
+    assert recorder.last() == [0, 5, 7]
+    assert recorder.digit(1, 2) == 7
+    assert decode_combinaison(encode_combinaison(recorder)) == [[8, 0, 4], [0, 5, 7]]
+    with pytest.raises(IndexError):
+        recorder.frame(2)
+
+
+def test_ring_overwrites_oldest():
+    """
+    Tampon circulaire plein.
+    """
+    recorder = FrameRecorder(3, 4)
+    for number in range(100, 106):
+        recorder.append_number(number)
+    assert len(recorder) == 4
+    assert recorder.to_lists() == [[1, 0, 2], [1, 0, 3], [1, 0, 4], [1, 0, 5]]
+
+
+def test_reset_keeps_memory_flat():
+    """
+    Mémoire stable sur de nombreuses parties.
+    """
+    recorder = FrameRecorder(3, 15)
+    buffer = recorder.buffer
+    digits = [1, 2, 3]
+
+    def play(games):
+        for game in range(games):
+            for frame in range(15):
+                digits[0] = frame % 10
+                recorder.append(digits)
+                recorder.append_number(100 + game % 900)
+            recorder.reset()
+
+    play(10)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    play(2000)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert recorder.buffer is buffer and len(recorder) == 0
+    assert after - before < 1024
@@ -0,0 +1,156 @@
+import pytest
+
+import firebase
+from firebase_session import FirebaseSession
+from game_index import GameIndex, is_game_key, key_number
+from spin_queue import SpinQueue
+from tools.firebase_standin import FirebaseStandin
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_index_cursor_persists
+
+Vérifie que le curseur avance à chaque partie jouée, se recale sur la base
+et survit à un redémarrage.
+
+2. test_claim_follows_index_without_query
+
+Vérifie qu'avec un index à jour, la file est écrite sans requête de
+recherche (une lecture et un PUT par partie).
+
+3. test_conflict_resyncs_index
+
+Vérifie qu'un index périmé (partie prise ailleurs) est recalé par la
+requête indexée et que le résultat est écrit sur la bonne partie.
+
+4. test_malformed_keys_are_rejected
+
+Vérifie que key_number refuse une clé sans préfixe « MA » ou avec un
+suffixe non numérique, et que les lectures de la base ignorent ces clés
+au lieu d'en tirer un numéro fantaisiste.
+
+5. test_flush_follows_index_without_query
+
+Vérifie que flush_spin_queue prend ses parties dans l'index (un seul PATCH,
+sans requête de recherche) tant qu'elles ont été vues non jouées, et ne
+relit la base que lorsque l'index ne les couvre plus.
+"""
+
+RESULT = {"gain": 20, "partieJouee": True}
+
+
+def test_index_cursor_persists(tmp_path):
+    """
+    Curseur avancé, recalé, puis relu depuis la flash.
+    """
+    path = str(tmp_path / "index.json")
+    index = GameIndex(path)
+    assert index.next_key() is None
+    index.resync(["MA9", "MA10"])
+    assert index.next_key() == "MA9"
+    index.played("MA9")
+    assert index.next_key() == "MA10"
+    assert index.candidates(2) == ["MA10", "MA11"]
+    again = GameIndex(path)
+    assert (again.last_played, again.next_key()) == (9, "MA10")
+    assert key_number("MA123") == 123
+
+
+def test_claim_follows_index_without_query(monkeypatch, tmp_path):
+    """
+    Index à jour : aucune requête indexée.
+    """
+    games = {f"MA{n}": {"partieJouee": n < 3, "solde": 100} for n in range(1, 6)}
+    server = FirebaseStandin(games).start()
+    try:
+        session = FirebaseSession(server.url)
+        monkeypatch.setattr(firebase, "SESSION", session)
+        index = GameIndex(str(tmp_path / "index.json"))
+        index.resync(["MA3"])
+        queue = SpinQueue(str(tmp_path / "queue.jsonl"))
+        queue.append(dict(RESULT, gain=1))
+        queue.append(dict(RESULT, gain=2))
+        assert firebase.claim_spin_queue(queue, index=index)
+        assert server.tree.data["MA3"]["gain"] == 1
+        assert server.tree.data["MA4"]["gain"] == 2
+        assert session.stats()["requests"] == 4
+        assert index.next_key() == "MA5"
+    finally:
+        server.stop()
+
+
+def test_conflict_resyncs_index(monkeypatch, tmp_path):
+    """
+    Index périmé : conflit, requête indexée, partie suivante.
+    """
+    games = {f"MA{n}": {"partieJouee": n < 4, "solde": 100} for n in range(1, 6)}
+    server = FirebaseStandin(games).start()
+    try:
+        monkeypatch.setattr(firebase, "SESSION", FirebaseSession(server.url))
+        index = GameIndex(str(tmp_path / "index.json"))
+        index.resync(["MA3"])  # MA3 a été jouée par une autre machine
+        firebase.update_first_unplayed_game(RESULT, index)
+        assert server.tree.data["MA4"]["gain"] == 20
+        assert index.next_key() == "MA5"
+    finally:
+        server.stop()
+
+
+def test_malformed_keys_are_rejected(monkeypatch, tmp_path):
+    """
+    Clés invalides : ValueError, et ignorées par les lectures.
+    """
+    assert key_number("MA120") == 120
+    for key in ("MA", "XY12", "MA1b", "ma3", "MA-1", "settings"):
+        assert not is_game_key(key)
+        with pytest.raises(ValueError):
+            key_number(key)
+    games = {
+        "MA2": {"partieJouee": False, "solde": 90},
+        "MA3": {"partieJouee": False, "solde": 80},
+        "MAZ": {"partieJouee": False, "solde": 1},
+        "config": {"partieJouee": False, "solde": 2},
+    }
+    server = FirebaseStandin(games).start()
+    try:
+        monkeypatch.setattr(firebase, "SESSION", FirebaseSession(server.url))
+        index = GameIndex(str(tmp_path / "index.json"))
+        assert firebase.query_free_keys(index) == ["MA2", "MA3"]
+        assert index.next_key() == "MA2"
+        assert firebase.get_balance_from_firebase(firebase.fetch_latest_game, 0) == 80.0
+    finally:
+        server.stop()
+
+
+def test_flush_follows_index_without_query(monkeypatch, tmp_path):
+    """
+    Index à jour : PATCH seul ; index dépassé : requête indexée puis PATCH.
+    """
+    games = {f"MA{n}": {"partieJouee": n < 3, "solde": 100} for n in range(1, 6)}
+    server = FirebaseStandin(games).start()
+    try:
+        session = FirebaseSession(server.url)
+        monkeypatch.setattr(firebase, "SESSION", session)
+        index = GameIndex(str(tmp_path / "index.json"))
+        index.resync(["MA3", "MA4", "MA5"])
+        queue = SpinQueue(str(tmp_path / "queue.jsonl"))
+        queue.append(dict(RESULT, gain=1))
+        queue.append(dict(RESULT, gain=2))
+        assert firebase.flush_spin_queue(queue, index=index)
+        assert session.stats()["requests"] == 1
+        assert server.tree.data["MA3"]["gain"] == 1
+        assert server.tree.data["MA4"]["gain"] == 2
+        assert index.next_key() == "MA5"
+        # MA6 n'a jamais été vue : pas d'écriture à l'aveugle, la base est relue
+        server.tree.put(["MA6"], {"partieJouee": False, "solde": 100})
+        queue.append(dict(RESULT, gain=3))
+        queue.append(dict(RESULT, gain=4))
+        assert index.candidates(2, known=True) == []
+        assert firebase.flush_spin_queue(queue, index=index)
+        assert session.stats()["requests"] == 3
+        assert server.tree.data["MA6"]["gain"] == 4
+        assert index.next_key() == "MA7"
+    finally:
+        server.stop()
@@ -0,0 +1,142 @@
+from gpio_frames import (
+    GPIO_OUT_CLR,
+    GPIO_OUT_SET,
+    SEGMENT_MAP,
+    FakeRegisters,
+    FrameBuffer,
+    frame_masks,
+    pin_mask,
+    write_frame,
+)
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_every_frame_on_fake_registers
+
+Vérifie, pour chaque afficheur et chaque chiffre, à partir de n'importe quel
+chiffre affiché avant, qu'une trame fait exactement deux écritures (SET
+puis CLR), qu'aucun afficheur n'est actif entre les deux, et qu'ensuite les
+segments et la sélection (active à 0) sont ceux de l'ancien code Pin.value().
+
+2. test_masks_leave_other_pins_alone
+
+Vérifie que les masques ne touchent que les broches des segments et des
+sélections.
+
+3. test_frame_buffer_swaps_only_at_end_of_scan
+
+Publie de nouveaux chiffres à chaque position du balayage et vérifie que
+chaque balayage complet affiche les chiffres d'un seul tirage (pas de
+mélange entre rouleaux), et que la publication apparaît au balayage
+suivant.
+
+4. test_frame_buffer_publish_during_refresh
+
+Simule un rafraîchissement qui interrompt publish() au milieu de l'encodage
+et vérifie que le tampon en cours d'écriture n'est jamais affiché, puis que
+la dernière publication l'est.
+"""
+
+SEGMENTS_PINS = [3, 4, 5, 6, 7, 9, 8, 10]  # a, b, c, d, e, f, g, pt (main.py)
+DISPLAY_SELECT_PINS = [0, 1, 2]
+
+
+def expected_levels(position, value):
+    """
+    Niveaux attendus, comme display_segments puis select_display.
+    """
+    levels = {pin: (SEGMENT_MAP[value] >> i) & 1 for i, pin in enumerate(SEGMENTS_PINS)}
+    for i, pin in enumerate(DISPLAY_SELECT_PINS):
+        levels[pin] = 0 if i == position else 1
+    return levels
+
+
+def test_every_frame_on_fake_registers():
+    """
+    Toutes les trames, depuis tous les états précédents.
+    """
+    masks = frame_masks(SEGMENTS_PINS, DISPLAY_SELECT_PINS)
+    for previous in range(len(DISPLAY_SELECT_PINS) * 10):
+        for position in range(len(DISPLAY_SELECT_PINS)):
+            for value in range(10):
+                registers = FakeRegisters()
+                write_frame(registers, masks, previous * 2)
+                registers.writes.clear()
+                index = (position * 10 + value) * 2
+                registers[GPIO_OUT_SET] = masks[index]
+                assert all(registers.pin(pin) for pin in DISPLAY_SELECT_PINS)
+                registers[GPIO_OUT_CLR] = masks[index + 1]
+                assert [address for address, _ in registers.writes] == [GPIO_OUT_SET, GPIO_OUT_CLR]
+                levels = {pin: registers.pin(pin) for pin in SEGMENTS_PINS + DISPLAY_SELECT_PINS}
+                assert levels == expected_levels(position, value)
+
+
+def test_masks_leave_other_pins_alone():
+    """
+    Seules les broches de l'afficheur sont modifiées.
+    """
+    used = pin_mask(SEGMENTS_PINS + DISPLAY_SELECT_PINS)
+    masks = frame_masks(SEGMENTS_PINS, DISPLAY_SELECT_PINS)
+    assert len(masks) == 2 * 3 * 10
+    for mask in masks:
+        assert mask & ~used == 0
+    registers = FakeRegisters(out=1 << 20)  # Une autre broche (LED...)
+    for index in range(0, len(masks), 2):
+        write_frame(registers, masks, index)
+        assert registers.pin(20) == 1
+
+
+def scan_levels(registers, buffer):
+    """
+    Rafraîchit chaque afficheur une fois et retourne le chiffre vu sur chacun.
+    """
+    seen = []
+    for _ in range(buffer.num_digits):
+        position = buffer.position
+        buffer.refresh(registers)
+        for value in range(10):
+            levels = {pin: registers.pin(pin) for pin in SEGMENTS_PINS + DISPLAY_SELECT_PINS}
+            if levels == expected_levels(position, value):
+                seen.append(value)
+                break
+    return seen
+
+
+def test_frame_buffer_swaps_only_at_end_of_scan():
+    masks = frame_masks(SEGMENTS_PINS, DISPLAY_SELECT_PINS)
+    buffer = FrameBuffer(masks, 3)
+    registers = FakeRegisters()
+    assert scan_levels(registers, buffer) == [0, 0, 0]
+    for step, number in enumerate([111, 222, 333, 444, 555, 666]):
+        digits = [number // 100, number // 10 % 10, number % 10]
+        for _ in range(step % 3):
+            buffer.refresh(registers)  # Publication au milieu du balayage
+        buffer.publish(digits)
+        for _ in range(3 - step % 3):
+            buffer.refresh(registers)  # Fin du balayage en cours
+        assert scan_levels(registers, buffer) == digits
+    assert buffer.swaps == 6
+
+
+def test_frame_buffer_publish_during_refresh():
+    masks = frame_masks(SEGMENTS_PINS, DISPLAY_SELECT_PINS)
+    buffer = FrameBuffer(masks, 3)
+    registers = FakeRegisters()
+    buffer.publish([1, 2, 3])
+    scan_levels(registers, buffer)
+
+    class Interrupting(list):
+        """
+        Chiffres dont la lecture déclenche un balayage complet (interruption).
+        """
+
+        def __getitem__(self, index):
+            if index == 1:
+                assert scan_levels(registers, buffer) == [1, 2, 3]
+            return list.__getitem__(self, index)
+
+    buffer.publish(Interrupting([4, 5, 6]))
+    assert scan_levels(registers, buffer) == [1, 2, 3]  # Fin du balayage : échange
+    assert scan_levels(registers, buffer) == [4, 5, 6]
@@ -1,5 +1,7 @@
+import firebase
 from firebase import generate_random, update_first_unplayed_game
-from connexion_wifi import connect_to_wifi
+from firebase_session import FirebaseSession
+from tools.firebase_standin import FirebaseStandin
 
 
 """
@@ -7,26 +9,39 @@ Nouveau test d'intégration :
 
 test_generate_and_update
 
-Vérifie que la génération de nombres aléatoires et la mise à jour des données dans Firebase fonctionnent ensemble sans erreur.
+Vérifie que la génération de nombres aléatoires et la mise à jour des données dans Firebase fonctionnent ensemble.
+Le test tourne hors ligne contre le serveur Firebase local (tools/firebase_standin.py).
 Critères de réussite :
-- La fonction generate_random retourne 0.
-- La fonction update_first_unplayed_game ne lève pas d'exception lors de la mise à jour.
+- La fonction generate_random retourne 0 et joue la première partie non jouée.
+- La fonction update_first_unplayed_game écrit les données dans la partie suivante.
 """
 
 
-def test_generate_and_update():
+def test_generate_and_update(monkeypatch):
     """
     Test d'intégration : vérifie que la génération aléatoire et la mise à jour Firebase fonctionnent ensemble.
     """
-    connect_to_wifi()
-    result = generate_random()
-    assert result == 0, "La génération aléatoire a échoué."
-    updated_data = {
-        "gain": 50,
-        "combinaison": {0: [1, 2, 3]},
-        "partieJouee": True,
-        "timestamp": 1234567890,
-        "mise": 10,
+    games = {
+        "MA1": {"partieJouee": True, "solde": 100},
+        "MA2": {"partieJouee": False, "solde": 90},
+        "MA3": {"partieJouee": False, "solde": 80},
     }
-    update_first_unplayed_game(updated_data)
-    # Pas d'assertion possible ici sans accès à la base, mais on vérifie l'absence d'exception
+    server = FirebaseStandin(games).start()
+    try:
+        monkeypatch.setattr(firebase, "SESSION", FirebaseSession(server.url))
+        result = generate_random()
+        assert result == 0, "La génération aléatoire a échoué."
+        assert server.tree.data["MA2"]["partieJouee"] is True
+        assert len(server.tree.data["MA2"]["combinaison"]) == firebase.NUMBER_TO_GENERATE
+        updated_data = {
+            "gain": 50,
+            "combinaison": {0: [1, 2, 3]},
+            "partieJouee": True,
+            "timestamp": 1234567890,
+            "mise": 10,
+        }
+        update_first_unplayed_game(updated_data)
+        assert server.tree.data["MA3"]["gain"] == 50
+        assert server.tree.data["MA3"]["combinaison"] == {"0": [1, 2, 3]}
+    finally:
+        server.stop()
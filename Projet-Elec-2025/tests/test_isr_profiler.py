@@ -0,0 +1,163 @@
+import tracemalloc
+
+from isr_profiler import HISTOGRAM_BUCKETS, TOTAL_MAX, CallbackStats, IsrProfiler, SerialCommands
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_histogram_buckets
+
+Vérifie le rangement des durées dans les cases en puissances de 2 (0 µs,
+1 µs, 2-3 µs, ..., la dernière case regroupant les durées très longues),
+la moyenne, le maximum et le percentile.
+
+2. test_missed_periods_and_overruns
+
+Simule un timer de 300 Hz dont un appel arrive avec une et deux périodes de
+retard et un autre dure plus d'une période : les périodes manquées et les
+dépassements sont comptés, pas le décalage normal (gigue) ni l'attente
+entre deux parties après rearm().
+
+3. test_wrap_calls_and_records_without_allocation
+
+Vérifie que l'enveloppe appelle le callback avec son argument, compte
+chaque appel, que la mémoire reste stable sur des milliers d'appels, et
+qu'un profileur désactivé rend le callback tel quel.
+
+4. test_serial_commands
+
+Envoie des caractères par petits morceaux sur une console simulée et
+vérifie qu'une commande n'est exécutée qu'à la fin de la ligne, que « isr »
+affiche les mesures et qu'une commande inconnue affiche l'aide.
+
+5. test_total_stays_small_int
+
+Enregistre assez d'appels longs pour dépasser 2^30 µs cumulées : la somme
+reste un petit entier (au plus TOTAL_MAX), le nombre d'appels reste exact
+et la moyenne reste juste.
+"""
+
+
+def test_histogram_buckets():
+    stats = CallbackStats("button")
+    for elapsed in (0, 1, 3, 4, 40, 1000, 10**9):
+        stats.record(100, 100 + elapsed)
+    histogram = list(stats.histogram)
+    assert histogram[0] == 1  # 0 µs
+    assert histogram[1] == 1  # 1 µs
+    assert histogram[2] == 1  # 2-3 µs
+    assert histogram[3] == 1  # 4-7 µs
+    assert histogram[6] == 1  # 32-63 µs
+    assert histogram[10] == 1  # 512-1023 µs
+    assert histogram[HISTOGRAM_BUCKETS - 1] == 1
+    assert sum(histogram) == stats.calls == 7
+    assert stats.max_us == 10**9
+    assert stats.missed == stats.overruns == 0  # IRQ sans période
+    report = stats.report()
+    assert report["mean_us"] == (0 + 1 + 3 + 4 + 40 + 1000 + 10**9) // 7
+    assert report["p99_us"] == 1 << (HISTOGRAM_BUCKETS - 1)
+    assert stats.percentile_us(0.5) == 8
+
+
+def test_missed_periods_and_overruns():
+    profiler = IsrProfiler()
+    profiler.wrap("display", lambda timer: None, 3333)
+    stats = profiler.stats("display")
+    starts = [0, 3333, 6700, 9999, 16665, 26664, 29997]
+    durations = [50, 60, 4000, 55, 50, 52, 51]
+    for start, elapsed in zip(starts, durations):
+        stats.record(start, start + elapsed)
+    assert stats.missed == 1 + 2  # 9999 -> 16665, puis 16665 -> 26664
+    assert stats.overruns == 1
+    profiler.rearm("display")
+    stats.record(10**6, 10**6 + 50)  # Relance après une longue pause
+    assert stats.missed == 3
+    profiler.reset()
+    assert stats.calls == stats.missed == stats.overruns == 0
+    assert sum(stats.histogram) == 0
+    profiler.rearm("absent")  # Sans effet
+
+
+def test_wrap_calls_and_records_without_allocation():
+    profiler = IsrProfiler()
+    seen = []
+    callback = profiler.wrap("spin", seen.append, 500000)
+    callback("timer")
+    assert seen == ["timer"]
+    stats = profiler.stats("spin")
+    assert stats.calls == 1
+
+    counter = [0]
+
+    def tick(timer):
+        counter[0] += 1
+
+    callback = profiler.wrap("display", tick, 3333)
+    for _ in range(100):
+        callback(None)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(5000):
+        callback(None)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert after - before < 1024
+    assert counter[0] == profiler.stats("display").calls == 5100
+    assert set(profiler.report()) == {"spin", "display"}
+
+    disabled = IsrProfiler(enabled=False)
+    assert disabled.wrap("led", tick, 200000) is tick
+    assert disabled.callbacks == []
+
+
+class FakeStream:
+    def __init__(self):
+        self.pending = ""
+
+    def read(self, size):
+        char, self.pending = self.pending[:size], self.pending[size:]
+        return char
+
+
+class FakePoller:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def poll(self, timeout):
+        return [(self.stream, 1)] if self.stream.pending else []
+
+
+def test_serial_commands(capsys):
+    profiler = IsrProfiler()
+    profiler.wrap("display", lambda timer: None, 3333)(None)
+    calls = []
+    stream = FakeStream()
+    console = SerialCommands(
+        {"isr": profiler.dump, "isr reset": lambda: calls.append("reset")},
+        stream,
+        FakePoller(stream),
+    )
+    assert console.poll() is None
+    stream.pending = "is"
+    assert console.poll() is None  # Ligne incomplète : rien n'est exécuté
+    stream.pending = "r\r\n"
+    assert console.poll() == "isr"
+    assert "display : 1 appel(s)" in capsys.readouterr().out
+    stream.pending = "isr reset\n"
+    assert console.poll() == "isr reset"
+    assert calls == ["reset"]
+    stream.pending = "help\n"
+    assert console.poll() is None
+    assert "Commandes : isr, isr reset" in capsys.readouterr().out
+
+
+def test_total_stays_small_int():
+    stats = CallbackStats("spin", 500000)
+    for i in range(5000):
+        stats.record(i * 500000, i * 500000 + 400000)  # 2 000 s cumulées
+        assert stats.total_us <= TOTAL_MAX
+    assert stats.calls == 5000
+    assert stats.report()["mean_us"] == 400000
+    stats.record(0, 1000)
+    assert 399000 <= stats.report()["mean_us"] <= 400000
@@ -0,0 +1,118 @@
+import io
+import json
+
+import firebase_ops
+from packages.json_stream import JsonStream, KEY, OBJECT_START
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_read_value_small_buffer
+
+Vérifie qu'un document complet est reconstruit à l'identique, même avec un
+tampon de lecture d'un seul octet.
+
+2. test_skip_and_stop_early
+
+Vérifie qu'on peut sauter des valeurs et ne garder qu'un champ par partie.
+
+3. test_buffer_is_bounded
+
+Vérifie que la lecture se fait par morceaux de la taille du tampon.
+
+4. test_fed_stream_resumes_tokens
+
+Vérifie qu'un flux alimenté par petits morceaux (comme le client uasyncio)
+reprend les jetons coupés en fin de tampon et donne les mêmes parties que la
+lecture directe.
+"""
+
+DOC = {
+    "MA1": {
+        "combinaison": [[8, 0, 4], [7, 4, 5]],
+        "gain": 30,
+        "partieJouee": True,
+        "solde": 45.5,
+        "joueurId": "5 é\"\\",
+    },
+    "MA2": {"partieJouee": False, "solde": 50, "combinaison": []},
+    "MA3": None,
+}
+
+
+class _Source:
+    def __init__(self, data):
+        self._stream = io.BytesIO(data)
+        self.max_read = 0
+
+    def readinto(self, buf):
+        self.max_read = max(self.max_read, len(buf))
+        return self._stream.readinto(buf)
+
+
+def test_read_value_small_buffer():
+    """
+    Reconstruction exacte, tampon d'un octet.
+    """
+    stream = JsonStream(_Source(json.dumps(DOC).encode()), buffer_size=1)
+    assert stream.read_value() == DOC
+
+
+def test_skip_and_stop_early():
+    """
+    Seul 'solde' est construit ; la lecture s'arrête à la première partie non jouée.
+    """
+    stream = JsonStream(_Source(json.dumps(DOC).encode()), buffer_size=16)
+    found = None
+    for key in stream.iter_keys():
+        fields = {}
+        for field in stream.iter_keys():
+            if field in ("partieJouee", "solde"):
+                fields[field] = stream.read_value()
+            else:
+                stream.skip_value()
+        if fields.get("partieJouee") is False:
+            found = (key, fields["solde"])
+            break
+    assert found == ("MA2", 50)
+
+
+def test_buffer_is_bounded():
+    """
+    Les lectures ne dépassent jamais la taille du tampon.
+    """
+    buffer = bytearray(32)
+    source = _Source(json.dumps({"MA%d" % i: DOC["MA1"] for i in range(200)}).encode())
+    stream = JsonStream(source, buffer=buffer)
+    assert stream.next_event() == OBJECT_START
+    assert stream.next_event() == KEY
+    stream.skip_value()
+    count = 1
+    for _ in range(199):
+        stream.next_event()
+        stream.skip_value()
+        count += 1
+    assert count == 200
+    assert source.max_read == 32
+
+
+def test_fed_stream_resumes_tokens():
+    """
+    Morceaux de 3 octets dans un tampon de 16 : mêmes parties qu'en lecture directe.
+    """
+    data = json.dumps(DOC).encode()
+    # Même module json_stream que firebase_ops (NeedData)
+    stream = firebase_ops.JsonStream(None, buffer_size=16)
+    source = io.BytesIO(data)
+    games = []
+    for item in firebase_ops.scan_games(stream):
+        if item is None:
+            space = stream.space()
+            stream.feed(source.readinto(space[:3]))
+        else:
+            games.append(item)
+    expected = list(firebase_ops.scan_games(JsonStream(_Source(data), buffer_size=16)))
+    assert games == expected
+    assert games[0] == ("MA1", {"partieJouee": True, "solde": 45.5})
+    assert games[2] == ("MA3", {})
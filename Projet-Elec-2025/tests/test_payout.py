@@ -0,0 +1,42 @@
+from payout import (
+    PAYOUT_TABLE,
+    calculer_gain,
+    calculer_gain_reference,
+    gain_for_number,
+)
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_table_matches_reference
+
+Vérifie, pour les 1000 tirages et plusieurs mises, que la lecture de table
+donne exactement le gain des règles d'origine (oracle).
+
+2. test_table_is_compact
+
+Vérifie que la table est un array('H') de 1000 entrées (2 octets chacune).
+"""
+
+
+def test_table_matches_reference():
+    """
+    Comparaison exhaustive avec calculer_gain_reference.
+    """
+    for number in range(1000):
+        rouleaux = [number // 100, number // 10 % 10, number % 10]
+        for mise in (0, 1, 3, 7, 10, 15, 50, 95, 1000):
+            expected = calculer_gain_reference(rouleaux, mise)
+            assert calculer_gain(rouleaux, mise) == expected, (rouleaux, mise)
+            assert gain_for_number(number, mise) == expected
+
+
+def test_table_is_compact():
+    """
+    Table de 1000 multiplicateurs sur 16 bits.
+    """
+    assert PAYOUT_TABLE.typecode == "H"
+    assert len(PAYOUT_TABLE) == 1000
+    assert PAYOUT_TABLE[777] == 1000  # Méga jackpot : x100
+    assert PAYOUT_TABLE[123] == 50  # Suite : x5
@@ -0,0 +1,100 @@
+import pytest
+
+import payout
+from payout import PAYOUT_TABLE, load_payout_table
+from tools.payout_compiler import (
+    TABLE_FILE,
+    compare,
+    compile_rules,
+    evaluate,
+    load_rules,
+    table_bytes,
+    validate_rule,
+)
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_compiled_rules_match_reference
+
+Vérifie, sur les 1000 tirages, que les règles de tools/payout_rules.json
+compilées donnent exactement la table des règles actuelles, et que le
+fichier packages/payout_table.bin est à jour et utilisé par payout.py.
+
+2. test_rule_semantics
+
+Vérifie les cumuls (stop, replace, add), les groupes et les règles de repli
+sur quelques tirages, ainsi que le refus d'une règle invalide.
+
+3. test_corrupted_table_is_rejected
+
+Vérifie qu'une table tronquée ou dont le CRC32 est faux n'est pas chargée.
+
+4. test_table_without_crc32
+
+Simule un firmware sans binascii ou sans binascii.crc32 : la table n'est
+pas chargée (None), sans exception, et sera recalculée depuis les règles.
+"""
+
+
+def test_compiled_rules_match_reference():
+    """
+    Comparaison exhaustive et fichier compilé à jour.
+    """
+    table = compile_rules(load_rules())
+    assert compare(table) == []
+    with open(TABLE_FILE, "rb") as file:
+        assert file.read() == table_bytes(table)
+    assert list(PAYOUT_TABLE) == list(table)
+
+
+def test_rule_semantics():
+    """
+    Cumuls, groupes et replis.
+    """
+    rules = load_rules()
+    assert evaluate(rules, [7, 7, 7]) == 1000  # stop
+    assert evaluate(rules, [1, 2, 3]) == 50  # Suite
+    assert evaluate(rules, [5, 6, 7]) == 55  # Suite + Bonus 7
+    assert evaluate(rules, [1, 2, 2]) == 20  # Sandwich
+    assert evaluate(rules, [1, 3, 5]) == 15  # Pair/Impair
+    assert evaluate(rules, [1, 7, 0]) == 5  # Un 7 (repli)
+    assert evaluate(rules, [7, 0, 7]) == 10  # Deux 7 (repli)
+    assert evaluate(rules, [1, 2, 4]) == 0
+    with pytest.raises(ValueError):
+        validate_rule({"name": "X", "pattern": "spiral", "value": 1, "priority": 0, "stack": "add"})
+    with pytest.raises(ValueError):
+        validate_rule(
+            {"name": "X", "pattern": "pair", "positions": [1, 1], "value": 1, "priority": 0, "stack": "add"}
+        )
+
+
+def test_corrupted_table_is_rejected(tmp_path):
+    """
+    Tables tronquée et corrompue.
+    """
+    data = bytearray(table_bytes(PAYOUT_TABLE))
+    path = tmp_path / "payout_table.bin"
+    path.write_bytes(bytes(data))
+    assert list(load_payout_table(str(path))) == list(PAYOUT_TABLE)
+    data[10] ^= 1
+    path.write_bytes(bytes(data))
+    assert load_payout_table(str(path)) is None
+    path.write_bytes(bytes(data[:100]))
+    assert load_payout_table(str(path)) is None
+    assert load_payout_table(str(tmp_path / "absent.bin")) is None
+
+
+class _NoCrc32:
+    """binascii compilé sans crc32."""
+
+
+@pytest.mark.parametrize("module", [None, _NoCrc32()])
+def test_table_without_crc32(monkeypatch, module):
+    """
+    Pas de CRC32 : table ignorée, sans exception.
+    """
+    monkeypatch.setattr(payout, "binascii", module)
+    assert load_payout_table() is None
+    assert list(load_payout_table() or payout.build_payout_table()) == list(PAYOUT_TABLE)
@@ -0,0 +1,125 @@
+import pytest
+
+from gpio_frames import SEGMENT_MAP
+from pio_display import encode_frame, out_codes, scan_cycles, scan_program, select_levels
+from tools.pio_emulator import PioEmulator
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_each_digit_is_held_with_its_code
+
+Émule un balayage complet du programme PIO et vérifie que chaque afficheur
+est actif pendant HOLD_LOOPS + 2 cycles, une seule fois par balayage, avec
+le code de son chiffre sur les broches de données.
+
+2. test_one_select_at_a_time_and_data_changes_only_when_off
+
+Vérifie sur plusieurs balayages qu'au plus un afficheur est actif à chaque
+cycle et que les données ne changent que lorsqu'aucun afficheur n'est actif
+(pas de chiffre qui « bave » sur le suivant).
+
+3. test_last_frame_repeats_without_cpu
+
+Vérifie que, la FIFO vide, le programme réaffiche le dernier mot, et qu'un
+nouveau mot poussé est pris au balayage suivant.
+
+4. test_out_codes_and_encode_frame
+
+Vérifie le recodage des codes dans l'ordre des broches (câblage main.py et
+décodeur BCD de pcb.py), le refus de broches non contiguës et la place de
+chaque chiffre dans le mot de 32 bits.
+
+5. test_scan_cycles_matches_emulator
+
+Vérifie que scan_cycles (qui fixe la fréquence de la machine à états)
+correspond à la période mesurée sur l'émulateur.
+"""
+
+SEGMENTS_PINS = [3, 4, 5, 6, 7, 9, 8, 10]  # a, b, c, d, e, f, g, pt (main.py)
+HOLD = 31
+
+
+def scan(digits, cycles, active_low=True, hold=HOLD):
+    table = out_codes(SEGMENTS_PINS, SEGMENT_MAP)
+    program = scan_program(len(digits), 8, active_low, hold)
+    emulator = PioEmulator(program, select_levels(len(digits), -1, active_low))
+    emulator.put(encode_frame(digits, table))
+    return table, emulator, emulator.run(cycles)
+
+
+def active_digit(selects, count=3, active_low=True):
+    """
+    Afficheurs actifs pour un niveau des sélections.
+    """
+    return [d for d in range(count) if ((selects >> d) & 1) == (0 if active_low else 1)]
+
+
+def test_each_digit_is_held_with_its_code():
+    digits = [7, 0, 4]
+    table, _, wave = scan(digits, scan_cycles(3, HOLD))
+    for digit in range(3):
+        held = [data for _, data, selects in wave if active_digit(selects) == [digit]]
+        assert len(held) == HOLD + 2
+        assert set(held) == {table[digits[digit]]}
+    # Un seul bloc actif par afficheur et par balayage
+    for digit in range(3):
+        edges = sum(
+            1
+            for (_, _, a), (_, _, b) in zip(wave, wave[1:])
+            if digit not in active_digit(a) and digit in active_digit(b)
+        )
+        assert edges == 1
+
+
+@pytest.mark.parametrize("active_low", [True, False])
+def test_one_select_at_a_time_and_data_changes_only_when_off(active_low):
+    _, _, wave = scan([1, 2, 3], 5 * scan_cycles(3, HOLD), active_low)
+    for (_, data_a, _), (_, data_b, selects_b) in zip(wave, wave[1:]):
+        assert len(active_digit(selects_b, active_low=active_low)) <= 1
+        if data_a != data_b:
+            assert active_digit(selects_b, active_low=active_low) == []
+
+
+def test_last_frame_repeats_without_cpu():
+    period = scan_cycles(3, HOLD)
+    table, emulator, wave = scan([5, 6, 7], 3 * period)
+    assert emulator.pulls_from_fifo == 1
+    assert wave[2 * period:] == [
+        (cycle + period, data, selects) for cycle, data, selects in wave[period:2 * period]
+    ]
+    emulator.put(encode_frame([9, 9, 9], table))
+    later = emulator.run(period)
+    assert emulator.pulls_from_fifo == 2
+    assert {data for _, data, selects in later if active_digit(selects)} == {table[9]}
+
+
+def test_out_codes_and_encode_frame():
+    # main.py : broches contiguës 3-10, le point (pt, GPIO 10) reste éteint
+    table = out_codes(SEGMENTS_PINS, SEGMENT_MAP)
+    assert table[1] == 0b0000110  # b, c sur GPIO 4, 5
+    assert table[8] == 0b0111_1111  # a-g allumés, quel que soit l'ordre f/g
+    assert all(not (code >> 7) & 1 for code in table)
+    # Segment f (bit 5) sur GPIO 9, g (bit 6) sur GPIO 8 : échangés dans l'octet
+    assert out_codes(SEGMENTS_PINS, [1 << 5, 1 << 6]) == bytearray([1 << 6, 1 << 5])
+    # pcb.py : décodeur BCD, bit i du code sur les broches 3, 2, 1, 4
+    bcd = out_codes([3, 2, 1, 4], list(range(10)))
+    assert bcd[1] == 0b0100  # GPIO 3 = out_base + 2
+    assert bcd[8] == 0b1000  # GPIO 4 = out_base + 3
+    with pytest.raises(ValueError):
+        out_codes([3, 4, 6], [0, 1])
+    word = encode_frame([1, 2, 3], table)
+    assert word == table[1] | table[2] << 8 | table[3] << 16
+
+
+@pytest.mark.parametrize("num_digits,hold", [(3, HOLD), (4, 15), (2, 0)])
+def test_scan_cycles_matches_emulator(num_digits, hold):
+    program = scan_program(num_digits, 8, True, hold)
+    emulator = PioEmulator(program, select_levels(num_digits, -1))
+    emulator.put(0)
+    emulator.run(scan_cycles(num_digits, hold))
+    assert emulator.pc == 0
+    assert emulator.pulls_from_fifo == 1
+    emulator.run(1)  # Premier cycle du balayage suivant : un nouveau pull
+    assert emulator.pc == 1
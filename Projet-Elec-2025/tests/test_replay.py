@@ -0,0 +1,65 @@
+import io
+import json
+
+from spin_codec import COMBINAISON_FORMAT, encode_combinaison
+from tools.replay import (
+    COMBINAISON_MISMATCH,
+    GAIN_MISMATCH,
+    OK,
+    UNSEEDED,
+    audit,
+    record_game,
+)
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_audit_detects_tampering
+
+Vérifie que des parties rejouées depuis leur graine sont conformes (format
+liste ou compact), et qu'un gain ou des tirages modifiés sont signalés dans
+le journal d'audit ; les parties sans graine sont comptées à part.
+
+2. test_audit_throughput
+
+Vérifie que l'audit traite plusieurs milliers de parties par seconde.
+"""
+
+
+def test_audit_detects_tampering():
+    """
+    Parties conformes, modifiées et sans graine.
+    """
+    compact = record_game(7, 20)
+    compact["combinaison"] = encode_combinaison(compact["combinaison"])
+    compact["combinaisonFormat"] = COMBINAISON_FORMAT
+    tampered_gain = record_game(8, 10)
+    tampered_gain["gain"] += 10
+    tampered_frames = record_game(9, 10)
+    tampered_frames["combinaison"][-1] = [7, 7, 7]
+    games = {
+        "MA1": record_game(6, 10),
+        "MA2": compact,
+        "MA3": tampered_gain,
+        "MA4": tampered_frames,
+        "MA5": {"partieJouee": True, "gain": 0, "mise": 10},
+        "MA6": {"partieJouee": False, "solde": 100},
+    }
+    log = io.StringIO()
+    summary = audit(games, log)
+    assert summary["games"] == 5
+    assert summary["statuses"] == {OK: 2, GAIN_MISMATCH: 1, COMBINAISON_MISMATCH: 1, UNSEEDED: 1}
+    entries = {entry["key"]: entry for entry in map(json.loads, log.getvalue().splitlines())}
+    assert entries["MA3"]["stored"] == entries["MA3"]["expected"] + 10
+    assert entries["MA4"]["stored"][-1] == [7, 7, 7]
+
+
+def test_audit_throughput():
+    """
+    Milliers de parties par seconde.
+    """
+    games = {f"MA{n}": record_game(n, 10) for n in range(1, 3001)}
+    summary = audit(games)
+    assert summary["statuses"] == {OK: 3000}
+    assert summary["games_per_second"] > 1000
@@ -0,0 +1,134 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import firebase
+import resilience
+from resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    EndpointMetrics,
+    ResilientSession,
+    backoff_delay,
+    endpoint_name,
+    latency_bucket,
+)
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_backoff_and_names
+
+Vérifie que l'attente est bornée et croît avec le numéro d'essai, et que
+les points d'accès regroupent les numéros de partie.
+
+2. test_breaker_opens_and_recovers
+
+Vérifie que le disjoncteur s'ouvre après le seuil d'échecs, laisse passer
+un seul essai après le délai (les autres appelants sont refusés tant qu'il
+est en cours, ou jusqu'à ce qu'il soit abandonné), puis se referme sur un
+succès.
+
+3. test_retry_then_success_and_metrics
+
+Vérifie qu'une réponse 503 puis une erreur réseau sont réessayées, que la
+requête finit par réussir et que les mesures sont comptées.
+
+4. test_open_circuit_serves_cached_balance
+
+Vérifie que, circuit ouvert, aucune requête ne part et que le dernier solde
+lu est renvoyé au lieu de -1.
+"""
+
+
+def _response(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    return response
+
+
+def test_backoff_and_names():
+    """
+    Attente bornée et noms de points d'accès.
+    """
+    for attempt in range(8):
+        delay = backoff_delay(attempt, base_ms=100, cap_ms=1000)
+        assert 0 <= delay <= min(1000, 100 << attempt)
+    assert endpoint_name("PATCH", "/MA12.json") == "PATCH /MA*.json"
+    assert endpoint_name("GET", "/.json?orderBy=%22partieJouee%22") == "GET /.json"
+    assert endpoint_name("GET", "/MA3/solde.json") == "GET /MA*/solde.json"
+    assert [latency_bucket(ms) for ms in (0, 1, 3, 4, 1000)] == [0, 1, 2, 3, 10]
+
+
+def test_breaker_opens_and_recovers():
+    """
+    Fermé -> ouvert -> demi-ouvert -> fermé.
+    """
+    now = [0]
+    with patch.object(resilience, "ticks_ms", lambda: now[0]):
+        breaker = CircuitBreaker(threshold=2, reset_ms=1000)
+        breaker.failure()
+        assert breaker.allow()
+        breaker.failure()
+        assert not breaker.allow()
+        now[0] = 999
+        assert not breaker.allow()
+        now[0] = 1000
+        assert breaker.allow() and breaker.state == resilience.HALF_OPEN
+        assert not breaker.allow()  # Essai de reprise en cours : un seul appelant
+        breaker.failure()  # L'essai de reprise échoue : rouvert
+        assert not breaker.allow()
+        now[0] = 2000
+        assert breaker.allow()
+        now[0] = 2999
+        assert not breaker.allow()
+        now[0] = 3000
+        assert breaker.allow()  # Essai précédent sans résultat : abandonné
+        breaker.success()
+        assert breaker.state == resilience.CLOSED
+        assert breaker.allow() and breaker.allow()
+        assert breaker.trips == 2
+
+
+@patch("resilience.time.sleep")
+def test_retry_then_success_and_metrics(mock_sleep):
+    """
+    503, erreur réseau, puis 200.
+    """
+    session = MagicMock()
+    session.request.side_effect = [_response(503), OSError("reset"), _response(200)]
+    metrics = EndpointMetrics()
+    resilient = ResilientSession(session, CircuitBreaker(), metrics, attempts=3)
+    response = resilient.get("/MA4.json")
+    assert response.status_code == 200
+    assert session.request.call_count == 3
+    assert mock_sleep.call_count == 2
+    entry = metrics.endpoints["GET /MA*.json"]
+    assert (entry["requests"], entry["errors"], entry["retries"]) == (3, 2, 2)
+    assert sum(entry["histogram"]) == 3
+    metrics.dump()
+
+
+@patch("resilience.time.sleep")
+def test_open_circuit_serves_cached_balance(mock_sleep, monkeypatch):
+    """
+    Solde en cache quand Firebase ne répond plus.
+    """
+    session = MagicMock()
+    breaker = CircuitBreaker(threshold=2)
+    monkeypatch.setattr(firebase, "SESSION", ResilientSession(session, breaker, attempts=2))
+    monkeypatch.setattr(firebase, "LAST_BALANCE", None)
+    latest = {"MA7": {"partieJouee": False, "solde": 55}}
+    assert firebase.get_balance_from_firebase(lambda: latest, 0) == 55.0
+
+    session.request.side_effect = OSError("timeout")
+    balance = firebase.get_balance_from_firebase(firebase.fetch_latest_game, 55.0)
+    assert balance == 55.0
+    assert breaker.state == resilience.OPEN
+    calls = session.request.call_count
+    balance = firebase.get_balance_from_firebase(firebase.fetch_latest_game, 55.0)
+    assert balance == 55.0
+    assert session.request.call_count == calls  # Circuit ouvert : aucun appel
+    with pytest.raises(CircuitOpenError):
+        firebase.SESSION.get("/.json")
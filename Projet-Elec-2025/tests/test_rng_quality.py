@@ -0,0 +1,74 @@
+import json
+import random
+
+import pytest
+
+from tools.rng_quality import POSITIONS, analyse, chi2_sf, run
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_chi2_survival
+
+Vérifie la loi du khi-deux sur des quantiles connus (9 et 20 degrés de
+liberté).
+
+2. test_report_is_stable_and_complete
+
+Vérifie que le rapport couvre chaque générateur, rouleau et test, qu'il est
+identique pour une même graine (générateurs déterministes) et quelle que
+soit la taille des blocs, et sérialisable.
+
+3. test_detects_bad_generator
+
+Vérifie qu'un générateur cyclique (100, 101, ..., 999, 100...) échoue aux
+tests, y compris quand les blocs coupent le cycle.
+"""
+
+
+class CyclingRng:
+    def __init__(self):
+        self.value = 99
+
+    def randrange(self, start, stop):
+        self.value = start if self.value + 1 >= stop else self.value + 1
+        return self.value
+
+
+def test_chi2_survival():
+    """
+    Quantiles de référence.
+    """
+    assert chi2_sf(16.919, 9) == pytest.approx(0.05, abs=1e-4)
+    assert chi2_sf(3.325, 9) == pytest.approx(0.95, abs=1e-4)
+    assert chi2_sf(31.410, 20) == pytest.approx(0.05, abs=1e-4)
+    assert chi2_sf(0, 5) == 1.0
+
+
+def test_report_is_stable_and_complete():
+    """
+    Rapport complet et reproductible.
+    """
+    first = run(draws=20000, chunk=7000, seed=1, names=["random", "spin_rng"], bench=1000)
+    second = run(draws=20000, chunk=7000, seed=1, names=["random", "spin_rng"], bench=1000)
+    for name in ("random", "spin_rng"):
+        assert first["generators"][name]["positions"] == second["generators"][name]["positions"]
+        assert set(first["generators"][name]["positions"]) == set(POSITIONS)
+        assert first["generators"][name]["host_ns_per_draw"] > 0
+        for tests in first["generators"][name]["positions"].values():
+            assert set(tests) == {"chi2", "serial", "runs", "gap"}
+            assert all(0 <= result["p"] <= 1 for result in tests.values())
+    json.dumps(first)
+    whole = analyse(random.Random(3), 5000, chunk=5000)
+    assert analyse(random.Random(3), 5000, chunk=777) == whole
+
+
+def test_detects_bad_generator():
+    """
+    Générateur cyclique.
+    """
+    positions = analyse(CyclingRng(), 9000, chunk=1234)
+    assert positions["units"]["serial"]["p"] < 0.001
+    assert positions["units"]["runs"]["p"] < 0.001
+    assert positions["units"]["gap"]["p"] < 0.001
@@ -0,0 +1,68 @@
+from fractions import Fraction
+
+import pytest
+
+from payout import PAYOUT_TABLE, calculer_gain_reference
+from tools.rtp_simulator import RULES, exact_report, rule_masks, rules_of, simulate
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_exact_report
+
+Vérifie le RTP exact (900 tirages) contre un calcul direct avec les règles
+d'origine, et quelques fréquences connues (9 triples, de 111 à 999, dont 1 méga).
+
+2. test_vectorised_rules_match_table
+
+Vérifie, pour les 1000 tirages, que les règles vectorisées donnent la table
+des gains et les mêmes règles que la version scalaire (NumPy requis).
+
+3. test_simulation_converges
+
+Vérifie qu'une simulation avec graine est reproductible et que son
+intervalle de confiance contient le RTP exact (NumPy requis).
+"""
+
+
+def test_exact_report():
+    """
+    RTP exact contre un calcul direct.
+    """
+    report = exact_report(mise=10)
+    expected = Fraction(
+        sum(calculer_gain_reference([n // 100, n // 10 % 10, n % 10], 10) for n in range(100, 1000)),
+        10 * 900,
+    )
+    assert report["outcomes"] == 900
+    assert report["rtp"] == pytest.approx(float(expected))
+    assert report["hit_frequency"]["Jackpot"] == pytest.approx(8 / 900)
+    assert report["hit_frequency"]["Méga jackpot"] == pytest.approx(1 / 900)
+    assert rules_of(777) == {"Méga jackpot", "Gain"}
+    assert "Suite" in rules_of(123) and "Sandwich" in rules_of(122)
+
+
+def test_vectorised_rules_match_table():
+    """
+    Règles vectorisées == table des gains == règles scalaires.
+    """
+    np = pytest.importorskip("numpy")
+    numbers = np.arange(1000)
+    mult, masks = rule_masks(np, numbers)
+    assert mult.tolist() == list(PAYOUT_TABLE)
+    for number in range(1000):
+        assert {rule for rule in RULES if masks[rule][number]} == rules_of(number)
+
+
+def test_simulation_converges():
+    """
+    Reproductibilité et intervalle de confiance.
+    """
+    pytest.importorskip("numpy")
+    first = simulate(2_000_000, batch=300_000, seed=7)
+    second = simulate(2_000_000, batch=300_000, seed=7)
+    assert first["rtp"] == second["rtp"]
+    low, high = first["rtp_ci95"]
+    assert low <= exact_report()["rtp"] <= high
+    assert set(first["hit_frequency"]) == set(RULES)
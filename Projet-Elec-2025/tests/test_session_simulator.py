@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from tools.session_simulator import clamp_bet, next_bet, simulate
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_bet_steps
+
+Vérifie les pas de mise (±10 / ±50) des stratégies et la borne par le solde.
+
+2. test_result_independent_of_workers
+
+Vérifie que le résultat (histogrammes compris) est le même avec 1 ou 2
+processus, et que chaque session finit par une ruine, l'objectif ou la limite.
+
+3. test_resume_from_checkpoint
+
+Vérifie qu'une simulation interrompue puis reprise depuis son point de
+reprise donne le même résultat qu'une simulation d'une traite, et qu'un
+point de reprise d'une autre configuration est refusé.
+"""
+
+CONFIG = {"balance": 100, "target": 200, "bet": 10, "max_spins": 200, "shard_size": 50, "seed": 3}
+
+
+def strip(report):
+    return {k: v for k, v in report.items() if k not in ("elapsed_s", "shards_computed", "shards_per_second")}
+
+
+def test_bet_steps():
+    """
+    Pas de joystick et borne par le solde.
+    """
+    assert next_bet("flat", 30, 10, False) == 10
+    assert next_bet("up-on-loss", 30, 10, False) == 40
+    assert next_bet("up-on-loss", 30, 10, True) == 10
+    assert next_bet("up-on-win", 30, 10, True) == 80
+    assert clamp_bet(80, 35) == 35
+    assert clamp_bet(-10, 35) == 0
+
+
+def test_result_independent_of_workers():
+    """
+    Même graine, même résultat quel que soit le nombre de processus.
+    """
+    one = simulate(200, workers=1, **CONFIG)
+    two = simulate(200, workers=2, **CONFIG)
+    assert strip(one) == strip(two)
+    assert one["complete"] and one["shards_total"] == 4
+    assert sum(one["length_histogram"]["counts"]) == 200
+    assert sum(one["balance_histogram"]["counts"]) == 200
+    total = one["ruin_probability"] + one["target_probability"] + one["capped_probability"]
+    assert total == pytest.approx(1.0)
+
+
+def test_resume_from_checkpoint(tmp_path):
+    """
+    Reprise après interruption.
+    """
+    checkpoint = os.path.join(tmp_path, "run.json")
+    partial = simulate(200, workers=1, checkpoint=checkpoint, max_shards=1, **CONFIG)
+    assert not partial["complete"] and partial["sessions"] == 50
+    resumed = simulate(200, workers=1, checkpoint=checkpoint, **CONFIG)
+    assert resumed["shards_computed"] == 3
+    assert strip(resumed) == strip(simulate(200, workers=1, **CONFIG))
+    with pytest.raises(ValueError):
+        simulate(200, workers=1, checkpoint=checkpoint, **dict(CONFIG, seed=4))
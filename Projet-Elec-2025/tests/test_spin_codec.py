@@ -0,0 +1,65 @@
+import json
+
+from packages.spin_codec import (
+    COMBINAISON_FORMAT,
+    decode_combinaison,
+    encode_combinaison,
+    game_frames,
+)
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_roundtrip
+
+Vérifie qu'un historique encodé puis décodé est identique (zéros de tête compris).
+
+2. test_compact_is_smaller
+
+Vérifie que le format compact est nettement plus petit que le JSON actuel.
+
+3. test_game_frames_all_formats
+
+Vérifie que game_frames lit le format compact et les anciens formats.
+"""
+
+FRAMES = [[8, 0, 4], [7, 4, 5], [1, 8, 8], [0, 0, 7], [9, 9, 9], [1, 0, 0]]
+
+
+def test_roundtrip():
+    """
+    Encodage puis décodage sans perte.
+    """
+    assert decode_combinaison(encode_combinaison(FRAMES)) == FRAMES
+    assert decode_combinaison(encode_combinaison([])) == []
+
+
+def test_compact_is_smaller():
+    """
+    15 tirages : le format compact fait moins d'un tiers du JSON en listes
+    et moins d'un dixième de la variante en dictionnaires.
+    """
+    frames = (FRAMES * 3)[:15]
+    compact = len(json.dumps(encode_combinaison(frames)))
+    as_lists = len(json.dumps(frames))
+    as_dicts = len(
+        json.dumps({i: {j: d for j, d in enumerate(f)} for i, f in enumerate(frames)})
+    )
+    assert compact * 3 < as_lists
+    assert compact * 10 < as_dicts
+
+
+def test_game_frames_all_formats():
+    """
+    Lecture des formats compact, liste et dictionnaire.
+    """
+    compact = {
+        "combinaison": encode_combinaison(FRAMES),
+        "combinaisonFormat": COMBINAISON_FORMAT,
+    }
+    assert game_frames(compact) == FRAMES
+    assert game_frames({"combinaison": FRAMES}) == FRAMES
+    as_dict = {str(i): {str(j): d for j, d in enumerate(f)} for i, f in enumerate(FRAMES)}
+    assert game_frames({"combinaison": as_dict}) == FRAMES
+    assert game_frames({}) == []
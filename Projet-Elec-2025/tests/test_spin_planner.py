@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from spin_planner import MAX_FRAMES, MIN_FRAMES, SpinPlanner
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_plan_and_advance
+
+Vérifie que les trames calculées à l'appui sont affichées dans l'ordre, que
+la liste de l'afficheur est modifiée sur place, que le drapeau de fin n'est
+levé qu'après la dernière trame et que le résultat est la dernière trame.
+
+2. test_plan_reuses_buffer
+
+Vérifie que le tampon est alloué une fois, que le nombre de tirages reste
+entre 10 et 15 et que les tirages restent entre 100 et 999.
+"""
+
+
+def test_plan_and_advance():
+    """
+    Déroulé d'une partie, trame par trame.
+    """
+    planner = SpinPlanner(3)
+    planner.plan(4, random.Random(1))
+    rng = random.Random(1)
+    numbers = [rng.randrange(100, 1000) for _ in range(4)]
+    expected = [[n // 100, n // 10 % 10, n % 10] for n in numbers]
+    assert planner.combinations() == expected
+    digits = [0, 0, 0]
+    shown = []
+    while planner.advance(digits):
+        assert not planner.finished
+        shown.append(digits[:])
+    assert planner.finished
+    assert shown == expected
+    assert planner.outcome() == expected[-1] == digits
+    assert not planner.advance(digits)  # Les appels suivants ne font rien
+
+
+def test_plan_reuses_buffer():
+    """
+    Tampon unique et bornes des tirages.
+    """
+    planner = SpinPlanner(3)
+    buffer = planner.frames.buffer
+    rng = random.Random(2)
+    for _ in range(50):
+        count = planner.plan(rng=rng)
+        assert MIN_FRAMES <= count <= MAX_FRAMES
+        assert planner.frames.buffer is buffer
+        for frame in planner.combinations():
+            assert 100 <= frame[0] * 100 + frame[1] * 10 + frame[2] <= 999
+    with pytest.raises(ValueError):
+        planner.plan(MAX_FRAMES + 1)
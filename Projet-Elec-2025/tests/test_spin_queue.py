@@ -0,0 +1,89 @@
+from spin_queue import SpinQueue
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_queue_survives_reboot
+
+Vérifie que les résultats ajoutés sont relus depuis le fichier (redémarrage).
+
+2. test_assign_and_multipath_body
+
+Vérifie l'attribution des clés libres et la construction du PATCH multi-chemins.
+
+3. test_same_key_is_idempotent
+
+Vérifie qu'une même clé ajoutée deux fois ne produit qu'une écriture.
+
+4. test_torn_line_is_repaired
+
+Vérifie qu'après une coupure pendant l'écriture, la ligne tronquée est
+retirée du fichier au redémarrage : les résultats ajoutés ensuite ne sont
+pas collés à sa suite et survivent au redémarrage suivant.
+"""
+
+
+def test_queue_survives_reboot(tmp_path):
+    """
+    La file est relue depuis la flash, ligne tronquée ignorée.
+    """
+    path = str(tmp_path / "queue.jsonl")
+    queue = SpinQueue(path)
+    queue.append({"gain": 20, "partieJouee": True})
+    queue.append({"gain": 0, "partieJouee": True})
+    with open(path, "a") as file:
+        file.write('[null, {"gain"')  # coupure pendant l'écriture
+    reloaded = SpinQueue(path)
+    assert len(reloaded) == 2
+    assert reloaded.pending[0] == [None, {"gain": 20, "partieJouee": True}]
+
+
+def test_assign_and_multipath_body(tmp_path):
+    """
+    Les clés libres sont attribuées dans l'ordre et persistées avant l'envoi.
+    """
+    path = str(tmp_path / "queue.jsonl")
+    queue = SpinQueue(path)
+    queue.append({"gain": 5}, key="MA3")
+    queue.append({"gain": 10})
+    queue.append({"gain": 15})
+    queue.assign(["MA3", "MA4"])
+    assert queue.multipath_body() == {"MA3/gain": 5, "MA4/gain": 10}
+    assert queue.unassigned_count() == 1
+    assert SpinQueue(path).pending[1] == ["MA4", {"gain": 10}]
+    queue.commit()
+    assert SpinQueue(path).pending == [[None, {"gain": 15}]]
+
+
+def test_same_key_is_idempotent(tmp_path):
+    """
+    La dernière écriture pour une clé remplace la précédente.
+    """
+    path = str(tmp_path / "queue.jsonl")
+    queue = SpinQueue(path)
+    queue.append({"gain": 5}, key="MA7")
+    queue.append({"gain": 6}, key="MA7")
+    assert SpinQueue(path).pending == [["MA7", {"gain": 6}]]
+
+
+def test_torn_line_is_repaired(tmp_path):
+    """
+    La ligne tronquée ne fait pas perdre les résultats ajoutés après elle.
+    """
+    path = str(tmp_path / "queue.jsonl")
+    queue = SpinQueue(path)
+    queue.append({"gain": 1})
+    with open(path, "a") as file:
+        file.write('[null, {"gain"')  # coupure pendant l'écriture
+    queue = SpinQueue(path)
+    queue.append({"gain": 2})
+    with open(path) as file:
+        assert file.read() == '[null, {"gain": 1}]\n[null, {"gain": 2}]\n'
+    assert SpinQueue(path).pending == [[None, {"gain": 1}], [None, {"gain": 2}]]
+    # Dernière ligne complète mais sans fin de ligne
+    with open(path, "w") as file:
+        file.write('[null, {"gain": 3}]')
+    queue = SpinQueue(path)
+    queue.append({"gain": 4})
+    assert SpinQueue(path).pending == [[None, {"gain": 3}], [None, {"gain": 4}]]
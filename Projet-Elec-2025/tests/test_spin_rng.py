@@ -0,0 +1,59 @@
+from spin_planner import SpinPlanner
+from spin_rng import SpinRng
+
+
+"""
+Nouveaux tests effectués :
+
+1. test_xorshift32_reference
+
+Vérifie la première sortie de xorshift32 pour la graine de l'article de
+Marsaglia (2463534242 -> 723471715) et le remplacement de la graine 0.
+
+2. test_randrange_bounds_and_uniformity
+
+Vérifie que randrange(100, 1000) reste dans l'intervalle et couvre chaque
+chiffre de façon à peu près uniforme.
+
+3. test_seeded_plan_is_reproducible
+
+Vérifie qu'une même graine redonne la même partie (nombre de tirages
+compris) et que deux graines différentes donnent des parties différentes.
+"""
+
+
+def test_xorshift32_reference():
+    """
+    Valeur de référence de xorshift32.
+    """
+    assert SpinRng(2463534242).next32() == 723471715
+    assert SpinRng(0).next32() != 0
+
+
+def test_randrange_bounds_and_uniformity():
+    """
+    Bornes et répartition des chiffres.
+    """
+    rng = SpinRng(12345)
+    counts = [0] * 10
+    for _ in range(9000):
+        number = rng.randrange(100, 1000)
+        assert 100 <= number <= 999
+        counts[number % 10] += 1
+    assert min(counts) > 800 and max(counts) < 1000
+    assert 10 <= SpinRng(1).randint(10, 15) <= 15
+
+
+def test_seeded_plan_is_reproducible():
+    """
+    Même graine, même partie.
+    """
+    first, second = SpinPlanner(3), SpinPlanner(3)
+    first.plan_seeded(42)
+    second.plan_seeded(42)
+    assert first.seed == 42
+    assert first.combinations() == second.combinations()
+    second.plan_seeded(43)
+    assert first.combinations() != second.combinations()
+    second.plan()
+    assert second.seed is None
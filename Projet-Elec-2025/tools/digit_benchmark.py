@@ -0,0 +1,96 @@
+"""
+Banc d'essai de la conversion nombre -> chiffres, à exécuter sur l'hôte.
+Compare l'ancienne conversion par chaîne ([int(c) for c in str(n)]) avec
+digit_codec.to_digits (tampon fourni) et decode_batch (script d'une partie
+de 15 tirages) : durée par tirage et mémoire allouée par tirage.
+
+Utilisation :
+    python tools/digit_benchmark.py --count 200000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "packages"))
+
+from digit_codec import decode_batch, to_digits  # noqa: E402
+
+NUM_DIGITS = 3
+FRAMES = 15  # Tirages d'une partie
+
+
+def string_digits(number):
+    """
+    Ancienne conversion, gardée comme référence.
+    """
+    return [int(digit) for digit in str(number)]
+
+
+def measure(run, frames):
+    """
+    Durée (ns) et octets alloués par tirage pour run().
+    """
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ns_per_frame": round(elapsed * 1e9 / frames, 1),
+        "peak_bytes": peak,
+    }
+
+
+def benchmark(count=200_000, seed=0):
+    """
+    Convertit `count` tirages de chaque façon et retourne le rapport.
+    """
+    rng = random.Random(seed)
+    numbers = [rng.randrange(100, 1000) for _ in range(count)]
+    count = count - count % FRAMES
+    numbers = numbers[:count]
+    digits = [0] * NUM_DIGITS
+    script = bytearray(NUM_DIGITS * FRAMES)
+    kept = [None]
+
+    def by_string():
+        for number in numbers:
+            kept[0] = string_digits(number)
+
+    def by_division():
+        for number in numbers:
+            to_digits(number, digits)
+
+    def by_batch():
+        for start in range(0, count, FRAMES):
+            decode_batch(numbers[start : start + FRAMES], script, NUM_DIGITS)
+
+    report = {
+        "frames": count,
+        "string": measure(by_string, count),
+        "to_digits": measure(by_division, count),
+        "decode_batch": measure(by_batch, count),
+    }
+    reference = report["string"]["ns_per_frame"]
+    for name in ("to_digits", "decode_batch"):
+        report[name]["speedup"] = round(reference / report[name]["ns_per_frame"], 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200_000, help="Tirages convertis")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.count, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+Serveur local imitant l'API REST de Firebase utilisée par la machine.
+Il garde la base en mémoire et répond à GET (y compris en flux
+text/event-stream), PUT et PATCH, avec les requêtes orderBy, equalTo,
+startAt, endAt, limitToFirst et limitToLast, et les écritures
+conditionnelles (X-Firebase-ETag / if-match). Il permet de tester les
+modules de packages/ sur l'hôte, sans Firebase ni Wi-Fi.
+Pour mesurer le comportement réseau, il peut ajouter une latence, couper
+des connexions sans répondre et renvoyer des erreurs 503.
+
+Utilisation :
+    python tools/firebase_standin.py --port 9000 --data export.json
+    python tools/firebase_standin.py --latency 0.08 --jitter 0.04 --drop 0.02 --errors 0.01
+"""
+
+import argparse
+import hashlib
+import json
+import queue
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+KEEP_ALIVE_S = 30  # Événement keep-alive du flux, comme Firebase
+
+
+def split_path(path):
+    """
+    Retourne les segments d'un chemin REST ("/MA5/solde.json" -> ["MA5", "solde"]).
+    """
+    if path.endswith(".json"):
+        path = path[: -len(".json")]
+    return [part for part in path.split("/") if part]
+
+
+def parse_query(query):
+    """
+    Décode les paramètres Firebase (valeurs JSON : orderBy="partieJouee", equalTo=false).
+    """
+    params = {}
+    for name, values in parse_qs(query).items():
+        try:
+            params[name] = json.loads(values[0])
+        except ValueError:
+            params[name] = values[0]
+    return params
+
+
+def order_value(value):
+    """
+    Rang Firebase d'une valeur : null < false < true < nombres < chaînes < objets.
+    """
+    if value is None:
+        return (0, 0)
+    if value is False:
+        return (1, 0)
+    if value is True:
+        return (2, 0)
+    if isinstance(value, (int, float)):
+        return (3, value)
+    if isinstance(value, str):
+        return (4, value)
+    return (5, 0)
+
+
+def child_order(key, value, order_by):
+    """
+    Valeur de tri d'un enfant pour orderBy ("$key", "$value" ou un champ).
+    """
+    if order_by == "$key":
+        return (4, key)
+    if order_by != "$value":
+        value = value.get(order_by) if isinstance(value, dict) else None
+    return order_value(value)
+
+
+def etag_of(value):
+    """
+    ETag d'une valeur : empreinte de son JSON canonique.
+    """
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class FirebaseTree:
+    """
+    Base JSON en mémoire, protégée par un verrou, avec abonnés aux changements.
+    """
+
+    def __init__(self, data=None):
+        self.data = data or {}
+        self.lock = threading.Lock()
+        self.listeners = []
+
+    def get(self, parts):
+        node = self.data
+        for part in parts:
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def _set(self, parts, value):
+        if not parts:
+            self.data = value if isinstance(value, dict) else {}
+            return
+        node = self.data
+        for part in parts[:-1]:
+            child = node.get(part)
+            if not isinstance(child, dict):
+                if value is None:
+                    return
+                child = node[part] = {}
+            node = child
+        if value is None:
+            node.pop(parts[-1], None)
+        else:
+            node[parts[-1]] = value
+
+    def put(self, parts, value):
+        with self.lock:
+            self._set(parts, value)
+            self._notify("put", parts, value)
+
+    def put_if_match(self, parts, value, etag):
+        """
+        Écrit value seulement si l'ETag courant vaut etag.
+        Retourne (écrit, valeur courante, ETag courant).
+        """
+        with self.lock:
+            current = self.get(parts)
+            if etag_of(current) != etag:
+                return False, current, etag_of(current)
+            self._set(parts, value)
+            self._notify("put", parts, value)
+            return True, value, etag_of(value)
+
+    def patch(self, parts, values):
+        with self.lock:
+            for child, value in values.items():
+                self._set(parts + split_path(child), value)
+            self._notify("patch", parts, values)
+
+    def _notify(self, event, parts, data):
+        for listener in list(self.listeners):
+            listener.changed(self, event, parts, data)
+
+    def filtered(self, params, node=None):
+        """
+        Applique orderBy, equalTo, startAt, endAt et limitToFirst/Last aux
+        enfants d'un nœud (la racine par défaut).
+        """
+        node = self.data if node is None else node
+        order_by = params.get("orderBy")
+        if order_by is None or not isinstance(node, dict):
+            return node
+        items = [(child_order(k, v, order_by), k, v) for k, v in node.items()]
+        items.sort(key=lambda item: item[:2])  # Égalités départagées par la clé
+        if "equalTo" in params:
+            bound = order_value(params["equalTo"])
+            items = [item for item in items if item[0] == bound]
+        if "startAt" in params:
+            bound = order_value(params["startAt"])
+            items = [item for item in items if item[0] >= bound]
+        if "endAt" in params:
+            bound = order_value(params["endAt"])
+            items = [item for item in items if item[0] <= bound]
+        if "limitToFirst" in params:
+            items = items[: params["limitToFirst"]]
+        if "limitToLast" in params:
+            items = items[max(len(items) - params["limitToLast"], 0) :]
+        return {k: v for _, k, v in items}
+
+
+class StreamListener:
+    """
+    Abonné d'un client en flux : traduit les écritures en événements SSE.
+    Pour un flux filtré, chaque partie touchée est renvoyée entière (ou null
+    si elle sort du filtre), comme le fait Firebase.
+    """
+
+    def __init__(self, params):
+        self.params = params
+        self.events = queue.Queue()
+        self.members = set()
+
+    def initial(self, tree):
+        data = tree.filtered(self.params)
+        self.members = set(data)
+        self.events.put(("put", {"path": "/", "data": data or None}))
+
+    def changed(self, tree, event, parts, data):
+        if "orderBy" not in self.params:
+            path = "/" + "/".join(parts)
+            self.events.put((event, {"path": path, "data": data}))
+            return
+        if parts:
+            keys = {parts[0]}
+        else:
+            keys = {split_path(child)[0] for child in (data or {})} | self.members
+        current = tree.filtered(self.params)
+        for key in sorted(keys):
+            if key in current:
+                self.members.add(key)
+                self.events.put(("put", {"path": f"/{key}", "data": current[key]}))
+            elif key in self.members:
+                self.members.discard(key)
+                self.events.put(("put", {"path": f"/{key}", "data": None}))
+
+
+class FirebaseHandler(BaseHTTPRequestHandler):
+    """
+    Gestionnaire HTTP/1.1 (keep-alive) des requêtes REST.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def tree(self):
+        return self.server.tree
+
+    def _send_json(self, status, data, etag=None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def _inject_faults(self):
+        """
+        Applique la latence puis, selon les taux configurés, coupe la
+        connexion sans répondre ou renvoie une erreur 503.
+        Retourne True si la requête ne doit pas être traitée.
+        """
+        server = self.server
+        server.count("requests")
+        delay = server.latency + server.jitter * server.roll()
+        if delay:
+            time.sleep(delay)
+        roll = server.roll()
+        if roll < server.drop_rate:
+            server.count("dropped")
+            self.close_connection = True
+            return True
+        if roll < server.drop_rate + server.error_rate:
+            server.count("errors")
+            self._send_json(503, {"error": "Service Unavailable"})
+            return True
+        return False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parts, params = split_path(url.path), parse_query(url.query)
+        if "text/event-stream" in self.headers.get("Accept", ""):
+            self._stream(params)
+            return
+        if self._inject_faults():
+            return
+        order_by = params.get("orderBy")
+        indexes = self.server.indexes
+        if indexes is not None and order_by and order_by[0] != "$" and order_by not in indexes:
+            self._send_json(400, {"error": f'Index not defined, add ".indexOn": "{order_by}"'})
+            return
+        with self.tree.lock:
+            data = self.tree.filtered(params, self.tree.get(parts))
+        etag = None
+        if self.headers.get("X-Firebase-ETag", "").lower() == "true":
+            etag = etag_of(data)
+        self._send_json(200, data, etag)
+
+    def do_PUT(self):
+        parts = split_path(urlsplit(self.path).path)
+        value = self._read_json()
+        if self._inject_faults():
+            return
+        expected = self.headers.get("if-match")
+        if expected is None:
+            self.tree.put(parts, value)
+            self._send_json(200, value)
+            return
+        written, current, etag = self.tree.put_if_match(parts, value, expected)
+        # Comme Firebase : 412 avec la valeur et l'ETag actuels
+        self._send_json(200 if written else 412, current, etag)
+
+    def do_PATCH(self):
+        parts = split_path(urlsplit(self.path).path)
+        values = self._read_json()
+        if self._inject_faults():
+            return
+        if not isinstance(values, dict):
+            self._send_json(400, {"error": "Invalid data; couldn't parse JSON object."})
+            return
+        self.tree.patch(parts, values)
+        self._send_json(200, values)
+
+    def _write_chunk(self, data):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _stream(self, params):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        listener = StreamListener(params)
+        with self.tree.lock:
+            listener.initial(self.tree)
+            self.tree.listeners.append(listener)
+        try:
+            while not self.server.stopping:
+                try:
+                    event, data = listener.events.get(timeout=KEEP_ALIVE_S)
+                except queue.Empty:
+                    event, data = "keep-alive", None
+                message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                self._write_chunk(message.encode())
+        except OSError:
+            pass  # Client déconnecté
+        finally:
+            with self.tree.lock:
+                self.tree.listeners.remove(listener)
+            self.close_connection = True
+
+
+class FirebaseStandin(ThreadingHTTPServer):
+    """
+    Serveur de remplacement de Firebase, lancé dans un thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        data=None,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        jitter=0.0,
+        drop_rate=0.0,
+        error_rate=0.0,
+        indexes=None,
+        seed=None,
+    ):
+        """
+        Args:
+            data (dict): Contenu initial de la base.
+            host (str): Adresse d'écoute.
+            port (int): Port d'écoute (0 pour un port libre).
+            latency (float): Délai ajouté à chaque requête, en secondes.
+            jitter (float): Délai aléatoire supplémentaire maximal, en secondes.
+            drop_rate (float): Proportion de connexions coupées sans réponse.
+            error_rate (float): Proportion de réponses 503.
+            indexes (list): Champs indexés (.indexOn) ; None accepte tout orderBy.
+            seed (int): Graine des tirages, pour des essais reproductibles.
+        """
+        super().__init__((host, port), FirebaseHandler)
+        self.tree = FirebaseTree(data)
+        self.latency = latency
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.error_rate = error_rate
+        self.indexes = indexes
+        self.counters = {"requests": 0, "dropped": 0, "errors": 0}
+        self.stopping = False
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def roll(self):
+        """
+        Tirage uniforme dans [0, 1), partagé par les threads du serveur.
+        """
+        with self._lock:
+            return self._random.random()
+
+    def count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.stopping = True
+        with self.tree.lock:
+            for listener in self.tree.listeners:
+                listener.events.put(("cancel", None))
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--data", help="Export JSON de la base à charger")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latence aléatoire max (s)")
+    parser.add_argument("--drop", type=float, default=0.0, help="Taux de coupures")
+    parser.add_argument("--errors", type=float, default=0.0, help="Taux d'erreurs 503")
+    parser.add_argument("--index", action="append", help="Champ indexé (répétable)")
+    parser.add_argument("--seed", type=int, help="Graine des tirages")
+    args = parser.parse_args()
+    data = None
+    if args.data:
+        with open(args.data, encoding="utf-8") as file:
+            data = json.load(file)
+    server = FirebaseStandin(
+        data,
+        args.host,
+        args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop,
+        error_rate=args.errors,
+        indexes=args.index,
+        seed=args.seed,
+    )
+    print(f"Firebase local sur {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Générateur de charge : N machines simulées enregistrent des parties sur le
+serveur Firebase local (tools/firebase_standin.py) à travers le code réel
+de packages/firebase.py (SpinQueue, FirebaseSession, flush_spin_queue ou
+claim_spin_queue). Chaque machine tourne dans son propre processus.
+Le rapport donne la latence d'enregistrement d'une partie (p50/p99), les
+octets échangés et les résultats perdus (écrasés par une autre machine).
+Tout fonctionne hors ligne.
+
+Utilisation :
+    python tools/loadgen.py --cabinets 8 --spins 50 --latency 0.05 --drop 0.01
+    python tools/loadgen.py --mode patch --cabinets 4 --json rapport.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "packages"))
+sys.path.insert(0, ROOT)
+
+from tools.firebase_standin import FirebaseStandin  # noqa: E402
+
+RETRY_DELAY_S = 0.05  # Pause avant un nouvel envoi de la file
+MAX_FAILURES = 20  # Échecs consécutifs avant d'abandonner une partie
+BREAKER_RESET_MS = 500
+
+
+def seed_games(count, balance=1000):
+    """
+    Base initiale : `count` parties non jouées MA1..MA<count>.
+    """
+    return {
+        f"MA{n}": {"partieJouee": False, "solde": balance, "mise": 0}
+        for n in range(1, count + 1)
+    }
+
+
+def percentile(values, q):
+    """
+    Percentile par rang le plus proche (q entre 0 et 1).
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(q * len(ordered)) - 1, 0)
+    return ordered[rank]
+
+
+def run_cabinet(task):
+    """
+    Joue `spins` parties pour une machine et mesure chaque enregistrement.
+    Exécutée dans un processus séparé.
+    """
+    url, cabinet, spins, mode, workdir = task
+    import firebase
+    from firebase_session import FirebaseSession
+    from game_index import GameIndex
+    from resilience import CircuitBreaker, ResilientSession
+    from spin_queue import SpinQueue
+
+    # Disjoncteur court : une panne simulée ne bloque pas la mesure 30 s
+    breaker = CircuitBreaker(reset_ms=BREAKER_RESET_MS)
+    firebase.SESSION = ResilientSession(FirebaseSession(url), breaker, firebase.METRICS)
+    queue = SpinQueue(os.path.join(workdir, f"queue_{cabinet}.jsonl"))
+    index = GameIndex(os.path.join(workdir, f"index_{cabinet}.json"))
+    flush = firebase.claim_spin_queue if mode == "claim" else firebase.flush_spin_queue
+    latencies = []
+    committed = []
+    retries = 0
+    abandoned = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for spin in range(spins):
+            data = {
+                "gain": 0,
+                "partieJouee": True,
+                "mise": 10,
+                "machine": cabinet,
+                "tour": spin,
+            }
+            start = time.perf_counter()
+            queue.append(data)
+            failures = 0
+            while not flush(queue, index=index):
+                failures += 1
+                if failures >= MAX_FAILURES:
+                    break
+                time.sleep(RETRY_DELAY_S)
+            retries += failures
+            if queue.pending:
+                abandoned += len(queue)
+                queue.pending = []
+                continue
+            latencies.append(time.perf_counter() - start)
+            committed.append((cabinet, spin))
+    return {
+        "latencies": latencies,
+        "committed": committed,
+        "retries": retries,
+        "abandoned": abandoned,
+        "stats": firebase.session_stats(),
+        "http_retries": sum(e["retries"] for e in firebase.METRICS.endpoints.values()),
+        "breaker_trips": breaker.trips,
+    }
+
+
+def run_load(cabinets=4, spins=20, mode="claim", **faults):
+    """
+    Lance le serveur local et les machines, puis retourne le rapport.
+
+    Args:
+        cabinets (int): Nombre de machines simulées (processus).
+        spins (int): Parties jouées par machine.
+        mode (str): "claim" (écritures conditionnelles) ou "patch" (PATCH groupé).
+        **faults: Paramètres de FirebaseStandin (latency, jitter, drop_rate,
+            error_rate, seed).
+    """
+    server = FirebaseStandin(seed_games(cabinets * spins * 2), **faults).start()
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            tasks = [(server.url, c, spins, mode, workdir) for c in range(cabinets)]
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(cabinets) as pool:
+                results = pool.map(run_cabinet, tasks)
+        with server.tree.lock:
+            stored = {
+                (game["machine"], game["tour"])
+                for game in server.tree.data.values()
+                if isinstance(game, dict) and "machine" in game
+            }
+        counters = dict(server.counters)
+    finally:
+        server.stop()
+    latencies = [value for result in results for value in result["latencies"]]
+    totals = {}
+    for result in results:
+        for name, value in result["stats"].items():
+            totals[name] = totals.get(name, 0) + value
+    expected = {tuple(pair) for result in results for pair in result["committed"]}
+    committed = len(latencies)
+    exchanged = totals["bytes_sent"] + totals["bytes_received"]
+    return {
+        "mode": mode,
+        "cabinets": cabinets,
+        "spins": cabinets * spins,
+        "committed": committed,
+        "abandoned": sum(result["abandoned"] for result in results),
+        "lost": len(expected - stored),
+        "retries": sum(result["retries"] for result in results),
+        "http_retries": sum(result["http_retries"] for result in results),
+        "breaker_trips": sum(result["breaker_trips"] for result in results),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "max": round(max(latencies, default=0) * 1000, 2),
+        },
+        "requests": totals["requests"],
+        "handshakes": totals["handshakes"],
+        "bytes_sent": totals["bytes_sent"],
+        "bytes_received": totals["bytes_received"],
+        "bytes_per_spin": round(exchanged / committed) if committed else 0,
+        "conflicts": totals.get("conflicts", 0),
+        "server": counters,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cabinets", type=int, default=4)
+    parser.add_argument("--spins", type=int, default=20)
+    parser.add_argument("--mode", choices=("claim", "patch"), default="claim")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Latence aléatoire max (s)")
+    parser.add_argument("--drop", type=float, default=0.0, help="Taux de coupures")
+    parser.add_argument("--errors", type=float, default=0.0, help="Taux d'erreurs 503")
+    parser.add_argument("--seed", type=int, help="Graine des tirages")
+    parser.add_argument("--json", help="Fichier où écrire le rapport")
+    args = parser.parse_args()
+    report = run_load(
+        args.cabinets,
+        args.spins,
+        args.mode,
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop,
+        error_rate=args.errors,
+        seed=args.seed,
+    )
+    text = json.dumps(report, indent=2)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
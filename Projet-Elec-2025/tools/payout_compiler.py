@@ -0,0 +1,191 @@
+"""
+Compilateur des règles de gain, à exécuter sur l'hôte.
+Les règles sont décrites dans un fichier JSON (tools/payout_rules.json) :
+une liste de motifs avec leur multiplicateur (en dixièmes), leur priorité
+et leur façon de se cumuler. Le compilateur évalue les règles sur les 1000
+tirages et écrit la table lue par le firmware (packages/payout_table.bin :
+1000 entiers 16 bits little-endian suivis du CRC32 de la table).
+Le score d'une partie reste une lecture de table, quelle que soit la
+complexité des règles.
+
+Champs d'une règle :
+    name      Nom affiché.
+    pattern   "triple" (3 rouleaux identiques), "sequence" (suite croissante
+              ou décroissante), "pair" (rouleaux `positions` identiques, le
+              troisième différent), "parity" (3 rouleaux de même parité) ou
+              "count" (occurrences de `symbol`).
+    symbol    Chiffre imposé (triple, count).
+    positions Rouleaux identiques pour "pair", de 0 à 2 (défaut [0, 2]).
+    count     Nombre exact d'occurrences pour "count" ; sans ce champ, la
+              valeur est multipliée par le nombre d'occurrences.
+    value     Multiplicateur en dixièmes (15 = x1,5).
+    priority  Ordre d'évaluation (croissant).
+    stack     "stop" (gain final), "replace" (remplace le multiplicateur)
+              ou "add" (s'ajoute au multiplicateur).
+    group     Seule la première règle vérifiée d'un groupe s'applique.
+    fallback  Ne s'applique que si aucune règle "replace" n'a été vérifiée.
+
+Utilisation :
+    python tools/payout_compiler.py --check
+    python tools/payout_compiler.py --rules tools/payout_rules.json --output packages/payout_table.bin
+"""
+
+import argparse
+import binascii
+import json
+import os
+import struct
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "packages"))
+
+from payout import OUTCOMES, build_payout_table, calculer_gain_reference  # noqa: E402
+
+RULES_FILE = os.path.join(ROOT, "tools", "payout_rules.json")
+TABLE_FILE = os.path.join(ROOT, "packages", "payout_table.bin")
+PATTERNS = ("triple", "sequence", "pair", "parity", "count")
+STACKS = ("stop", "replace", "add")
+MAX_VALUE = 0xFFFF  # Entrée d'un array('H')
+
+
+def load_rules(path=RULES_FILE):
+    """
+    Lit et valide les règles ; ValueError si une règle est invalide.
+    """
+    with open(path, encoding="utf-8") as file:
+        rules = json.load(file)
+    for rule in rules:
+        validate_rule(rule)
+    return sorted(rules, key=lambda rule: rule["priority"])
+
+
+def validate_rule(rule):
+    name = rule.get("name", "?")
+    for field in ("name", "pattern", "value", "priority", "stack"):
+        if field not in rule:
+            raise ValueError(f"Règle {name} : champ {field} manquant")
+    if rule["pattern"] not in PATTERNS:
+        raise ValueError(f"Règle {name} : motif inconnu {rule['pattern']}")
+    if rule["stack"] not in STACKS:
+        raise ValueError(f"Règle {name} : cumul inconnu {rule['stack']}")
+    if not 0 <= rule["value"] <= MAX_VALUE:
+        raise ValueError(f"Règle {name} : valeur hors limites {rule['value']}")
+    if rule["pattern"] == "count" and "symbol" not in rule:
+        raise ValueError(f"Règle {name} : symbole manquant")
+    positions = rule.get("positions", [0, 2])
+    if rule["pattern"] == "pair" and (
+        len(positions) != 2 or len(set(positions)) != 2 or not set(positions) <= {0, 1, 2}
+    ):
+        raise ValueError(f"Règle {name} : positions invalides {positions}")
+
+
+def match(rule, digits):
+    """
+    Nombre de fois où la règle est vérifiée par le tirage (0 si elle ne
+    l'est pas ; le nombre d'occurrences pour "count" sans `count`).
+    """
+    a, b, c = digits
+    pattern = rule["pattern"]
+    symbol = rule.get("symbol")
+    if pattern == "triple":
+        return int(a == b == c and symbol in (None, a))
+    if pattern == "sequence":
+        return int((a + 1 == b and b + 1 == c) or (a - 1 == b and b - 1 == c))
+    if pattern == "pair":
+        i, j = rule.get("positions", [0, 2])
+        other = digits[3 - i - j]
+        return int(digits[i] == digits[j] and other != digits[i])
+    if pattern == "parity":
+        return int(a % 2 == b % 2 == c % 2)
+    occurrences = digits.count(symbol)
+    if "count" in rule:
+        return int(occurrences == rule["count"])
+    return occurrences
+
+
+def evaluate(rules, digits):
+    """
+    Multiplicateur (en dixièmes) d'un tirage ; `rules` triées par priorité.
+    """
+    multiplier = 0
+    replaced = False
+    groups = set()
+    for rule in rules:
+        if rule.get("fallback") and replaced:
+            continue
+        group = rule.get("group")
+        if group is not None and group in groups:
+            continue
+        hits = match(rule, digits)
+        if not hits:
+            continue
+        if group is not None:
+            groups.add(group)
+        value = rule["value"] * hits
+        if rule["stack"] == "stop":
+            return value
+        if rule["stack"] == "replace":
+            multiplier = value
+            replaced = True
+        else:
+            multiplier += value
+    return multiplier
+
+
+def compile_rules(rules):
+    """
+    Table des multiplicateurs (x10) des 1000 tirages, au format du firmware.
+    """
+    table = build_payout_table(lambda rouleaux, mise: evaluate(rules, rouleaux))
+    for number, value in enumerate(table):
+        if value > MAX_VALUE:
+            raise ValueError(f"Tirage {number:03d} : multiplicateur {value} trop grand")
+    return table
+
+
+def table_bytes(table):
+    """
+    Contenu du fichier : la table (little-endian) puis son CRC32.
+    """
+    data = struct.pack(f"<{OUTCOMES}H", *table)
+    return data + struct.pack("<I", binascii.crc32(data) & 0xFFFFFFFF)
+
+
+def compare(table, reference=None):
+    """
+    Comparaison exhaustive avec les règles actuelles : liste des
+    (tirage, attendu, compilé) qui diffèrent.
+    """
+    reference = reference or build_payout_table(calculer_gain_reference)
+    return [
+        (number, expected, value)
+        for number, (expected, value) in enumerate(zip(reference, table))
+        if expected != value
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rules", default=RULES_FILE, help="Fichier des règles")
+    parser.add_argument("--output", default=TABLE_FILE, help="Table compilée")
+    parser.add_argument(
+        "--check", action="store_true", help="Comparer aux règles actuelles sans écrire"
+    )
+    args = parser.parse_args()
+    table = compile_rules(load_rules(args.rules))
+    data = table_bytes(table)
+    checksum = struct.unpack("<I", data[-4:])[0]
+    if args.check:
+        mismatches = compare(table)
+        for number, expected, value in mismatches[:20]:
+            print(f"{number:03d} : attendu x{expected / 10}, compilé x{value / 10}")
+        print(f"{OUTCOMES - len(mismatches)}/{OUTCOMES} tirages identiques, CRC32 {checksum:08x}")
+        sys.exit(1 if mismatches else 0)
+    with open(args.output, "wb") as file:
+        file.write(data)
+    print(f"{args.output} : {len(data)} octets, CRC32 {checksum:08x}")
+
+
+if __name__ == "__main__":
+    main()
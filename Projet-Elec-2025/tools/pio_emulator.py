@@ -0,0 +1,114 @@
+"""
+Émulateur au cycle près du programme PIO de packages/pio_display.py, pour
+vérifier la forme d'onde de l'afficheur sans carte. Il exécute la liste
+d'instructions de scan_program (celle qui est assemblée pour la carte) : une
+instruction par cycle, side-set appliqué au cycle de l'instruction, FIFO TX
+jointe de 8 mots, OSR décalé vers la droite.
+
+Utilisation :
+    python tools/pio_emulator.py --digits 7 0 4 --cycles 208
+"""
+
+import argparse
+import os
+import sys
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "packages"))
+
+from pio_display import (  # noqa: E402
+    JMP_Y_DEC,
+    MOV_X_OSR,
+    OUT_PINS,
+    PULL,
+    SET_Y,
+    encode_frame,
+    out_codes,
+    scan_program,
+)
+
+FIFO_DEPTH = 8  # FIFO TX jointe (JOIN_TX)
+
+
+class PioEmulator:
+    """
+    Machine à états PIO réduite aux instructions du balayage.
+    """
+
+    def __init__(self, program, side_init=0):
+        self.program = program
+        self.pc = 0
+        self.x = 0
+        self.y = 0
+        self.osr = 0
+        self.fifo = deque()
+        self.out = 0  # Niveaux des broches de données (bit 0 = out_base)
+        self.side = side_init  # Niveaux des broches de sélection
+        self.cycle = 0
+        self.pulls_from_fifo = 0
+
+    def put(self, word):
+        """
+        Pousse un mot dans la FIFO ; False si elle est pleine.
+        """
+        if len(self.fifo) >= FIFO_DEPTH:
+            return False
+        self.fifo.append(word & 0xFFFFFFFF)
+        return True
+
+    def step(self):
+        """
+        Exécute un cycle et retourne (cycle, données, sélections).
+        """
+        op, arg, side = self.program[self.pc]
+        self.side = side
+        next_pc = self.pc + 1
+        if op == PULL:
+            if self.fifo:
+                self.osr = self.fifo.popleft()
+                self.pulls_from_fifo += 1
+            else:
+                self.osr = self.x
+        elif op == MOV_X_OSR:
+            self.x = self.osr
+        elif op == OUT_PINS:
+            self.out = self.osr & ((1 << arg) - 1)
+            self.osr >>= arg
+        elif op == SET_Y:
+            self.y = arg
+        elif op == JMP_Y_DEC:
+            if self.y:
+                next_pc = arg
+            self.y = (self.y - 1) & 0xFFFFFFFF
+        else:
+            raise ValueError(f"Instruction inconnue : {op}")
+        self.pc = next_pc % len(self.program)  # wrap
+        self.cycle += 1
+        return self.cycle - 1, self.out, self.side
+
+    def run(self, cycles):
+        """
+        Forme d'onde : liste de (cycle, données, sélections).
+        """
+        return [self.step() for _ in range(cycles)]
+
+
+def main():
+    from gpio_frames import SEGMENT_MAP
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--digits", type=int, nargs="+", default=[7, 0, 4])
+    parser.add_argument("--cycles", type=int, default=104)
+    args = parser.parse_args()
+    table = out_codes([3, 4, 5, 6, 7, 9, 8, 10], SEGMENT_MAP)  # Câblage de main.py
+    emulator = PioEmulator(scan_program(len(args.digits)), side_init=0b111)
+    emulator.put(encode_frame(args.digits, table))
+    previous = None
+    for cycle, data, selects in emulator.run(args.cycles):
+        if (data, selects) != previous:
+            print(f"{cycle:6d}  données={data:08b}  sélections={selects:03b}")
+            previous = (data, selects)
+
+
+if __name__ == "__main__":
+    main()
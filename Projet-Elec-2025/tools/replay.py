@@ -0,0 +1,154 @@
+"""
+Rejeu et audit des parties enregistrées avec une graine (champ 'seed').
+Pour chaque partie, la suite des tirages ('combinaison') et le gain sont
+recalculés depuis la graine avec le code de la machine (SpinPlanner,
+SpinRng, calculer_gain) puis comparés aux valeurs stockées. Chaque partie
+donne une ligne dans le journal d'audit (JSON Lines) ; le résumé compte les
+parties conformes, divergentes et sans graine.
+
+Utilisation :
+    python tools/replay.py --data export.json --audit audit.jsonl
+    python tools/replay.py --url http://127.0.0.1:9000
+    python tools/replay.py --selftest 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "packages"))
+
+from payout import calculer_gain  # noqa: E402
+from spin_codec import game_frames  # noqa: E402
+from spin_planner import SpinPlanner  # noqa: E402
+from spin_rng import RNG_NAME  # noqa: E402
+
+NUM_DIGITS = 3
+
+OK = "ok"
+UNSEEDED = "unseeded"
+UNSUPPORTED = "unsupported-rng"
+COMBINAISON_MISMATCH = "combinaison-mismatch"
+GAIN_MISMATCH = "gain-mismatch"
+
+
+def replay(seed, mise, planner=None):
+    """
+    Recalcule (tirages, gain) d'une partie depuis sa graine.
+    """
+    planner = planner or SpinPlanner(NUM_DIGITS)
+    planner.plan_seeded(seed)
+    return planner.combinations(), calculer_gain(planner.outcome(), mise)
+
+
+def record_game(seed, mise, planner=None):
+    """
+    Partie telle que la machine l'enregistre (main.finish_spin).
+    """
+    frames, gain = replay(seed, mise, planner)
+    return {
+        "gain": gain,
+        "combinaison": frames,
+        "partieJouee": True,
+        "mise": mise,
+        "seed": seed,
+        "rng": RNG_NAME,
+    }
+
+
+def audit_game(key, game, planner):
+    """
+    Ligne du journal d'audit d'une partie.
+    """
+    entry = {"key": key, "status": OK}
+    if "seed" not in game:
+        entry["status"] = UNSEEDED
+        return entry
+    entry["seed"] = game["seed"]
+    if game.get("rng", RNG_NAME) != RNG_NAME:
+        entry["status"] = UNSUPPORTED
+        return entry
+    frames, gain = replay(game["seed"], game.get("mise", 0), planner)
+    stored = game_frames(game, NUM_DIGITS)
+    if stored != frames:
+        entry["status"] = COMBINAISON_MISMATCH
+        entry["expected"] = frames
+        entry["stored"] = stored
+    elif game.get("gain") != gain:
+        entry["status"] = GAIN_MISMATCH
+        entry["expected"] = gain
+        entry["stored"] = game.get("gain")
+    return entry
+
+
+def audit(games, log=None):
+    """
+    Audite toutes les parties jouées et retourne le résumé.
+
+    Args:
+        games (dict): Parties Firebase {clé: partie}.
+        log: Fichier texte où écrire le journal d'audit (optionnel).
+    """
+    planner = SpinPlanner(NUM_DIGITS)
+    counts = {}
+    start = time.perf_counter()
+    audited = 0
+    for key, game in games.items():
+        if not isinstance(game, dict) or not game.get("partieJouee"):
+            continue
+        entry = audit_game(key, game, planner)
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        audited += 1
+        if log is not None:
+            log.write(json.dumps(entry) + "\n")
+    elapsed = time.perf_counter() - start
+    return {
+        "games": audited,
+        "statuses": counts,
+        "games_per_second": round(audited / elapsed) if elapsed else None,
+    }
+
+
+def load_games(data=None, url=None):
+    """
+    Parties depuis un export JSON ou depuis une base (GET /.json).
+    """
+    if url:
+        with urllib.request.urlopen(url.rstrip("/") + "/.json") as response:
+            return json.load(response) or {}
+    with open(data, encoding="utf-8") as file:
+        return json.load(file) or {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--data", help="Export JSON de la base")
+    source.add_argument("--url", help="URL de la base (Firebase ou serveur local)")
+    source.add_argument("--selftest", type=int, help="Audite N parties générées")
+    parser.add_argument("--audit", help="Journal d'audit (JSON Lines)")
+    args = parser.parse_args()
+    if args.selftest:
+        rng = random.Random(0)
+        planner = SpinPlanner(NUM_DIGITS)
+        games = {
+            f"MA{n}": record_game(rng.getrandbits(32), rng.choice((10, 20, 50)), planner)
+            for n in range(1, args.selftest + 1)
+        }
+    else:
+        games = load_games(args.data, args.url)
+    if args.audit:
+        with open(args.audit, "w", encoding="utf-8") as log:
+            summary = audit(games, log)
+    else:
+        summary = audit(games)
+    print(json.dumps(summary, indent=2))
+    sys.exit(0 if set(summary["statuses"]) <= {OK, UNSEEDED} else 1)
+
+
+if __name__ == "__main__":
+    main()
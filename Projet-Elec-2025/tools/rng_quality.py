@@ -0,0 +1,282 @@
+"""
+Qualité statistique et coût des générateurs de tirages, à exécuter sur
+l'hôte. Les tirages randrange(100, 1000) (comme main.generate_random) sont
+produits par blocs et passent, pour chaque rouleau (centaines, dizaines,
+unités), par quatre tests dont seuls les compteurs sont gardés en mémoire :
+
+- khi-deux sur la fréquence des chiffres ;
+- corrélation sérielle entre deux tirages successifs ;
+- suites (runs) au-dessus / au-dessous de la moyenne (Wald-Wolfowitz) ;
+- écarts entre deux 7 successifs, comparés à la loi géométrique.
+
+Générateurs testés : random (module random), spin_rng (SpinRng, xorshift32)
+et urandom (os.urandom avec rejet). Le rapport JSON (clés triées, valeurs
+arrondies) se compare d'une version à l'autre ; le code de sortie est 1 si
+une p-valeur est sous le seuil.
+
+Utilisation :
+    python tools/rng_quality.py --draws 20000000 --json rng.json
+    python tools/rng_quality.py --generators spin_rng --draws 1000000
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from collections import Counter
+from operator import mul
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "packages"))
+
+from spin_rng import SpinRng  # noqa: E402
+
+REPORT_VERSION = 1
+LOW, HIGH = 100, 1000  # randrange(10 ** (NUM_DIGITS - 1), 10 ** NUM_DIGITS)
+POSITIONS = ("hundreds", "tens", "units")
+GAP_SYMBOL = 7  # Chiffre suivi par le test des écarts (jackpot, bonus)
+GAP_MAX = 20  # Écarts >= GAP_MAX regroupés dans la dernière case
+ALPHA = 0.001  # Seuil d'échec par test
+
+
+class UrandomRng:
+    """
+    Tirages depuis os.urandom (générateur matériel sur la carte), avec rejet
+    pour rester uniforme.
+    """
+
+    def randrange(self, start, stop):
+        span = stop - start
+        limit = 65536 // span * span
+        while True:
+            x = int.from_bytes(os.urandom(2), "little")
+            if x < limit:
+                return start + x % span
+
+
+def generators(seed):
+    """
+    Générateurs utilisables par le firmware, par nom.
+    """
+    return {
+        "random": random.Random(seed),
+        "spin_rng": SpinRng(seed),
+        "urandom": UrandomRng(),
+    }
+
+
+def chi2_sf(x, df):
+    """
+    P(X >= x) pour une loi du khi-deux à df degrés de liberté (fonction
+    gamma incomplète régularisée, série ou fraction continue).
+    """
+    a = df / 2
+    x = x / 2
+    if x <= 0:
+        return 1.0
+    log_prefix = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1 / a
+        n = a
+        for _ in range(10000):
+            n += 1
+            term *= x / n
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1 - total * math.exp(log_prefix))
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 10000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = d if abs(d) > tiny else tiny
+        c = b + an / c
+        c = c if abs(c) > tiny else tiny
+        d = 1 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(1.0, math.exp(log_prefix) * h)
+
+
+def normal_p(z):
+    """
+    p-valeur bilatérale d'un score z.
+    """
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+class PositionStats:
+    """
+    Compteurs des quatre tests pour un rouleau, mis à jour bloc par bloc.
+    """
+
+    def __init__(self, values):
+        self.values = values  # Chiffres possibles (1-9 pour les centaines)
+        self.mean = sum(values) / len(values)
+        self.counts = Counter()
+        self.previous = None  # Dernier chiffre du bloc précédent
+        self.pairs = 0
+        self.sum_x = self.sum_y = self.sum_xx = self.sum_yy = self.sum_xy = 0
+        self.last_sign = None
+        self.above = self.below = self.runs = 0
+        self.since = None  # Chiffres depuis le dernier GAP_SYMBOL
+        self.gaps = [0] * (GAP_MAX + 1)
+
+    def update(self, digits):
+        self.counts.update(digits)
+        seq = digits if self.previous is None else [self.previous] + digits
+        x, y = seq[:-1], seq[1:]
+        self.pairs += len(y)
+        self.sum_x += sum(x)
+        self.sum_y += sum(y)
+        self.sum_xx += sum(map(mul, x, x))
+        self.sum_yy += sum(map(mul, y, y))
+        self.sum_xy += sum(map(mul, x, y))
+        self.previous = digits[-1]
+
+        mean = self.mean
+        signs = [v > mean for v in digits if v != mean]
+        if signs:
+            above = sum(signs)
+            self.above += above
+            self.below += len(signs) - above
+            changes = sum(map(bool.__ne__, signs[:-1], signs[1:]))
+            self.runs += changes + (self.last_sign is None or self.last_sign != signs[0])
+            self.last_sign = signs[-1]
+
+        since = self.since
+        for v in digits:
+            if v == GAP_SYMBOL:
+                if since is not None:
+                    self.gaps[min(since, GAP_MAX)] += 1
+                since = 0
+            elif since is not None:
+                since += 1
+        self.since = since
+
+    def report(self):
+        n = sum(self.counts.values())
+        expected = n / len(self.values)
+        chi2 = sum((self.counts[v] - expected) ** 2 / expected for v in self.values)
+
+        pairs = self.pairs
+        cov = pairs * self.sum_xy - self.sum_x * self.sum_y
+        var = (pairs * self.sum_xx - self.sum_x**2) * (pairs * self.sum_yy - self.sum_y**2)
+        r = cov / math.sqrt(var) if var > 0 else 0.0
+        z_serial = r * math.sqrt(pairs)
+
+        total = self.above + self.below
+        mu = 2 * self.above * self.below / total + 1 if total else 0.0
+        var_runs = (mu - 1) * (mu - 2) / (total - 1) if total > 1 else 0.0
+        z_runs = (self.runs - mu) / math.sqrt(var_runs) if var_runs > 0 else 0.0
+
+        p = 1 / len(self.values)
+        gaps = sum(self.gaps)
+        gap_chi2 = 0.0
+        for g, observed in enumerate(self.gaps):
+            prob = (1 - p) ** g * (p if g < GAP_MAX else 1)
+            gap_chi2 += (observed - gaps * prob) ** 2 / (gaps * prob) if gaps else 0.0
+
+        return {
+            "chi2": {"stat": chi2, "df": len(self.values) - 1, "p": chi2_sf(chi2, len(self.values) - 1)},
+            "serial": {"r": r, "z": z_serial, "p": normal_p(z_serial)},
+            "runs": {"runs": self.runs, "expected": mu, "z": z_runs, "p": normal_p(z_runs)},
+            "gap": {"gaps": gaps, "stat": gap_chi2, "df": GAP_MAX, "p": chi2_sf(gap_chi2, GAP_MAX)},
+        }
+
+
+def analyse(rng, draws, chunk=1_000_000):
+    """
+    Fait passer `draws` tirages de `rng` par les tests, bloc par bloc.
+    """
+    positions = [PositionStats(range(1, 10)), PositionStats(range(10)), PositionStats(range(10))]
+    randrange = rng.randrange
+    done = 0
+    while done < draws:
+        size = min(chunk, draws - done)
+        numbers = [randrange(LOW, HIGH) for _ in range(size)]
+        positions[0].update([n // 100 for n in numbers])
+        positions[1].update([n // 10 % 10 for n in numbers])
+        positions[2].update([n % 10 for n in numbers])
+        done += size
+    return {name: stats.report() for name, stats in zip(POSITIONS, positions)}
+
+
+def draw_cost(rng, count=200_000):
+    """
+    Coût moyen d'un tirage randrange(100, 1000), en ns (sur l'hôte).
+    """
+    randrange = rng.randrange
+    start = time.perf_counter_ns()
+    for _ in range(count):
+        randrange(LOW, HIGH)
+    return (time.perf_counter_ns() - start) / count
+
+
+def rounded(value):
+    """
+    Arrondit les flottants du rapport pour des comparaisons stables.
+    """
+    if isinstance(value, float):
+        return float(f"{value:.6g}")
+    if isinstance(value, dict):
+        return {k: rounded(v) for k, v in value.items()}
+    return value
+
+
+def run(draws=1_000_000, chunk=1_000_000, seed=0, names=None, alpha=ALPHA, bench=200_000):
+    """
+    Rapport complet : tests par rouleau et coût d'un tirage par générateur.
+    """
+    available = generators(seed)
+    names = names or sorted(available)
+    report = {
+        "version": REPORT_VERSION,
+        "draws": draws,
+        "seed": seed,
+        "alpha": alpha,
+        "generators": {},
+        "failures": [],
+    }
+    for name in names:
+        positions = analyse(available[name], draws, chunk)
+        report["generators"][name] = {
+            "positions": positions,
+            "host_ns_per_draw": round(draw_cost(generators(seed)[name], bench), 1),
+        }
+        for position, tests in positions.items():
+            for test, result in tests.items():
+                if result["p"] < alpha:
+                    report["failures"].append(f"{name}/{position}/{test}")
+    return rounded(report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--draws", type=int, default=1_000_000, help="Tirages par générateur")
+    parser.add_argument("--chunk", type=int, default=1_000_000, help="Tirages par bloc")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--generators", nargs="*", help="Générateurs (tous par défaut)")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help="Seuil d'échec")
+    parser.add_argument("--json", help="Fichier où écrire le rapport")
+    args = parser.parse_args()
+    report = run(args.draws, args.chunk, args.seed, args.generators, args.alpha)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            file.write(text)
+    print(text)
+    sys.exit(1 if report["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Simulateur du taux de redistribution (RTP) et de la volatilité des règles
+de gain (packages/payout.py), à exécuter sur l'hôte.
+Les tirages suivent la même loi que main.generate_random
+(randrange(100, 1000)) et sont faits par lots NumPy : chaque lot est réduit
+à un histogramme des 1000 résultats (np.bincount), sur lequel les règles,
+évaluées de façon vectorisée, donnent le RTP, la fréquence de chaque règle,
+la variance et les intervalles de confiance.
+Le RTP exact, énuméré sur les 900 tirages possibles, ne demande pas NumPy.
+
+Utilisation :
+    python tools/rtp_simulator.py --exact
+    python tools/rtp_simulator.py --spins 300000000 --batch 10000000 --seed 1
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from fractions import Fraction
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "packages"))
+
+from payout import FIXED_POINT, PAYOUT_TABLE  # noqa: E402
+
+FIRST_OUTCOME = 100  # randrange(10 ** (NUM_DIGITS - 1), 10 ** NUM_DIGITS)
+LAST_OUTCOME = 999
+RULES = ("Jackpot", "Méga jackpot", "Suite", "Sandwich", "Pair/Impair", "Bonus 7", "Gain")
+Z_95 = 1.959963984540054
+
+
+def rules_of(number):
+    """
+    Règles déclenchées par un tirage (version scalaire, sans NumPy).
+    """
+    r2, r1, r3 = number // 100, number // 10 % 10, number % 10
+    rules = set()
+    if r1 == r2 == r3:
+        rules.add("Méga jackpot" if r1 == 7 else "Jackpot")
+    else:
+        if (r1 + 1 == r3 and r2 + 1 == r1) or (r1 - 1 == r3 and r2 - 1 == r1):
+            rules.add("Suite")
+        elif r1 == r3 and r1 != r2:
+            rules.add("Sandwich")
+        if r1 % 2 == r2 % 2 == r3 % 2:
+            rules.add("Pair/Impair")
+        if 7 in (r1, r2, r3):
+            rules.add("Bonus 7")
+    if PAYOUT_TABLE[number]:
+        rules.add("Gain")
+    return rules
+
+
+def rule_masks(np, numbers):
+    """
+    Règles déclenchées, évaluées de façon vectorisée sur un tableau de tirages.
+    Retourne (multiplicateurs x10, {règle: masque booléen}).
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    r2, r1, r3 = numbers // 100, numbers // 10 % 10, numbers % 10
+    same = (r1 == r2) & (r2 == r3)
+    suite = ((r1 + 1 == r3) & (r2 + 1 == r1)) | ((r1 - 1 == r3) & (r2 - 1 == r1))
+    sandwich = ~suite & (r1 == r3) & (r1 != r2)
+    parity = (r1 % 2 == r2 % 2) & (r2 % 2 == r3 % 2)
+    sevens = (r1 == 7).astype(np.int64) + (r2 == 7) + (r3 == 7)
+    event = suite | sandwich | parity
+    # Multiplicateurs en dixièmes, dans l'ordre des règles de calculer_gain
+    mult = np.where(suite, 50, np.where(sandwich, 20, 0))
+    mult = np.where(parity, 15, mult) + 5 * sevens
+    mult = np.where(~event & (sevens == 1), 5, mult)
+    mult = np.where(~event & (sevens == 2), 10, mult)
+    mult = np.where(same, np.where(r1 == 7, 1000, 100), mult)
+    masks = {
+        "Jackpot": same & (r1 != 7),
+        "Méga jackpot": same & (r1 == 7),
+        "Suite": ~same & suite,
+        "Sandwich": ~same & sandwich,
+        "Pair/Impair": ~same & parity,
+        "Bonus 7": ~same & (sevens > 0),
+        "Gain": mult > 0,
+    }
+    return mult, masks
+
+
+def exact_report(mise=10):
+    """
+    RTP et variance exacts, par énumération des 900 tirages équiprobables.
+    Les gains sont tronqués à l'entier comme sur la machine.
+    """
+    outcomes = range(FIRST_OUTCOME, LAST_OUTCOME + 1)
+    count = len(outcomes)
+    returns = [Fraction(mise * PAYOUT_TABLE[n] // FIXED_POINT, mise) for n in outcomes]
+    rtp = sum(returns) / count
+    variance = sum((r - rtp) ** 2 for r in returns) / count
+    hits = {rule: 0 for rule in RULES}
+    for number in outcomes:
+        for rule in rules_of(number):
+            hits[rule] += 1
+    return {
+        "outcomes": count,
+        "mise": mise,
+        "rtp": float(rtp),
+        "rtp_fraction": f"{rtp.numerator}/{rtp.denominator}",
+        "variance": float(variance),
+        "std": math.sqrt(variance),
+        "hit_frequency": {rule: hits[rule] / count for rule in RULES},
+    }
+
+
+def simulate(spins, batch=10_000_000, seed=None, mise=10):
+    """
+    Tire `spins` parties par lots NumPy et retourne le rapport (RTP, variance,
+    fréquence de chaque règle, intervalles de confiance à 95 %).
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(LAST_OUTCOME + 1, dtype=np.int64)
+    start = time.perf_counter()
+    done = 0
+    while done < spins:
+        size = min(batch, spins - done)
+        draws = rng.integers(FIRST_OUTCOME, LAST_OUTCOME + 1, size=size)
+        counts += np.bincount(draws, minlength=LAST_OUTCOME + 1)
+        done += size
+    elapsed = time.perf_counter() - start
+
+    outcomes = np.arange(LAST_OUTCOME + 1)
+    mult, masks = rule_masks(np, outcomes)
+    returns = (mise * mult // FIXED_POINT) / mise  # Gain par unité misée
+    rtp = float((counts * returns).sum() / spins)
+    variance = float((counts * (returns - rtp) ** 2).sum() / (spins - 1)) if spins > 1 else 0.0
+    half_width = Z_95 * math.sqrt(variance / spins)
+    hit_frequency = {}
+    for rule in RULES:
+        p = float(counts[masks[rule]].sum() / spins)
+        margin = Z_95 * math.sqrt(p * (1 - p) / spins)
+        hit_frequency[rule] = {"p": p, "ci95": [max(p - margin, 0.0), min(p + margin, 1.0)]}
+    return {
+        "spins": int(spins),
+        "mise": mise,
+        "seed": seed,
+        "rtp": rtp,
+        "rtp_ci95": [rtp - half_width, rtp + half_width],
+        "variance": variance,
+        "std": math.sqrt(variance),
+        "hit_frequency": hit_frequency,
+        "spins_per_second": round(spins / elapsed) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--spins", type=float, default=0, help="Parties à simuler")
+    parser.add_argument("--batch", type=int, default=10_000_000, help="Taille d'un lot")
+    parser.add_argument("--seed", type=int, help="Graine du générateur")
+    parser.add_argument("--mise", type=int, default=10, help="Mise par partie")
+    parser.add_argument("--exact", action="store_true", help="RTP exact sur les 900 tirages")
+    parser.add_argument("--json", help="Fichier où écrire le rapport")
+    args = parser.parse_args()
+    report = {}
+    if args.exact or not args.spins:
+        report["exact"] = exact_report(args.mise)
+    if args.spins:
+        report["simulation"] = simulate(int(args.spins), args.batch, args.seed, args.mise)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
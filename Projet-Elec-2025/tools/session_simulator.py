@@ -0,0 +1,299 @@
+"""
+Simulateur de sessions de joueur, à exécuter sur l'hôte.
+Une session part d'un solde initial et enchaîne les parties (gain lu dans
+packages/payout.py) jusqu'à la ruine, l'objectif de solde ou un nombre
+maximal de parties. La mise suit une stratégie exprimée en pas de joystick
+(±10 / ±50, bornée par le solde comme joystick.update_bet_amount).
+
+Les sessions sont réparties en lots (« shards ») calculés par un pool de
+processus. Chaque lot a sa propre graine : le résultat ne dépend pas du
+nombre de processus. Les histogrammes (durée de session, solde final) sont
+fusionnés au fil de l'eau et un point de reprise est écrit après chaque lot,
+ce qui permet de relancer une simulation interrompue.
+
+Utilisation :
+    python tools/session_simulator.py --sessions 1000000 --workers 8
+    python tools/session_simulator.py --sessions 1000000 --checkpoint run.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "packages"))
+
+from payout import FIXED_POINT, PAYOUT_TABLE  # noqa: E402
+
+FIRST_OUTCOME = 100  # randrange(10 ** (NUM_DIGITS - 1), 10 ** NUM_DIGITS)
+OUTCOME_SPAN = 900
+SMALL_STEP = 10  # Joystick gauche/droite
+LARGE_STEP = 50  # Joystick haut/bas
+LENGTH_BUCKET = 10  # Largeur d'une case de l'histogramme des durées (parties)
+BALANCE_BUCKET = 50  # Largeur d'une case de l'histogramme des soldes
+STRATEGIES = ("flat", "up-on-loss", "up-on-win")
+
+
+def clamp_bet(bet, balance):
+    """
+    Borne la mise entre 0 et le solde, comme update_bet_amount.
+    """
+    if bet > balance:
+        bet = balance
+    if bet < 0:
+        bet = 0
+    return bet
+
+
+def next_bet(strategy, bet, base_bet, won):
+    """
+    Mise de la partie suivante, en pas de joystick.
+
+    - flat : mise constante ;
+    - up-on-loss : +10 après une perte, retour à la mise de base après un gain ;
+    - up-on-win : +50 après un gain, retour à la mise de base après une perte.
+    """
+    if strategy == "up-on-loss":
+        return base_bet if won else bet + SMALL_STEP
+    if strategy == "up-on-win":
+        return bet + LARGE_STEP if won else base_bet
+    return base_bet
+
+
+def new_stats(config):
+    """
+    Statistiques vides, fusionnables par merge_stats.
+    """
+    length_buckets = config["max_spins"] // LENGTH_BUCKET + 1
+    balance_buckets = config["target"] // BALANCE_BUCKET + 2
+    return {
+        "sessions": 0,
+        "ruined": 0,
+        "reached_target": 0,
+        "capped": 0,
+        "spins": 0,
+        "wagered": 0,
+        "returned": 0,
+        "length_histogram": [0] * length_buckets,
+        "balance_histogram": [0] * balance_buckets,
+    }
+
+
+def merge_stats(total, part):
+    """
+    Ajoute les statistiques d'un lot au total (histogrammes case par case).
+    """
+    for name, value in part.items():
+        if isinstance(value, list):
+            total[name] = [a + b for a, b in zip(total[name], value)]
+        else:
+            total[name] += value
+    return total
+
+
+def run_shard(task):
+    """
+    Simule un lot de sessions. Exécutée dans un processus séparé.
+
+    Args:
+        task (tuple): (numéro du lot, nombre de sessions, configuration).
+    """
+    shard, count, config = task
+    rng = random.Random(config["seed"] * 1_000_003 + shard)
+    draw = rng.random
+    table = PAYOUT_TABLE.tolist()
+    start_balance = config["balance"]
+    target = config["target"]
+    max_spins = config["max_spins"]
+    base_bet = config["bet"]
+    strategy = config["strategy"]
+    stats = new_stats(config)
+    length_histogram = stats["length_histogram"]
+    balance_histogram = stats["balance_histogram"]
+    spins = wagered = returned = 0
+    for _ in range(count):
+        balance = start_balance
+        bet = clamp_bet(base_bet, balance)
+        played = 0
+        while 0 < balance < target and played < max_spins:
+            number = FIRST_OUTCOME + int(draw() * OUTCOME_SPAN)
+            gain = bet * table[number] // FIXED_POINT
+            balance += gain - bet
+            wagered += bet
+            returned += gain
+            played += 1
+            bet = clamp_bet(next_bet(strategy, bet, base_bet, gain > bet), balance)
+        if balance <= 0:
+            stats["ruined"] += 1
+        elif balance >= target:
+            stats["reached_target"] += 1
+        else:
+            stats["capped"] += 1
+        spins += played
+        length_histogram[played // LENGTH_BUCKET] += 1
+        balance_histogram[min(balance // BALANCE_BUCKET, len(balance_histogram) - 1)] += 1
+    stats["sessions"] = count
+    stats["spins"] = spins
+    stats["wagered"] = wagered
+    stats["returned"] = returned
+    return shard, stats
+
+
+def load_checkpoint(path, config):
+    """
+    Relit un point de reprise ; None s'il n'existe pas. Refuse un point de
+    reprise fait avec une autre configuration.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as file:
+        state = json.load(file)
+    if state["config"] != config:
+        raise ValueError(f"Point de reprise {path} fait avec une autre configuration")
+    return state
+
+
+def save_checkpoint(path, state):
+    """
+    Écrit le point de reprise de façon atomique (fichier temporaire + rename).
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as file:
+        json.dump(state, file)
+    os.replace(tmp, path)
+
+
+def simulate(
+    sessions,
+    balance=1000,
+    target=2000,
+    bet=10,
+    strategy="flat",
+    max_spins=1000,
+    seed=0,
+    workers=None,
+    shard_size=10_000,
+    checkpoint=None,
+    max_shards=None,
+):
+    """
+    Simule `sessions` sessions et retourne le rapport.
+
+    Args:
+        sessions (int): Nombre total de sessions.
+        balance (int): Solde initial.
+        target (int): Solde auquel le joueur s'arrête.
+        bet (int): Mise de base.
+        strategy (str): Stratégie de mise (voir next_bet).
+        max_spins (int): Parties au plus par session.
+        seed (int): Graine ; chaque lot en dérive la sienne.
+        workers (int): Nombre de processus (par défaut, un par cœur).
+        shard_size (int): Sessions par lot.
+        checkpoint (str): Fichier de reprise (optionnel).
+        max_shards (int): Arrête après ce nombre de lots (reprise ultérieure).
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Stratégie inconnue : {strategy}")
+    if bet <= 0:
+        raise ValueError("La mise de base doit être positive")
+    config = {
+        "sessions": sessions,
+        "balance": balance,
+        "target": target,
+        "bet": bet,
+        "strategy": strategy,
+        "max_spins": max_spins,
+        "seed": seed,
+        "shard_size": shard_size,
+    }
+    state = load_checkpoint(checkpoint, config) or {
+        "config": config,
+        "done": [],
+        "stats": new_stats(config),
+    }
+    done = set(state["done"])
+    shards = (sessions + shard_size - 1) // shard_size
+    tasks = [
+        (shard, min(shard_size, sessions - shard * shard_size), config)
+        for shard in range(shards)
+        if shard not in done
+    ]
+    if max_shards is not None:
+        tasks = tasks[:max_shards]
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if tasks:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(min(workers, len(tasks))) as pool:
+            for shard, stats in pool.imap_unordered(run_shard, tasks):
+                merge_stats(state["stats"], stats)
+                state["done"].append(shard)
+                if checkpoint:
+                    save_checkpoint(checkpoint, state)
+    elapsed = time.perf_counter() - start
+    return report(state, shards, len(tasks), elapsed)
+
+
+def report(state, shards, computed, elapsed):
+    """
+    Rapport lisible à partir des statistiques fusionnées.
+    """
+    stats = state["stats"]
+    sessions = stats["sessions"] or 1
+    return {
+        "config": state["config"],
+        "complete": len(state["done"]) == shards,
+        "shards_done": len(state["done"]),
+        "shards_total": shards,
+        "sessions": stats["sessions"],
+        "ruin_probability": stats["ruined"] / sessions,
+        "target_probability": stats["reached_target"] / sessions,
+        "capped_probability": stats["capped"] / sessions,
+        "mean_length": stats["spins"] / sessions,
+        "rtp": stats["returned"] / stats["wagered"] if stats["wagered"] else 0.0,
+        "length_histogram": {"bucket": LENGTH_BUCKET, "counts": stats["length_histogram"]},
+        "balance_histogram": {"bucket": BALANCE_BUCKET, "counts": stats["balance_histogram"]},
+        "shards_computed": computed,
+        "elapsed_s": round(elapsed, 3),
+        "shards_per_second": round(computed / elapsed, 2) if elapsed else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--balance", type=int, default=1000, help="Solde initial")
+    parser.add_argument("--target", type=int, default=2000, help="Solde visé")
+    parser.add_argument("--bet", type=int, default=10, help="Mise de base")
+    parser.add_argument("--strategy", choices=STRATEGIES, default="flat")
+    parser.add_argument("--max-spins", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="Processus (un par cœur par défaut)")
+    parser.add_argument("--shard-size", type=int, default=10_000)
+    parser.add_argument("--checkpoint", help="Fichier de reprise")
+    parser.add_argument("--json", help="Fichier où écrire le rapport")
+    args = parser.parse_args()
+    result = simulate(
+        args.sessions,
+        balance=args.balance,
+        target=args.target,
+        bet=args.bet,
+        strategy=args.strategy,
+        max_spins=args.max_spins,
+        seed=args.seed,
+        workers=args.workers,
+        shard_size=args.shard_size,
+        checkpoint=args.checkpoint,
+    )
+    text = json.dumps(result, indent=2)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            file.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -33,6 +33,9 @@ export class FirebaseSendService {
       // Préparer les données à insérer
       const partieData = {
         solde: solde,
+        // Numéro de la partie : ordre numérique pour orderBy="numero" (les clés
+        // MA<n> sont triées comme des chaînes par Firebase)
+        numero: nbData + 1,
         joueurId: joueurId.toString(),
         partieJouee: false,
         partieAffichee: false,
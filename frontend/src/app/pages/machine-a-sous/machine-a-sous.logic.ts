@@ -123,7 +123,7 @@ export class MachineASousLogic {
   }
 
   // Utility Methods
-  updateAfficheurs(combination: string): void {
+  updateAfficheurs(combination: string | number[]): void {
     this.afficheurs.forEach((afficheur, i) => {
       afficheur.currentChiffre = +combination[i] || 0;
     });
@@ -288,8 +288,29 @@ export class MachineASousLogic {
     });
   }
 
+  /**
+   * Retourne les tirages d'une partie. Le format compact envoyé par la machine
+   * (combinaisonFormat 1) est une chaîne base64 de paires d'octets, une par
+   * tirage ; les anciennes parties contiennent directement la liste. Dans les
+   * deux cas, chaque tirage est rendu sous la forme d'une liste de chiffres.
+   */
+  decodeCombinaison(part: any): number[][] {
+    if (part.combinaisonFormat !== 1 || typeof part.combinaison !== 'string') {
+      return Object.values(part.combinaison || []).map((frame: any) =>
+        Array.isArray(frame) ? frame.map(Number) : String(frame).split('').map(Number)
+      );
+    }
+    const packed = atob(part.combinaison);
+    const frames: number[][] = [];
+    for (let i = 0; i + 1 < packed.length; i += 2) {
+      const value = (packed.charCodeAt(i) << 8) | packed.charCodeAt(i + 1);
+      frames.push([Math.floor(value / 100), Math.floor(value / 10) % 10, value % 10]);
+    }
+    return frames;
+  }
+
   private processPart(part: any, callback: () => void): void {
-    const allCombinations: string[] = part.combinaison || [];
+    const allCombinations: number[][] = this.decodeCombinaison(part);
     const f = this.computeQuadraticFunction(allCombinations.length);
 
     if (!allCombinations.length) {
@@ -313,7 +334,7 @@ export class MachineASousLogic {
           this.addNewGameToBackend(
             part.joueurId[part.joueurId.length - 1] || 0,
             part.mise || 0,
-            part.combinaison[part.combinaison.length - 1] || [],
+            allCombinations[allCombinations.length - 1] || [],
             part.timestamp || new Date().toISOString(),
             () => {
               // Notifier la nav-bar via UserService avec le solde mis à jour
@@ -278,6 +278,30 @@ describe('MachineASousLogic', () => {
     });
   });
 
+  describe('decodeCombinaison', () => {
+    it('should decode the compact format', () => {
+      // [[8, 0, 4], [0, 0, 7]] encodé par packages/spin_codec.py
+      const part = { combinaison: 'AyQABw==', combinaisonFormat: 1 };
+      expect(logic.decodeCombinaison(part)).toEqual([
+        [8, 0, 4],
+        [0, 0, 7],
+      ]);
+    });
+
+    it('should keep the list format', () => {
+      const part = { combinaison: [[1, 2, 3]] };
+      expect(logic.decodeCombinaison(part)).toEqual([[1, 2, 3]]);
+    });
+
+    it('should split legacy string frames into digits', () => {
+      const part = { combinaison: ['123', '045'] };
+      expect(logic.decodeCombinaison(part)).toEqual([
+        [1, 2, 3],
+        [0, 4, 5],
+      ]);
+    });
+  });
+
   describe('processPart', () => {
     it('should handle missing combinaison', () => {
       const part = { combinaison: [], joueurId: ['1'] };